@@ -0,0 +1,112 @@
+"""
+Clustering backends over a season of games
+
+Generates a season's worth of random games (or loads a saved SignalTable),
+then times the linkage step and the full cluster_game() of every
+clustering backend, next to the pairwise loop the clusterer used to run on
+a sample of the games. With --workers, the games are also clustered in a
+process pool. Encounters (IDs included) from every backend and from the
+pool are checked to be identical; any difference exits 1.
+
+Usage (from the repo root):
+    python -m benchmarks.cluster_backend_bench
+    python -m benchmarks.cluster_backend_bench --games 800 --signals 2000
+    python -m benchmarks.cluster_backend_bench --table signals.npz
+    python -m benchmarks.cluster_backend_bench --workers 4
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.cluster_index_check import PairwiseClusterer, available_backends, encounter_dicts, random_game
+from encounter_clusterer import ClusterConfig, EncounterClusterer
+
+
+def season_games(games: int, signals: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        (f"g{i}", random_game(rng, f"g{i}", rng.randint(signals // 2, signals * 3 // 2)))
+        for i in range(games)
+    ]
+
+
+def table_games(path: str):
+    from signal_table import SignalTable
+    table = SignalTable.load(path)
+    return [(game_id, table.to_signals(rows)) for game_id, rows in table.game_slices()]
+
+
+def time_linkage(components, games) -> float:
+    config = ClusterConfig()
+    start = time.perf_counter()
+    for _, signals in games:
+        components(sorted(signals, key=lambda s: s.timestamp_ms), config)
+    return time.perf_counter() - start
+
+
+def time_clustering(clusterer, games, config=None, workers: int = 1):
+    start = time.perf_counter()
+    encounters = []
+    for _, game_encounters in clusterer.cluster_games(games, config, workers):
+        encounters.extend(game_encounters)
+    return time.perf_counter() - start, encounters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the clustering backends over a season of games')
+    parser.add_argument('--games', type=int, default=400, help='Random games in the season (default: 400)')
+    parser.add_argument('--signals', type=int, default=1500, help='Average signals per game (default: 1500)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--pairwise-sample', type=int, default=20, help='Games timed with the pairwise loop (default: 20)')
+    parser.add_argument('--workers', type=int, default=1, help='Also cluster the season in a process pool of this size (default: 1, off)')
+    parser.add_argument('--table', help='Cluster the games of a saved SignalTable (.npz) instead')
+    args = parser.parse_args()
+
+    games = table_games(args.table) if args.table else season_games(args.games, args.signals, args.seed)
+    signal_count = sum(len(signals) for _, signals in games)
+    print(f"Season: {len(games)} games, {signal_count} signals")
+
+    clusterer = EncounterClusterer()
+    linkers = {"python": clusterer._components, "numpy": clusterer._components_numpy}
+    reference = None
+    failures = 0
+    results = {}
+
+    for backend in available_backends():
+        linkage = time_linkage(linkers[backend], games)
+        elapsed, encounters = time_clustering(clusterer, games, ClusterConfig(backend=backend))
+        results[backend] = elapsed
+        print(f"{backend:>8}: linkage {linkage:.2f}s, cluster_game {elapsed:.2f}s ({signal_count / elapsed:,.0f} signals/s, {len(encounters)} encounters)")
+
+        encounters = encounter_dicts(encounters)
+        if reference is None:
+            reference = encounters
+        elif encounters != reference:
+            print(f"❌ {backend} backend encounters differ from {available_backends()[0]}")
+            failures += 1
+
+    if args.workers > 1:
+        backend = available_backends()[0]
+        elapsed, encounters = time_clustering(clusterer, games, ClusterConfig(backend=backend), args.workers)
+        print(f"{backend} backend, {args.workers} workers: cluster_games {elapsed:.2f}s ({results[backend] / elapsed:.1f}x serial)")
+        if encounter_dicts(encounters) != reference:
+            print(f"❌ {args.workers} workers give different encounters than 1")
+            failures += 1
+
+    # The pairwise loop is too slow for a whole season: time a sample and scale it up
+    sample = games[:args.pairwise_sample]
+    if sample:
+        sample_signals = sum(len(signals) for _, signals in sample)
+        elapsed, _ = time_clustering(PairwiseClusterer(), sample)
+        estimate = elapsed * signal_count / sample_signals
+        print(f"pairwise: cluster_game ~{estimate:.2f}s for the season (timed {len(sample)} games)")
+        for backend, backend_elapsed in results.items():
+            print(f"    {backend} backend {estimate / backend_elapsed:.1f}x faster than pairwise")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
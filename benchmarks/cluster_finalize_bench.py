@@ -0,0 +1,202 @@
+"""
+Check and timing for EncounterClusterer's cluster finalization
+
+Builds a large game of signals with mixed event types, sub types, ids
+carrying lane / objective keywords, unpositioned bursts and non-player
+actors, clusters it, and turns the clusters into encounters both with the
+single-pass finalization and with the previous per-cluster code (kept
+below as the reference). Encounters must match exactly, including the
+order of their sets and dicts in the JSON output; any difference exits 1.
+
+Usage (from the repo root):
+    python -m benchmarks.cluster_finalize_bench
+    python -m benchmarks.cluster_finalize_bench --signals 200000 --seed 7
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+from encounter import Encounter
+from encounter_clusterer import ClusterConfig, EncounterClusterer
+from signal_event import SignalEvent
+
+EVENT_TYPES = ("KILL", "OBJECTIVE", "SPELL", "STRUCTURE", "WARD")
+RAW_TYPES = ("player-killed-player", "team-killed-dragon", "player-used-ability", "team-destroyed-tower", "player-placed-ward")
+SUB_TYPES = (None, None, "FLASH", "DRAGON_INFERNAL", "BARON_NASHOR", "TOWER", "VOID_GRUB", "TOP_TURRET", "Elder")
+ID_PARTS = ("kill", "mid-tower", "bot_inhib", "top", "herald", "ward", "x", "bot-mid-lane", "top-to-bot", "drake_mid")
+PLAYERS = tuple(str(i) for i in range(1, 11)) + ("minion", "", None, "baron")
+
+
+class LegacyClusterer(EncounterClusterer):
+    """Reference: the per-cluster finalization the clusterer used to run"""
+
+    def _encounters_from_components(self, game_id, game_signals, roots, encounter_id, config):
+        encounters = []
+        clusters = defaultdict(list)
+        for i, root in enumerate(roots):
+            clusters[root].append(game_signals[i])
+
+        for events in clusters.values():
+            if len(events) < config.min_events:
+                continue
+
+            start = min(e.timestamp_ms for e in events)
+            end = max(e.timestamp_ms for e in events)
+            duration = end - start
+
+            pos = [(e.x, e.y) for e in events if e.x is not None]
+
+            def infer_location_from_events(events):
+                for e in events:
+                    raw = e.raw_type
+                    sub = str(e.sub_type or "").lower()
+                    event_id = str(e.id).lower()
+
+                    if any(k in s for s in [raw, sub, event_id] for k in ["mid"]):
+                        return "MID_LANE"
+                    if any(k in s for s in [raw, sub, event_id] for k in ["bot"]):
+                        return "BOT_LANE"
+                    if any(k in s for s in [raw, sub, event_id] for k in ["top"]):
+                        return "TOP_LANE"
+
+                    if any(k in raw or k in sub or k in event_id for k in ["dragon", "drake", "chemtech", "infernal", "mountain", "ocean", "cloud", "elder"]):
+                        return "RIVER"
+                    if any(k in raw or k in sub or k in event_id for k in ["herald", "baron", "nashor", "void"]):
+                        return "RIVER"
+
+                return "UNKNOWN"
+
+            if pos:
+                cx = sum(p[0] for p in pos) / len(pos)
+                cy = sum(p[1] for p in pos) / len(pos)
+                inferred_zone = None
+            else:
+                inferred_zone = infer_location_from_events(events)
+                cx, cy = None, None
+
+            def is_real_player(pid):
+                if pid is None:
+                    return False
+                return pid.isdigit()
+
+            teams = {e.team_id for e in events if e.team_id}
+            players = {
+                p for e in events
+                for p in (e.actor_player_id, e.target_player_id)
+                if is_real_player(p)
+            }
+
+            p_by_team = defaultdict(set)
+            for e in events:
+                if is_real_player(e.actor_player_id) and e.team_id:
+                    p_by_team[e.team_id].add(e.actor_player_id)
+                if is_real_player(e.target_player_id) and e.opponent_team_id:
+                    p_by_team[e.opponent_team_id].add(e.target_player_id)
+
+            p_by_team = {t: pset for t, pset in p_by_team.items() if t in teams}
+
+            for p in players:
+                found = False
+                for t_players in p_by_team.values():
+                    if p in t_players:
+                        found = True
+                        break
+                if not found:
+                    if "UNKNOWN_TEAM" not in p_by_team:
+                        p_by_team["UNKNOWN_TEAM"] = set()
+                    p_by_team["UNKNOWN_TEAM"].add(p)
+
+            counts = defaultdict(int)
+            for e in events:
+                counts[e.event_type] += 1
+
+            quality = "MED"
+            is_structure_only = set(counts.keys()) == {"STRUCTURE"}
+
+            if duration == 0 and is_structure_only:
+                quality = "LOW"
+            elif len(teams) <= 1 and counts.get("OBJECTIVE", 0) == 0:
+                quality = "LOW"
+            elif len(players) <= 1:
+                quality = "LOW"
+            elif counts.get("KILL", 0) > 0 or counts.get("OBJECTIVE", 0) > 0:
+                quality = "HIGH"
+
+            encounters.append(Encounter(
+                encounter_id=encounter_id, game_id=game_id, series_id=events[0].series_id,
+                start_ms=start, end_ms=end, centroid_x=cx, centroid_y=cy,
+                teams=teams, players=players, players_by_team=dict(p_by_team),
+                event_counts=dict(counts), event_ids=[e.id for e in events],
+                inferred_zone=inferred_zone, quality=quality,
+            ))
+            encounter_id += 1
+
+        return encounters
+
+
+def large_game(rng: random.Random, n: int):
+    """A long game of fights; a third of them without any positions"""
+    signals = []
+    t = 0
+    while len(signals) < n:
+        t += rng.choice((500, 13_000, 20_000, 40_000))
+        unpositioned = rng.random() < 0.35
+        fx, fy = rng.uniform(0, 15_000), rng.uniform(0, 15_000)
+        for _ in range(rng.randint(1, 60)):
+            team, opponent = rng.sample(("100", "200", "", None), 2)
+            signals.append(SignalEvent(
+                id=f"{rng.choice(ID_PARTS)}-{len(signals)}", game_id="g", series_id="s",
+                timestamp_ms=t + rng.randrange(8000),
+                x=None if unpositioned else fx + rng.uniform(-900, 900),
+                y=None if unpositioned else fy + rng.uniform(-900, 900),
+                team_id=team, opponent_team_id=opponent,
+                actor_player_id=rng.choice(PLAYERS), target_player_id=rng.choice(PLAYERS),
+                event_type=rng.choice(EVENT_TYPES), sub_type=rng.choice(SUB_TYPES), raw_type=rng.choice(RAW_TYPES),
+            ))
+    return signals
+
+
+def as_json(encounters) -> str:
+    """Encounters as main.py writes them, so set and dict order count too"""
+    return json.dumps([e.__dict__ for e in encounters], default=list)
+
+
+def best_time(clusterer, game_signals, roots, config, repeat: int = 7):
+    best, encounters = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encounters = clusterer._encounters_from_components("g", game_signals, roots, 0, config)
+        best = min(best, time.perf_counter() - start)
+    return best, encounters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and time the cluster finalization on a large game')
+    parser.add_argument('--signals', type=int, default=100_000, help='Signals in the game (default: 100000)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    config = ClusterConfig()
+    game_signals = sorted(large_game(random.Random(args.seed), args.signals), key=lambda s: s.timestamp_ms)
+    roots = EncounterClusterer()._components(game_signals, config)
+
+    legacy, expected = best_time(LegacyClusterer(), game_signals, roots, config)
+    current, encounters = best_time(EncounterClusterer(), game_signals, roots, config)
+
+    zones = sum(e.inferred_zone is not None for e in encounters)
+    print(f"Large game ({len(game_signals)} signals): {len(encounters)} encounters, {zones} placed by keyword")
+    print(f"    per-cluster finalization {legacy:.2f}s")
+    print(f"    single-pass finalization {current:.2f}s ({legacy / current:.1f}x)")
+
+    if as_json(encounters) != as_json(expected):
+        print("❌ Encounters differ from the per-cluster finalization")
+        sys.exit(1)
+    print("Encounters identical")
+
+
+if __name__ == '__main__':
+    main()
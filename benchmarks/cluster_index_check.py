@@ -0,0 +1,158 @@
+"""
+Property check and timing for EncounterClusterer's neighbour search
+
+Clusters randomly generated games (dense teamfights, unpositioned signals,
+coordinates and timestamps sitting exactly on DIST_EPS / TIME_EPS_MS) with
+every clustering backend (the spatial hash, and the vectorized one when
+numpy is installed) and with a reference that compares every pair in the
+window, as the clusterer used to. Any difference in the encounters is
+reported and the script exits 1.
+
+Usage (from the repo root):
+    python -m benchmarks.cluster_index_check
+    python -m benchmarks.cluster_index_check --trials 500 --seed 7
+    python -m benchmarks.cluster_index_check --table signals.npz   # also check a saved SignalTable
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import deque
+
+import cluster_vectorized
+import encounter_clusterer
+from encounter_clusterer import ClusterConfig, EncounterClusterer
+from geo import distance
+from signal_event import SignalEvent
+
+EVENT_TYPES = ("KILL", "OBJECTIVE", "SPELL", "STRUCTURE", "WARD")
+
+
+class PairwiseClusterer(EncounterClusterer):
+    """Reference: every signal against every signal in the max_window_ms deque"""
+
+    def _components(self, game_signals, config):
+        active = deque()
+        parent = list(range(len(game_signals)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(a, b):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[rb] = ra
+
+        for i, cur in enumerate(game_signals):
+            while active and cur.timestamp_ms - game_signals[active[0]].timestamp_ms > config.max_window_ms:
+                active.popleft()
+
+            for j in active:
+                prev = game_signals[j]
+
+                if abs(cur.timestamp_ms - prev.timestamp_ms) > config.time_eps_ms:
+                    continue
+
+                d = distance(cur.x, cur.y, prev.x, prev.y)
+                if d is not None and d > config.dist_eps:
+                    continue
+
+                union(i, j)
+
+            active.append(i)
+
+        return [find(i) for i in range(len(game_signals))]
+
+
+def random_game(rng: random.Random, game_id: str, n: int):
+    """Signals in bursts around fight spots; grid-snapped values hit the eps boundaries exactly"""
+    signals = []
+    t = 0
+    while len(signals) < n:
+        t += rng.choice((0, 1000, 6000, 12_000, 13_000, 30_000, 45_000))
+        fx, fy = rng.randrange(0, 15_000, 900), rng.randrange(0, 15_000, 900)
+        for _ in range(rng.randint(1, 40)):
+            ts = t + rng.choice((0, 500, 1000, 6000, 12_000, rng.randrange(20_000)))
+            if rng.random() < 0.15:
+                x = y = None
+            else:
+                x = fx + rng.choice((0, 1080, 1800, -1800, 1440, rng.uniform(-3000, 3000)))
+                y = fy + rng.choice((0, 1440, 1800, -1080, rng.uniform(-3000, 3000)))
+            team, opponent = rng.sample(("100", "200"), 2)
+            signals.append(SignalEvent(
+                id=f"{game_id}-{len(signals)}", game_id=game_id, series_id="s", timestamp_ms=ts,
+                x=x, y=y, team_id=team, opponent_team_id=opponent,
+                actor_player_id=str(rng.randrange(10)), target_player_id=str(rng.randrange(10)),
+                event_type=rng.choice(EVENT_TYPES), sub_type=None, raw_type="player-killed-player",
+            ))
+    return signals
+
+
+def encounter_dicts(encounters):
+    return [e.__dict__ for e in encounters]
+
+
+def available_backends():
+    return [b for b in encounter_clusterer.BACKENDS if b != "numpy" or cluster_vectorized.np is not None]
+
+
+def compare(signals, label: str) -> bool:
+    reference = encounter_dicts(PairwiseClusterer().cluster(signals))
+    ok = True
+    for backend in available_backends():
+        result = encounter_dicts(EncounterClusterer().cluster(signals, ClusterConfig(backend=backend)))
+        if result != reference:
+            print(f"❌ {label}: {len(result)} encounters with the {backend} backend, {len(reference)} pairwise")
+            ok = False
+    return ok
+
+
+def best_time(clusterer, signals, config=None, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clusterer.cluster(signals, config)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the indexed clusterer against the pairwise reference')
+    parser.add_argument('--trials', type=int, default=200, help='Random games to check (default: 200)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--table', help='Also check the signals of a saved SignalTable (.npz)')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for trial in range(args.trials):
+        signals = random_game(rng, f"g{trial}", rng.randint(2, 400))
+        failures += not compare(signals, f"trial {trial} ({len(signals)} signals)")
+    print(f"Random games: {args.trials - failures}/{args.trials} identical")
+
+    if args.table:
+        from signal_table import SignalTable
+        signals = list(SignalTable.load(args.table))
+        ok = compare(signals, args.table)
+        failures += not ok
+        print(f"{args.table}: {'identical' if ok else 'DIFFERENT'} ({len(signals)} signals)")
+
+    # A late-game siege: thousands of signals packed into a few fights
+    siege = random_game(random.Random(args.seed), "siege", 20_000)
+    for s in siege:
+        s.timestamp_ms //= 8
+    pairwise = best_time(PairwiseClusterer(), siege)
+    print(f"Dense game ({len(siege)} signals): pairwise {pairwise:.2f}s")
+    for backend in available_backends():
+        elapsed = best_time(EncounterClusterer(), siege, ClusterConfig(backend=backend))
+        print(f"    {backend} backend {elapsed:.2f}s ({pairwise / elapsed:.1f}x)")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
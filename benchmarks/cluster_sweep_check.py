@@ -0,0 +1,70 @@
+"""
+Property check and timing for EncounterClusterer.sweep_game
+
+Clusters random games under a grid of configs through the shared sweep
+index and once per config through cluster_game() (the python backend),
+and checks the encounters and used IDs are identical; any difference exits 1.
+Then times the sweep against re-clustering per config.
+
+Usage (from the repo root):
+    python -m benchmarks.cluster_sweep_check
+    python -m benchmarks.cluster_sweep_check --trials 100 --games 50
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.cluster_index_check import encounter_dicts, random_game
+from cluster_sweep import config_grid
+from encounter_clusterer import ClusterConfig, EncounterClusterer
+
+# Values on and around the grid random_game snaps positions and timestamps to
+GRID = config_grid([6000, 12_000, 13_000], [1080, 1800, 2400], [12_000, 30_000], [2, 3])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the clustering sweep against per-config clustering')
+    parser.add_argument('--trials', type=int, default=50, help='Random games to check (default: 50)')
+    parser.add_argument('--games', type=int, default=30, help='Games in the timed season (default: 30)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    clusterer = EncounterClusterer()
+    rng = random.Random(args.seed)
+    failures = 0
+    for trial in range(args.trials):
+        signals = random_game(rng, f"g{trial}", rng.randint(2, 400))
+        swept = clusterer.sweep_game(f"g{trial}", signals, GRID)
+        for config in GRID:
+            encounters, used = swept[config]
+            expected, expected_used = clusterer.cluster_game(f"g{trial}", signals, 0, config)
+            if used != expected_used or encounter_dicts(encounters) != encounter_dicts(expected):
+                print(f"❌ trial {trial} ({len(signals)} signals), {config}: {len(encounters)} encounters swept, {len(expected)} clustered")
+                failures += 1
+    print(f"Random games: {args.trials * len(GRID) - failures}/{args.trials * len(GRID)} game/config pairs identical")
+
+    games = [(f"s{i}", random_game(rng, f"s{i}", 1500)) for i in range(args.games)]
+    print(f"Season: {len(games)} games, {len(GRID)} configs")
+
+    start = time.perf_counter()
+    for game_id, signals in games:
+        clusterer.sweep_game(game_id, signals, GRID)
+    swept = time.perf_counter() - start
+    print(f"   sweep: {swept:.2f}s")
+
+    for backend in ("python", "numpy"):
+        configs = [ClusterConfig(c.time_eps_ms, c.dist_eps, c.max_window_ms, c.min_events, backend) for c in GRID]
+        start = time.perf_counter()
+        for game_id, signals in games:
+            for config in configs:
+                clusterer.cluster_game(game_id, signals, 0, config)
+        elapsed = time.perf_counter() - start
+        print(f"{backend:>8}: {elapsed:.2f}s re-clustering per config ({elapsed / swept:.1f}x the sweep)")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Check the retry policy of file downloads
+
+Serves the GRID stub with events downloads that misbehave per series and
+checks, for both clients, that: a persistent 500 or read timeout
+is requested max_retries + 1 times (not once per attempt of two stacked
+retry loops), a body cut off mid-stream is resumed with a Range request, and a corrupt
+zip is downloaded again. Retry-After values must be capped at
+DEFAULT_BACKOFF_MAX. Any failure exits 1.
+
+Usage (from the repo root):
+    python -m benchmarks.download_retry_check
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from email.utils import formatdate
+
+from benchmarks.grid_stub_server import StubGridHandler, StubGridServer, make_events_zip
+from grid_data_fetcher import DEFAULT_BACKOFF_MAX, DOWNLOAD_CHUNK_SIZE, GridAPIClient, parse_retry_after
+
+MAX_RETRIES = 2
+READ_TIMEOUT = 0.5
+SERIES_IDS = ['7001', '7002', '7003', '7004']
+
+
+def large_events_zip(series_id: str) -> bytes:
+    """A valid zip spanning several download chunks, so a cut-off body leaves data on disk"""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_STORED) as z:
+        z.writestr(f"events_{series_id}.jsonl", os.urandom(3 * DOWNLOAD_CHUNK_SIZE))
+    return buf.getvalue()
+
+
+class MisbehavingHandler(StubGridHandler):
+    """Events of series 7001 always fail, 7002 are cut off once, 7003 are corrupt once, 7004 always time out"""
+
+    def do_GET(self):
+        series_id = self.path.rsplit('/', 1)[-1]
+        if '/events/' not in self.path or series_id not in SERIES_IDS:
+            return super().do_GET()
+
+        stats = self.server.stats
+        stats[series_id] += 1
+        body = self.server.large_zip if series_id == '7002' else make_events_zip(series_id)
+        if series_id == '7004':
+            time.sleep(3 * READ_TIMEOUT)  # never answer in time
+            self.close_connection = True
+        elif series_id == '7001':
+            self._send(500, b'{"message": "Internal Server Error"}', headers={'Retry-After': '0'})
+        elif series_id == '7002' and stats[series_id] == 1:
+            # Promise the whole zip but only send half of it
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+        elif series_id == '7002':
+            offset = int(self.headers.get('Range', 'bytes=0-')[len('bytes='):-1])
+            stats['7002_resumed_from'] = offset
+            self._send(206 if offset else 200, body[offset:], content_type='application/zip')
+        elif series_id == '7003' and stats[series_id] == 1:
+            self._send(200, b'PK' + body[2:-10], content_type='application/zip')
+        else:
+            self._send(200, body, content_type='application/zip')
+
+
+def check_retry_after() -> int:
+    failures = 0
+    for value in ('86400', formatdate(time.time() + 86400, usegmt=True)):
+        if parse_retry_after(value) != DEFAULT_BACKOFF_MAX:
+            print(f"❌ Retry-After {value!r} parsed to {parse_retry_after(value)}, expected {DEFAULT_BACKOFF_MAX}")
+            failures += 1
+    return failures
+
+
+def check_results(name: str, server, results) -> int:
+    failures = 0
+    expected = {'7001': MAX_RETRIES + 1, '7002': 2, '7003': 2, '7004': MAX_RETRIES + 1}
+    requests = {series_id: server.stats[series_id] for series_id in expected}
+    if requests != expected:
+        print(f"❌ {name}: events requests {requests}, expected {expected}")
+        failures += 1
+    for series_id in ('7001', '7004'):
+        if not results[series_id]['error']:
+            print(f"❌ {name}: series {series_id} did not fail")
+            failures += 1
+    for series_id in ('7002', '7003'):
+        if results[series_id]['error']:
+            print(f"❌ {name}: series {series_id} failed: {results[series_id]['error']}")
+            failures += 1
+    if not server.stats['7002_resumed_from']:
+        print(f"❌ {name}: interrupted download restarted from scratch")
+        failures += 1
+    return failures
+
+
+def run(use_async: bool) -> int:
+    server = StubGridServer(limit=1000)
+    server.RequestHandlerClass = MisbehavingHandler
+    server.large_zip = large_events_zip('7002')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        if use_async:
+            from grid_async_client import AsyncGridAPIClient
+
+            async def download():
+                async with AsyncGridAPIClient('stub', requests_per_second=100, read_timeout=READ_TIMEOUT) as client:
+                    client.file_download_base_url = server.base_url
+                    client.max_retries = MAX_RETRIES
+                    return await client.download_many_series(SERIES_IDS, tmp, max_workers=4, include_riot=False)
+
+            results = asyncio.run(download())
+        else:
+            client = GridAPIClient('stub', requests_per_second=100, read_timeout=READ_TIMEOUT)
+            client.file_download_base_url = server.base_url
+            client.max_retries = MAX_RETRIES
+            results = client.download_many_series(SERIES_IDS, tmp, max_workers=4, include_riot=False)
+        leftovers = [name for name in os.listdir(tmp) if name.endswith('.part')]
+
+    server.shutdown()
+    name = 'async client' if use_async else 'client'
+    failures = check_results(name, server, results)
+    if leftovers:
+        print(f"❌ {name}: partial files left behind: {leftovers}")
+        failures += 1
+    return failures
+
+
+def main():
+    failures = check_retry_after()
+    failures += run(use_async=False)
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        print("aiohttp not installed, skipping the async client")
+    else:
+        failures += run(use_async=True)
+
+    print("❌ Download retries misbehaved" if failures else "✅ Downloads retried once per failure, resumed and re-fetched when corrupt")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
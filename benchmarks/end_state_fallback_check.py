@@ -0,0 +1,101 @@
+"""
+Check that a failed GRID end state download does not fail the series
+
+Serves the GRID stub with every end-state request failing (500), fetches
+a few series through PorolyticsDataCollector with a DownloadCatalog, and
+checks each series is still marked fetched, records no end state and has
+its events processed. The async client's download_series_files is checked
+the same way. Any failure exits 1.
+
+Usage (from the repo root):
+    python -m benchmarks.end_state_fallback_check
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+
+from benchmarks.grid_stub_server import StubGridHandler, StubGridServer
+from download_catalog import STATUS_FETCHED, DownloadCatalog
+from grid_data_fetcher import PorolyticsDataCollector
+
+
+class EndStateFailingHandler(StubGridHandler):
+    def do_GET(self):
+        if '/end-state/grid/' in self.path:
+            self.server.stats['end_state_500'] += 1
+            self._send(500, b'{"message": "Internal Server Error"}')
+        else:
+            super().do_GET()
+
+
+def series_metadata(series_id: str):
+    return {'id': series_id, 'tournament': {'name': 'Stub Cup'}, 'startTimeScheduled': '2024-06-01T12:00:00Z'}
+
+
+def check_collector(server, tmp: str) -> int:
+    collector = PorolyticsDataCollector('stub', requests_per_second=50)
+    collector.client.graphql_base_url = server.base_url
+    collector.client.file_download_base_url = server.base_url
+    collector.client.max_retries = 0
+
+    failures = 0
+    with DownloadCatalog(os.path.join(tmp, 'catalog.sqlite3')) as catalog:
+        for i, series_id in enumerate(('2001', '2002', '2003'), 1):
+            catalog.record_series(series_metadata(series_id), 'team')
+            series_data = collector._fetch_series(series_metadata(series_id), True, tmp, catalog)
+            collector._finish_series(i, 3, series_data, True)
+
+            status = dict(catalog.conn.execute("SELECT series_id, status FROM series").fetchall())[series_id]
+            problems = []
+            if 'download_error' in series_data:
+                problems.append(f"download_error {series_data['download_error']!r}")
+            if series_data.get('files', {}).get('end_state', 'missing') is not None:
+                problems.append("end_state is not None")
+            if series_data.get('events') != series_data.get('files', {}).get('events') or 'event_count' not in series_data:
+                problems.append("events not processed")
+            if status != STATUS_FETCHED:
+                problems.append(f"catalog status {status!r}")
+            if 'end_state' in catalog.files_for(series_id):
+                problems.append("catalog records an end state")
+            if problems:
+                print(f"❌ series {series_id}: {', '.join(problems)}")
+                failures += 1
+    return failures
+
+
+def check_async_client(server, tmp: str) -> int:
+    from grid_async_client import AsyncGridAPIClient
+
+    async def download():
+        async with AsyncGridAPIClient('stub', requests_per_second=50) as client:
+            client.file_download_base_url = server.base_url
+            client.max_retries = 0
+            return await client.download_series_files('3001', tmp, include_riot=False)
+
+    files = asyncio.run(download())
+    if files.get('end_state', 'missing') is not None or not files.get('events'):
+        print(f"❌ async client: {files}")
+        return 1
+    return 0
+
+
+def main():
+    server = StubGridServer(limit=1000)
+    server.RequestHandlerClass = EndStateFailingHandler
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        failures = check_collector(server, tmp)
+        failures += check_async_client(server, tmp)
+
+    server.shutdown()
+    print(f"\nEnd state requests failed: {server.stats['end_state_500']}")
+    print("❌ End state failures broke series" if failures else "✅ Series fetched and processed without end states")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Throughput benchmark for SignalExtractor.extract
+
+Decodes every transaction of the given events zips up front (the same way
+main.py does), then times only the extraction and reports events/sec.
+
+Usage (from the repo root):
+    python -m benchmarks.extract_bench
+    python -m benchmarks.extract_bench "matches_data/T1/*.jsonl.zip" --repeat 5
+"""
+
+import argparse
+import glob
+import sys
+import time
+import zipfile
+
+import json_backend
+from main import INPUT_PATTERN
+from signal_extractor import SignalExtractor
+
+
+def read_transactions(zip_files):
+    transactions = []
+    for zip_path in zip_files:
+        with zipfile.ZipFile(zip_path, 'r') as z:
+            for name in z.namelist():
+                with z.open(name) as f:
+                    for line in f:
+                        if line.strip():
+                            transactions.append(json_backend.loads_selective(line))
+    return transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure SignalExtractor throughput in events/sec')
+    parser.add_argument('pattern', nargs='?', default=INPUT_PATTERN, help=f'Glob of event zips (default: {INPUT_PATTERN})')
+    parser.add_argument('--limit', type=int, help='Only read the first N files')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs, best is kept (default: 3)')
+    args = parser.parse_args()
+
+    zip_files = sorted(glob.glob(args.pattern, recursive=True))[:args.limit]
+    if not zip_files:
+        print(f"No files match {args.pattern}")
+        sys.exit(1)
+
+    transactions = read_transactions(zip_files)
+    event_count = sum(len(t.get('events', [])) for t in transactions)
+    extractor = SignalExtractor()
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        signal_count = 0
+        for transaction in transactions:
+            signal_count += len(extractor.extract(transaction))
+        best = min(best, time.perf_counter() - start)
+
+    print(f"{len(zip_files)} files, {len(transactions)} transactions, {event_count} events, {signal_count} signals")
+    print(f"Extraction: {best:.3f}s, {event_count / best:,.0f} events/sec, {len(transactions) / best:,.0f} transactions/sec")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Local GRID stub server that simulates throttling, plus a harness that drives
+GridAPIClient against it to check that no series goes missing and to measure
+how close the adaptive limiter gets to the server's limit.
+
+Usage (from the repo root):
+    python -m benchmarks.grid_stub_server --limit 8 --series 200 --workers 16
+    python -m benchmarks.grid_stub_server --error-rate 0.05 --no-retry-after
+    python -m benchmarks.grid_stub_server --async --workers 64
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque, Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from grid_data_fetcher import GridAPIClient
+
+
+def make_events_zip(series_id: str, lines: int = 50) -> bytes:
+    """Build a small but valid events_<id>.jsonl.zip payload"""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as z:
+        body = "\n".join(
+            json.dumps({
+                "id": f"{series_id}-{i}",
+                "seriesId": series_id,
+                "sequenceNumber": i,
+                "occurredAt": "2024-06-01T12:00:00.000Z",
+                "events": []
+            })
+            for i in range(lines)
+        )
+        z.writestr(f"events_{series_id}.jsonl", body)
+    return buf.getvalue()
+
+
+class StubGridServer(ThreadingHTTPServer):
+    """
+    Serves the GRID endpoints GridAPIClient uses, throttled to `limit` requests/sec
+
+    Batched series state queries with more than `max_batch` aliases are
+    rejected with a complexity error, like the real API does for large queries.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, limit: float, error_rate: float = 0.0, send_retry_after: bool = True, max_batch: int = 4):
+        super().__init__(('127.0.0.1', 0), StubGridHandler)
+        self.limit = limit
+        self.max_batch = max_batch
+        self.error_rate = error_rate
+        self.send_retry_after = send_retry_after
+        self.stats = Counter()
+        self._window = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def admit(self) -> bool:
+        """Sliding one-second window rate limit"""
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0] > 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.limit:
+                return False
+            self._window.append(now)
+            return True
+
+
+class StubGridHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b'', content_type: str = 'application/json', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _gate(self) -> bool:
+        """Apply throttling / random failures; returns True if the request may proceed"""
+        server = self.server
+        server.stats['requests'] += 1
+        if not server.admit():
+            server.stats['429'] += 1
+            headers = {'Retry-After': '1'} if server.send_retry_after else {}
+            self._send(429, b'{"message": "Too Many Requests"}', headers=headers)
+            return False
+        if random.random() < server.error_rate:
+            server.stats['503'] += 1
+            self._send(503, b'{"message": "Service Unavailable"}')
+            return False
+        server.stats['ok'] += 1
+        return True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if not self._gate():
+            return
+        variables = payload.get('variables', {})
+        if 'seriesId' in variables:
+            body = {"data": {"seriesState": {"id": variables['seriesId'], "games": []}}}
+        elif len(variables) > self.server.max_batch:
+            # Aliased batch queries (s0: seriesState(id: $id0) ...) above the complexity limit
+            body = {"errors": [{"message": "Query complexity exceeds the maximum allowed"}]}
+        else:
+            body = {"data": {
+                f"s{key[2:]}": {"id": series_id, "games": []} for key, series_id in variables.items()
+            }}
+        self._send(200, json.dumps(body).encode())
+
+    def do_GET(self):
+        if not self._gate():
+            return
+        match = re.search(r'/series/(\w+)$', self.path)
+        if '/riot/' in self.path or not match:
+            self._send(404, b'{"message": "Not Found"}')
+        elif '/events/' in self.path:
+            self._send(200, make_events_zip(match.group(1)), content_type='application/zip')
+        else:
+            self._send(200, json.dumps({"seriesId": match.group(1)}).encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive GridAPIClient against a throttling GRID stub')
+    parser.add_argument('--limit', type=float, default=8, help='Server limit in requests/sec (default: 8)')
+    parser.add_argument('--series', type=int, default=100, help='Series to download (default: 100)')
+    parser.add_argument('--workers', type=int, default=16, help='Download workers (default: 16)')
+    parser.add_argument('--start-rate', type=float, default=4, help='Initial client rate (default: 4)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of random 503s (default: 0)')
+    parser.add_argument('--no-retry-after', action='store_true', help='Omit Retry-After on 429s')
+    parser.add_argument('--max-batch', type=int, default=4, help='Largest series state batch accepted (default: 4)')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Drive AsyncGridAPIClient instead')
+    args = parser.parse_args()
+
+    server = StubGridServer(args.limit, args.error_rate, not args.no_retry_after, args.max_batch)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    if args.use_async:
+        from grid_async_client import AsyncGridAPIClient
+        client = AsyncGridAPIClient('stub', requests_per_second=args.start_rate, pool_size=args.workers)
+    else:
+        client = GridAPIClient('stub', requests_per_second=args.start_rate, pool_size=args.workers)
+    client.graphql_base_url = server.base_url
+    client.file_download_base_url = server.base_url
+
+    async def fetch_async(tmp):
+        async with client:
+            states = await client.get_series_states(series_ids)
+            results = await client.download_many_series(series_ids, tmp, max_workers=args.workers, include_riot=False)
+        return states, results
+
+    series_ids = [str(1000 + i) for i in range(args.series)]
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.monotonic()
+        if args.use_async:
+            states, results = asyncio.run(fetch_async(tmp))
+        else:
+            states = client.get_series_states(series_ids)
+            results = client.download_many_series(series_ids, tmp, max_workers=args.workers, include_riot=False)
+        elapsed = time.monotonic() - start
+
+    server.shutdown()
+    failed = [series_id for series_id, result in results.items() if result['error']]
+    failed += [series_id for series_id, state in states.items() if state is None]
+
+    print(f"\n{'='*60}")
+    print(f"Series: {len(series_ids)} ({len(failed)} failed)")
+    print(f"Elapsed: {elapsed:.1f}s")
+    print(f"Server: {dict(server.stats)}")
+    print(f"Goodput: {server.stats['ok'] / elapsed:.2f} req/s (limit {args.limit})")
+    print(f"Final client rate: {client.rate_limiter.rate:.2f} req/s")
+    print(f"{'='*60}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Check that DownloadCatalog.import_folder links already known series to the team
+
+Imports two teams' legacy folders sharing a series into a temp catalog:
+the shared series must be imported once, keep its files and metadata,
+and still show up in the second team's series and manifest. Any failure
+exits 1.
+
+Usage (from the repo root):
+    python -m benchmarks.import_folder_check
+"""
+
+import os
+import sys
+import tempfile
+import zipfile
+
+from download_catalog import DownloadCatalog
+
+
+def write_events_zip(folder: str, series_id: str):
+    os.makedirs(folder, exist_ok=True)
+    with zipfile.ZipFile(os.path.join(folder, f"events_{series_id}.jsonl.zip"), 'w') as zf:
+        zf.writestr(f"events_{series_id}.jsonl", '{"events": []}\n')
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        team_a, team_b = os.path.join(tmp, 'Team A'), os.path.join(tmp, 'Team B')
+        for folder, series_ids in [(team_a, ('6001', '6002')), (team_b, ('6002', '6003'))]:
+            for series_id in series_ids:
+                write_events_zip(folder, series_id)
+
+        with DownloadCatalog(os.path.join(tmp, 'catalog.sqlite3')) as catalog:
+            catalog.record_series({'id': '6002', 'tournament': {'name': 'Stub Cup'}}, 'a', 'Team A')
+            imported = [catalog.import_folder(team_a, 'a', 'Team A'), catalog.import_folder(team_b, 'b', 'Team B')]
+            if imported != [2, 1]:
+                print(f"❌ imported {imported} series, expected [2, 1]")
+                failures += 1
+
+            if sorted(catalog.team_series_ids('b')) != ['6002', '6003']:
+                print(f"❌ Team B series: {sorted(catalog.team_series_ids('b'))}")
+                failures += 1
+
+            shared = {entry['series_id']: entry for entry in catalog.team_manifest('b')}.get('6002', {})
+            if shared.get('tournament') != 'Stub Cup' or shared.get('files', {}).get('events') != os.path.join(team_a, 'events_6002.jsonl.zip'):
+                print(f"❌ shared series in Team B's manifest: {shared}")
+                failures += 1
+
+    print("❌ Already known series not linked" if failures else "✅ Already known series linked to every importing team")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Microbenchmark for json_backend on a GRID events file
+
+Decodes every line of an events zip with stdlib json, with the json_backend
+decoder (orjson when installed) and with its selective mode, and reports
+throughput plus the memory still held by the decoded transactions.
+
+Usage (from the repo root):
+    python -m benchmarks.json_decode_bench matches_data/T1/events_2847265.jsonl.zip
+    python -m benchmarks.json_decode_bench            # first events zip under matches_data/
+"""
+
+import argparse
+import glob
+import json
+import sys
+import time
+import tracemalloc
+import zipfile
+
+import json_backend
+
+
+def read_lines(zip_path: str):
+    with zipfile.ZipFile(zip_path, 'r') as z:
+        with z.open(z.namelist()[0]) as f:
+            return [line for line in f if line.strip()]
+
+
+def time_decoder(decode, lines, repeat: int) -> float:
+    """Best wall time over `repeat` runs of decoding every line"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            decode(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained_bytes(decode, lines) -> int:
+    """Memory held by the decoded transactions once every line is decoded"""
+    tracemalloc.start()
+    decoded = [decode(line) for line in lines]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del decoded
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare JSON decoders on a GRID events file')
+    parser.add_argument('path', nargs='?', help='events .jsonl.zip (default: first one under matches_data/)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per decoder, best is kept (default: 3)')
+    args = parser.parse_args()
+
+    path = args.path or next(iter(sorted(glob.glob('matches_data/**/*.jsonl.zip', recursive=True))), None)
+    if not path:
+        print("No events file given and none found under matches_data/")
+        sys.exit(1)
+
+    lines = read_lines(path)
+    total_mb = sum(len(line) for line in lines) / 1e6
+    print(f"{path}: {len(lines)} lines, {total_mb:.1f} MB uncompressed (backend: {json_backend.BACKEND})\n")
+
+    decoders = [
+        ('json.loads', json.loads),
+        (f'json_backend.loads ({json_backend.BACKEND})', json_backend.loads),
+        ('json_backend.loads_selective', json_backend.loads_selective),
+    ]
+
+    baseline = None
+    print(f"{'decoder':<36} {'seconds':>8} {'MB/s':>8} {'speedup':>8} {'retained MB':>12}")
+    for name, decode in decoders:
+        elapsed = time_decoder(decode, lines, args.repeat)
+        baseline = baseline or elapsed
+        retained = retained_bytes(decode, lines) / 1e6
+        print(f"{name:<36} {elapsed:>8.3f} {total_mb / elapsed:>8.1f} {baseline / elapsed:>7.2f}x {retained:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
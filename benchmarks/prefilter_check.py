@@ -0,0 +1,79 @@
+"""
+Correctness check and timing for the step-1 raw-line pre-filter
+
+Extracts signals from each events zip twice, once decoding every line and
+once skipping the lines SignalExtractor.may_have_signals rejects, and checks
+that both produce exactly the same signals. Exits 1 on any difference.
+
+Usage (from the repo root):
+    python -m benchmarks.prefilter_check
+    python -m benchmarks.prefilter_check "matches_data/T1/*.jsonl.zip" --limit 20
+"""
+
+import argparse
+import glob
+import sys
+import time
+import zipfile
+
+from main import INPUT_PATTERN, process_file, extractor
+
+
+def line_counts(zip_path: str):
+    """(non-blank lines, lines passing the pre-filter)"""
+    total = kept = 0
+    with zipfile.ZipFile(zip_path, 'r') as z:
+        for name in z.namelist():
+            with z.open(name) as f:
+                for line in f:
+                    if line.strip():
+                        total += 1
+                        kept += extractor.may_have_signals(line)
+    return total, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the raw-line pre-filter against the full-parse path')
+    parser.add_argument('pattern', nargs='?', default=INPUT_PATTERN, help=f'Glob of event zips (default: {INPUT_PATTERN})')
+    parser.add_argument('--limit', type=int, help='Only check the first N files')
+    args = parser.parse_args()
+
+    zip_files = sorted(glob.glob(args.pattern, recursive=True))[:args.limit]
+    if not zip_files:
+        print(f"No files match {args.pattern}")
+        sys.exit(1)
+
+    mismatches = []
+    total_lines = kept_lines = signal_count = 0
+    full_time = filtered_time = 0.0
+
+    for zip_path in zip_files:
+        start = time.perf_counter()
+        full = process_file(zip_path, prefilter=False)
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        filtered = process_file(zip_path, prefilter=True)
+        filtered_time += time.perf_counter() - start
+
+        total, kept = line_counts(zip_path)
+        total_lines += total
+        kept_lines += kept
+        signal_count += len(full)
+
+        if full != filtered:
+            mismatches.append(zip_path)
+            print(f"❌ {zip_path}: {len(full)} signals with full parse, {len(filtered)} with pre-filter")
+
+    print(f"\n{'='*60}")
+    print(f"Files: {len(zip_files)} ({len(mismatches)} mismatched)")
+    print(f"Signals: {signal_count}")
+    print(f"Lines decoded: {kept_lines}/{total_lines} ({100 * (1 - kept_lines / max(total_lines, 1)):.1f}% skipped)")
+    print(f"Full parse: {full_time:.2f}s, pre-filtered: {filtered_time:.2f}s "
+          f"({full_time / max(filtered_time, 1e-9):.2f}x)")
+    print(f"{'='*60}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Check that a team's sync cursor moves over attempted, already played series
+
+Lists a team's series (out of order, as allSeries may return them) into a
+temp DownloadCatalog and simulates syncs: one old series keeps failing, one
+is never attempted and one is not played yet. The cursor must move past
+the failed series, stop before the never attempted and future ones, and
+never move backwards; the failed series must stay on the retry list until
+MAX_FETCH_ATTEMPTS. Any failure exits 1.
+
+Usage (from the repo root):
+    python -m benchmarks.sync_cursor_check
+"""
+
+import os
+import sys
+import tempfile
+
+from download_catalog import MAX_FETCH_ATTEMPTS, DownloadCatalog
+from time_utils import iso_to_ms
+
+NOW_MS = iso_to_ms('2024-06-10T00:00:00Z')
+
+LISTING = [
+    {'id': '5003', 'startTimeScheduled': '2024-06-03T12:00:00Z'},
+    {'id': '5001', 'startTimeScheduled': '2024-06-01T12:00:00Z'},
+    {'id': '5005', 'startTimeScheduled': '2024-06-12T12:00:00Z'},  # future
+    {'id': '5002', 'startTimeScheduled': '2024-06-02T12:00:00Z'},  # keeps failing
+    {'id': '5004', 'startTimeScheduled': '2024-06-09T12:00:00Z'},
+    {'id': '5006'},  # never scheduled
+]
+
+
+def sync(catalog: DownloadCatalog, fetched, failed, now_ms: int = NOW_MS):
+    for series_id in fetched:
+        catalog.mark_fetched(series_id, {})
+    for series_id in failed:
+        catalog.mark_failed(series_id, 'HTTP 404')
+    catalog.advance_sync_cursor('team', LISTING, now_ms)
+    return catalog.get_sync_cursor('team')
+
+
+def main():
+    failures = 0
+
+    def expect(what, value, expected):
+        nonlocal failures
+        if value != expected:
+            print(f"❌ {what}: {value!r}, expected {expected!r}")
+            failures += 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DownloadCatalog(os.path.join(tmp, 'catalog.sqlite3')) as catalog:
+            catalog.record_many_series(LISTING, 'team')
+            catalog.advance_sync_cursor('team', LISTING, NOW_MS)
+            expect("nothing attempted", catalog.get_sync_cursor('team'), None)
+
+            # 5004 is left pending: the cursor moves past failed 5002 and stops before it
+            expect("first sync", sync(catalog, ['5001', '5003'], ['5002']), '2024-06-03T12:00:00Z')
+            expect("second sync", sync(catalog, [], ['5002']), '2024-06-03T12:00:00Z')
+            expect("retry list", catalog.unfetched_series_ids('team').count('5002'), 1)
+
+            # 5005 is not played yet, even once attempted
+            expect("third sync", sync(catalog, ['5004', '5005'], ['5002']), '2024-06-09T12:00:00Z')
+            expect("after it was played", sync(catalog, [], [], iso_to_ms('2024-06-13T00:00:00Z')), '2024-06-12T12:00:00Z')
+
+            catalog.conn.execute("DELETE FROM team_sync")
+            catalog.conn.execute("INSERT INTO team_sync VALUES ('team', '2024-06-20T00:00:00Z', NULL)")
+            expect("never backwards", sync(catalog, [], []), '2024-06-20T00:00:00Z')
+
+            for _ in range(MAX_FETCH_ATTEMPTS - 3):
+                catalog.mark_failed('5002', 'HTTP 404')
+            expect("retry list after the last attempt", '5002' in catalog.unfetched_series_ids('team'), False)
+
+    print("❌ Sync cursor misplaced" if failures else "✅ Sync cursor moves past failed series and stops before upcoming ones")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Sweep the step-1 clustering parameters
+
+Clusters the same signals under every combination of the given time
+window, distance, max window and minimum event values and reports the
+encounter counts and quality mix of each, without re-running step 1 per
+value. Each game is sorted and its candidate links found once, at the
+widest setting (EncounterClusterer.sweep_game, needs numpy).
+
+Usage:
+    python cluster_sweep.py --load-table signals.npz --time-eps 8000,12000,16000 --dist-eps 1200,1800,2400
+    python cluster_sweep.py --input "matches_data/**/*.jsonl.zip" --min-events 2,3 --output sweep.json
+"""
+
+import argparse
+import glob
+import itertools
+import json
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from encounter_clusterer import (
+    DIST_EPS, MAX_WINDOW_MS, MIN_EVENTS, TIME_EPS_MS, ClusterConfig, EncounterClusterer,
+)
+from main import INPUT_PATTERN, group_series_files, iter_game_signals, iter_series_signals
+from signal_table import SignalTable
+
+QUALITIES = ("HIGH", "MED", "LOW")
+
+
+def config_grid(time_eps: List[int], dist_eps: List[float], max_window: List[int], min_events: List[int]) -> List[ClusterConfig]:
+    """Every combination of the values, in a stable order"""
+    return [
+        ClusterConfig(time_eps_ms=t, dist_eps=d, max_window_ms=w, min_events=m)
+        for t, d, w, m in itertools.product(time_eps, dist_eps, max_window, min_events)
+    ]
+
+
+def sweep(games: Iterable[Tuple], configs: List[ClusterConfig], clusterer: EncounterClusterer = None) -> Dict[ClusterConfig, Dict]:
+    """
+    Encounter statistics per config over a stream of (game_id, signals)
+
+    encounters counts the encounters kept after the LOW-quality merge and
+    quality splits every clustered encounter into HIGH / MED / LOW (the LOW
+    ones being merged into a neighbour or dropped); events_per_encounter is
+    the mean size of the kept encounters.
+    """
+    clusterer = clusterer or EncounterClusterer()
+    stats = {config: {"encounters": 0, "quality": Counter(), "events": 0} for config in configs}
+    game_count = 0
+
+    for game_id, signals in games:
+        game_count += 1
+        for config, (encounters, clustered) in clusterer.sweep_game(game_id, signals, configs).items():
+            s = stats[config]
+            s["encounters"] += len(encounters)
+            s["quality"].update(e.quality for e in encounters)
+            s["quality"]["LOW"] += clustered - len(encounters)
+            s["events"] += sum(len(e.event_ids) for e in encounters)
+
+    return {
+        config: {
+            "games": game_count,
+            "encounters": s["encounters"],
+            "quality": {q: s["quality"].get(q, 0) for q in QUALITIES},
+            "events_per_encounter": s["events"] / s["encounters"] if s["encounters"] else 0.0,
+        }
+        for config, s in stats.items()
+    }
+
+
+def print_report(report: Dict[ClusterConfig, Dict]):
+    print(f"{'time_eps':>9} {'dist_eps':>9} {'max_win':>8} {'min_ev':>6} | {'encounters':>10} {'HIGH':>7} {'MED':>7} {'LOW':>7} {'ev/enc':>7}")
+    for config, r in report.items():
+        print(
+            f"{config.time_eps_ms:>9} {config.dist_eps:>9g} {config.max_window_ms:>8} {config.min_events:>6} | "
+            f"{r['encounters']:>10} {r['quality']['HIGH']:>7} {r['quality']['MED']:>7} {r['quality']['LOW']:>7} {r['events_per_encounter']:>7.1f}"
+        )
+
+
+def int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",")]
+
+
+def float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report encounter counts and quality for a grid of clustering parameters')
+    parser.add_argument('--input', default=INPUT_PATTERN, help=f'Glob of event zips (default: {INPUT_PATTERN})')
+    parser.add_argument('--load-table', metavar='NPZ', help='Sweep the signals of a saved SignalTable instead of reading --input')
+    parser.add_argument('--workers', type=int, default=1, help='Processes extracting files in parallel (default: 1)')
+    parser.add_argument('--time-eps', type=int_list, default=[TIME_EPS_MS], help=f'Comma-separated time eps values in ms (default: {TIME_EPS_MS})')
+    parser.add_argument('--dist-eps', type=float_list, default=[DIST_EPS], help=f'Comma-separated distance eps values (default: {DIST_EPS})')
+    parser.add_argument('--max-window', type=int_list, default=[MAX_WINDOW_MS], help=f'Comma-separated max window values in ms (default: {MAX_WINDOW_MS})')
+    parser.add_argument('--min-events', type=int_list, default=[MIN_EVENTS], help=f'Comma-separated minimum events per encounter (default: {MIN_EVENTS})')
+    parser.add_argument('--output', help='Also write the report as JSON')
+    args = parser.parse_args()
+
+    configs = config_grid(args.time_eps, args.dist_eps, args.max_window, args.min_events)
+    print(f"Sweeping {len(configs)} clustering configs...")
+
+    if args.load_table:
+        table = SignalTable.load(args.load_table)
+        games = ((game_id, table.to_signals(rows)) for game_id, rows in table.game_slices())
+    else:
+        series_files = group_series_files(sorted(glob.glob(args.input, recursive=True)))
+        print(f"Found {len(series_files)} series.")
+        games = iter_game_signals(iter_series_signals(series_files, args.workers))
+
+    report = sweep(games, configs)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([{"config": vars(config), **r} for config, r in report.items()], f, indent=2)
+        print(f"Saved sweep report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
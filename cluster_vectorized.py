@@ -0,0 +1,184 @@
+"""
+Vectorized time/distance linkage for EncounterClusterer's "numpy" backend
+
+Works on the columns of one game (timestamps sorted ascending, positions
+with NaN where unknown) and returns the connected components of the same
+linkage the pure-Python clusterer builds: two signals are linked when they
+are at most window_ms apart and either one has no position or they are at
+most dist_eps apart.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for the numpy backend
+    np = None
+
+# Candidate pairs materialised at once; bounds memory during dense fights
+DEFAULT_MAX_PAIRS = 1 << 21
+
+# The 3 x 3 block of cells around a cell
+NEIGHBOUR_CELLS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
+
+def merge_edges(labels: "np.ndarray", a: "np.ndarray", b: "np.ndarray") -> "np.ndarray":
+    """
+    Fold edges (a[k], b[k]) into component labels
+
+    labels must map every index to its component's smallest index, and so
+    does the result: roots are hooked onto the smaller label, then pointers
+    are jumped until every label is a root again.
+    """
+    while len(a):
+        la, lb = labels[a], labels[b]
+        pending = la != lb
+        if not pending.any():
+            break
+        a, b, la, lb = a[pending], b[pending], la[pending], lb[pending]
+
+        low = np.minimum(la, lb)
+        np.minimum.at(labels, la, low)
+        np.minimum.at(labels, lb, low)
+
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    return labels
+
+
+def _expand_ranges(starts: "np.ndarray", counts: "np.ndarray"):
+    """(row, position) for every position in each [starts[row], starts[row] + counts[row])"""
+    rows = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, starts[rows] + offsets
+
+
+def _chain_unpositioned(t: "np.ndarray", positioned: "np.ndarray", window_ms: int):
+    """
+    Edges linking every unpositioned signal to the whole time-sorted run within
+    window_ms around it, as a chain of consecutive indices
+    """
+    unpositioned = np.flatnonzero(~positioned)
+    if not len(unpositioned):
+        return unpositioned, unpositioned
+    first = np.searchsorted(t, t[unpositioned] - window_ms, 'left')
+    last = np.searchsorted(t, t[unpositioned] + window_ms, 'right') - 1
+    cover = np.zeros(len(t) + 1, dtype=np.int64)
+    np.add.at(cover, first, 1)
+    np.add.at(cover, last, -1)
+    chained = np.flatnonzero(np.cumsum(cover[:-1]) > 0)
+    return chained, chained + 1
+
+
+def _iter_close_pairs(t, xs, ys, positioned, window_ms: int, dist_eps: float, max_pairs: int):
+    """
+    Chunks (a, b) of positioned pairs at most window_ms and dist_eps apart
+
+    Positions are hashed into dist_eps cells and each signal is looked up in
+    the cells around it, within +-window_ms, through one sorted (cell, time) key.
+    """
+    members = np.flatnonzero(positioned)
+    if len(members) < 2:
+        return
+
+    px, py, pt = xs[members], ys[members], t[members]
+    cell_x = np.floor(px / dist_eps).astype(np.int64)
+    cell_y = np.floor(py / dist_eps).astype(np.int64)
+    cell_x -= cell_x.min() - 1  # keep a free row/column on each side
+    cell_y -= cell_y.min() - 1
+    height = int(cell_y.max()) + 2
+    cells = cell_x * height + cell_y
+
+    # Times shifted so every +-window_ms query stays inside its cell's key block
+    shifted = pt - pt.min() + window_ms
+    span = int(shifted.max()) + window_ms + 1
+    keys = cells * span + shifted
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    # Each pair of neighbouring cells is searched once, from the lower cell: the
+    # cell itself and the 4 neighbours with a larger cell number. Querying in
+    # key order keeps every offset's queries sorted, which searchsorted favours.
+    offsets = np.array([dx * height + dy for dx, dy in NEIGHBOUR_CELLS if dx * height + dy >= 0], dtype=np.int64)
+    query = (sorted_keys[None, :] + offsets[:, None] * span).ravel()
+    query_rows = np.tile(order, len(offsets))
+    starts = np.searchsorted(sorted_keys, query - window_ms, 'left')
+    counts = np.searchsorted(sorted_keys, query + window_ms, 'right') - starts
+    same_cell = np.repeat(offsets == 0, len(order))
+
+    # Split the queries so no chunk materialises more than max_pairs pairs
+    totals = np.cumsum(counts)
+    bounds = np.searchsorted(totals, np.arange(max_pairs, int(totals[-1]), max_pairs), 'right')
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(counts)]):
+        rows, positions = _expand_ranges(starts[lo:hi], counts[lo:hi])
+        a = query_rows[lo:hi][rows]
+        b = order[positions]
+        keep = (a < b) | ~same_cell[lo:hi][rows]  # within a cell every pair is found from both ends
+        a, b = a[keep], b[keep]
+        close = np.sqrt((px[a] - px[b]) ** 2 + (py[a] - py[b]) ** 2) <= dist_eps
+        yield members[a[close]], members[b[close]]
+
+
+def _columns(timestamps, xs, ys):
+    if np is None:
+        raise ImportError("The numpy clustering backend requires numpy (pip install numpy)")
+
+    t = np.asarray(timestamps, dtype=np.int64)
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    return t, xs, ys, ~(np.isnan(xs) | np.isnan(ys))
+
+
+def link_components(timestamps, xs, ys, window_ms: int, dist_eps: float, max_pairs: int = DEFAULT_MAX_PAIRS) -> "np.ndarray":
+    """
+    Component label (smallest member index) of each signal of one game
+
+    timestamps must be sorted ascending; xs / ys are float arrays with NaN
+    for unknown coordinates.
+    """
+    t, xs, ys, positioned = _columns(timestamps, xs, ys)
+    labels = np.arange(len(t))
+    if len(t) < 2:
+        return labels
+
+    labels = merge_edges(labels, *_chain_unpositioned(t, positioned, window_ms))
+    for a, b in _iter_close_pairs(t, xs, ys, positioned, window_ms, dist_eps, max_pairs):
+        labels = merge_edges(labels, a, b)
+    return labels
+
+
+class PairIndex:
+    """
+    Linkage of one game for a sweep over several (window_ms, dist_eps)
+
+    Finds the positioned pairs once at the widest window and distance of
+    the sweep and keeps their time gaps and distances, so each narrower
+    setting only filters them. Unpositioned signals are re-chained per
+    setting, which only needs the sorted timestamps.
+    """
+
+    def __init__(self, timestamps, xs, ys, window_ms: int, dist_eps: float, max_pairs: int = DEFAULT_MAX_PAIRS):
+        self.t, xs, ys, self.positioned = _columns(timestamps, xs, ys)
+        self.window_ms = window_ms
+        self.dist_eps = dist_eps
+
+        chunks = list(_iter_close_pairs(self.t, xs, ys, self.positioned, window_ms, dist_eps, max_pairs))
+        empty = np.empty(0, dtype=np.int64)
+        self.a = np.concatenate([a for a, _ in chunks]) if chunks else empty
+        self.b = np.concatenate([b for _, b in chunks]) if chunks else empty
+        self.gap_ms = np.abs(self.t[self.b] - self.t[self.a])
+        self.dist = np.sqrt((xs[self.a] - xs[self.b]) ** 2 + (ys[self.a] - ys[self.b]) ** 2)
+
+    def components(self, window_ms: int, dist_eps: float) -> "np.ndarray":
+        """Same labels as link_components(..., window_ms, dist_eps)"""
+        if window_ms > self.window_ms or dist_eps > self.dist_eps:
+            raise ValueError(f"({window_ms}, {dist_eps}) is wider than the index ({self.window_ms}, {self.dist_eps})")
+
+        labels = np.arange(len(self.t))
+        if len(self.t) < 2:
+            return labels
+
+        labels = merge_edges(labels, *_chain_unpositioned(self.t, self.positioned, window_ms))
+        keep = (self.gap_ms <= window_ms) & (self.dist <= dist_eps)
+        return merge_edges(labels, self.a[keep], self.b[keep])
@@ -0,0 +1,348 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from grid_data_fetcher import is_valid_zip
+from time_utils import iso_to_ms
+
+DEFAULT_CATALOG_PATH = os.path.join('matches_data', 'catalog.sqlite3')
+
+STATUS_PENDING = 'pending'
+STATUS_FETCHED = 'fetched'
+STATUS_FAILED = 'failed'
+
+# Failed series are retried on every sync until they failed this many times
+MAX_FETCH_ATTEMPTS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    series_id   TEXT PRIMARY KEY,
+    tournament  TEXT,
+    start_time  TEXT,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    error       TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    updated_at  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_series_status ON series(status);
+
+CREATE TABLE IF NOT EXISTS series_teams (
+    team_id     TEXT NOT NULL,
+    series_id   TEXT NOT NULL REFERENCES series(series_id),
+    team_name   TEXT,
+    PRIMARY KEY (team_id, series_id)
+);
+
+CREATE TABLE IF NOT EXISTS files (
+    series_id   TEXT NOT NULL REFERENCES series(series_id),
+    kind        TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    size        INTEGER,
+    sha256      TEXT,
+    PRIMARY KEY (series_id, kind)
+);
+
+CREATE TABLE IF NOT EXISTS team_sync (
+    team_id         TEXT PRIMARY KEY,
+    last_start_time TEXT NOT NULL,
+    synced_at       TEXT
+);
+"""
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadCatalog:
+    """
+    Persistent SQLite catalog of everything downloaded into matches_data/
+
+    Each series is stored once, whatever number of teams it belongs to:
+    `series` holds metadata and fetch status, `series_teams` links series to
+    teams, and `files` records the path, size and hash of each downloaded file.
+    Safe to share between worker threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(series)")}
+        if 'attempts' not in columns:  # catalogs created before failed attempts were counted
+            self.conn.execute("ALTER TABLE series ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _now(self) -> str:
+        return datetime.now().isoformat()
+
+    # ----------------------
+    # Writes
+
+    def record_series(self, series: Dict, team_id: str, team_name: Optional[str] = None):
+        """Upsert series metadata (as returned by allSeries) and link it to a team"""
+        self.record_many_series([series], team_id, team_name)
+
+    def record_many_series(self, series_list: Iterable[Dict], team_id: str, team_name: Optional[str] = None):
+        rows = [
+            (
+                s['id'],
+                (s.get('tournament') or {}).get('name'),
+                s.get('startTimeScheduled'),
+                self._now()
+            )
+            for s in series_list
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO series (series_id, tournament, start_time, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(series_id) DO UPDATE SET
+                    tournament = COALESCE(excluded.tournament, series.tournament),
+                    start_time = COALESCE(excluded.start_time, series.start_time)
+                """,
+                rows
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO series_teams (team_id, series_id, team_name) VALUES (?, ?, ?)",
+                [(team_id, row[0], team_name) for row in rows]
+            )
+
+    def mark_fetched(self, series_id: str, files: Dict[str, Optional[str]]):
+        """Record downloaded files (kind -> path, None for unavailable) and mark the series fetched"""
+        rows = [
+            (series_id, kind, path, os.path.getsize(path), file_sha256(path))
+            for kind, path in files.items()
+            if path
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files (series_id, kind, path, size, sha256) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.execute(
+                """
+                INSERT INTO series (series_id, status, error, updated_at) VALUES (?, ?, NULL, ?)
+                ON CONFLICT(series_id) DO UPDATE SET
+                    status = excluded.status, error = NULL, updated_at = excluded.updated_at
+                """,
+                (series_id, STATUS_FETCHED, self._now())
+            )
+
+    def mark_failed(self, series_id: str, error: str):
+        """Mark a series failed and count the attempt (see MAX_FETCH_ATTEMPTS)"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO series (series_id, status, error, attempts, updated_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(series_id) DO UPDATE SET
+                    status = excluded.status, error = excluded.error,
+                    attempts = series.attempts + 1, updated_at = excluded.updated_at
+                """,
+                (series_id, STATUS_FAILED, error, self._now())
+            )
+
+    # ----------------------
+    # Queries
+
+    def fetched_series_ids(self) -> Set[str]:
+        """IDs of every series whose files are already on disk (single indexed query)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT series_id FROM series WHERE status = ?", (STATUS_FETCHED,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def files_for(self, series_id: str) -> Dict[str, str]:
+        """kind -> path for a fetched series"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT kind, path FROM files WHERE series_id = ?", (series_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def team_series_ids(self, team_id: str) -> List[str]:
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT st.series_id FROM series_teams st
+                JOIN series s ON s.series_id = st.series_id
+                WHERE st.team_id = ?
+                ORDER BY s.start_time DESC
+                """,
+                (team_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def team_manifest(self, team_id: str) -> List[Dict]:
+        """Every series linked to a team with its status and files (kind -> path), newest first"""
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT s.series_id, s.tournament, s.start_time, s.status FROM series_teams st
+                JOIN series s ON s.series_id = st.series_id
+                WHERE st.team_id = ?
+                ORDER BY s.start_time DESC
+                """,
+                (team_id,)
+            ).fetchall()
+            file_rows = self.conn.execute(
+                """
+                SELECT f.series_id, f.kind, f.path FROM files f
+                JOIN series_teams st ON st.series_id = f.series_id
+                WHERE st.team_id = ?
+                """,
+                (team_id,)
+            ).fetchall()
+
+        files = {}
+        for series_id, kind, path in file_rows:
+            files.setdefault(series_id, {})[kind] = path
+        return [
+            {
+                'series_id': series_id,
+                'tournament': tournament,
+                'start_time': start_time,
+                'status': status,
+                'files': files.get(series_id, {})
+            }
+            for series_id, tournament, start_time, status in rows
+        ]
+
+    def unfetched_series_ids(self, team_id: str) -> List[str]:
+        """
+        Series linked to a team that are still pending or failed (retried on the next sync)
+
+        Series that failed MAX_FETCH_ATTEMPTS times (e.g. events GRID never
+        serves) are given up on.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT st.series_id FROM series_teams st
+                JOIN series s ON s.series_id = st.series_id
+                WHERE st.team_id = ? AND s.status != ? AND s.attempts < ?
+                """,
+                (team_id, STATUS_FETCHED, MAX_FETCH_ATTEMPTS)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # ----------------------
+    # Incremental sync cursors
+
+    def get_sync_cursor(self, team_id: str) -> Optional[str]:
+        """startTimeScheduled a team is synced up to, or None if it was never synced"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_start_time FROM team_sync WHERE team_id = ?", (team_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def advance_sync_cursor(
+        self,
+        team_id: str,
+        series_list: Iterable[Dict],
+        now_ms: Optional[int] = None
+    ):
+        """
+        Move a team's cursor forward over the series of `series_list` that were attempted (never backwards)
+
+        Series are walked oldest first and the cursor stops before the first
+        one that was never attempted (still pending or unknown to the catalog)
+        or is scheduled after now, so those are listed again on the next sync.
+        Failed series do not hold it back: unfetched_series_ids() retries them.
+        """
+        now_ms = iso_to_ms(datetime.now(timezone.utc).isoformat()) if now_ms is None else now_ms
+        with self._lock:
+            attempted_ids = {
+                row[0] for row in self.conn.execute(
+                    "SELECT series_id FROM series WHERE status IN (?, ?)", (STATUS_FETCHED, STATUS_FAILED)
+                )
+            }
+        scheduled = sorted(
+            (iso_to_ms(s['startTimeScheduled']), s['startTimeScheduled'], s['id'])
+            for s in series_list if s.get('startTimeScheduled')
+        )
+
+        newest = None
+        for start_ms, start_time, series_id in scheduled:
+            if series_id not in attempted_ids or start_ms > now_ms:
+                break
+            newest = start_time
+        if newest is None:
+            return
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO team_sync (team_id, last_start_time, synced_at) VALUES (?, ?, ?)
+                ON CONFLICT(team_id) DO UPDATE SET
+                    last_start_time = MAX(team_sync.last_start_time, excluded.last_start_time),
+                    synced_at = excluded.synced_at
+                """,
+                (team_id, newest, self._now())
+            )
+
+    # ----------------------
+    # Migration
+
+    def import_folder(self, folder: str, team_id: str, team_name: Optional[str] = None) -> int:
+        """
+        Register files downloaded before the catalog existed
+
+        Only valid events zips are imported, together with any matching end
+        state files; series already in the catalog are only linked to the
+        team, their files are left alone. Returns the number of series imported.
+        """
+        if not os.path.isdir(folder):
+            return 0
+
+        known = self.fetched_series_ids()
+        already_known = []
+        imported = 0
+        for name in os.listdir(folder):
+            if not (name.startswith('events_') and name.endswith('.jsonl.zip')) or name.endswith('_riot.jsonl.zip'):
+                continue
+            series_id = name[len('events_'):-len('.jsonl.zip')]
+            if series_id in known:
+                already_known.append({'id': series_id})
+                continue
+            events_path = os.path.join(folder, name)
+            if not is_valid_zip(events_path):
+                continue
+
+            files = {'events': events_path}
+            for kind, other in [
+                ('end_state', f"end_state_{series_id}_grid.json"),
+                ('riot_events', f"events_{series_id}_riot.jsonl.zip"),
+                ('riot_end_state', f"end_state_{series_id}_riot.json.zip"),
+            ]:
+                other_path = os.path.join(folder, other)
+                if os.path.exists(other_path):
+                    files[kind] = other_path
+
+            self.record_series({'id': series_id}, team_id, team_name)
+            self.mark_fetched(series_id, files)
+            imported += 1
+
+        # Another team's folder may have imported them first: still record this team played them
+        self.record_many_series(already_known, team_id, team_name)
+        return imported
@@ -1,7 +1,11 @@
+import re
 from collections import defaultdict, deque
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from geo import distance
 from encounter import Encounter
+import cluster_vectorized
 
 # Parameters
 TIME_EPS_MS = 12_000
@@ -9,233 +13,409 @@ DIST_EPS = 1800
 MAX_WINDOW_MS = 30_000
 MIN_EVENTS = 2
 
+# Linkage engines: "python" walks the signals through a spatial hash, "numpy"
+# links a whole game at once over arrays (needs numpy). Both give the same encounters.
+BACKENDS = ("python", "numpy")
+
+# Zone of a cluster without positions, from keywords in its events' type, sub type
+# and id; checked per event in this order, the first match wins
+ZONE_KEYWORDS = (
+    ("MID_LANE", re.compile("mid")),
+    ("BOT_LANE", re.compile("bot")),
+    ("TOP_LANE", re.compile("top")),
+    ("RIVER", re.compile("dragon|drake|chemtech|infernal|mountain|ocean|cloud|elder|herald|baron|nashor|void")),
+)
+
+# Objective mapping for centroids
+OBJECTIVE_POSITIONS = {
+    "RIVER": (7500, 7500),
+    "MID_LANE": (7500, 7500),
+    "TOP_LANE": (3000, 12000),
+    "BOT_LANE": (12000, 3000),
+}
+
+# Games queued per worker process in parallel clustering; bounds how far a lazy
+# stream of games is read ahead
+GAMES_IN_FLIGHT_PER_WORKER = 4
+
+def is_real_player(pid) -> bool:
+    return pid is not None and pid.isdigit()
+
+def infer_location_from_events(events) -> str:
+    for e in events:
+        # Newline-separated, so no keyword can match across two fields
+        text = f"{e.raw_type}\n{str(e.sub_type or '').lower()}\n{str(e.id).lower()}"
+        for zone, keywords in ZONE_KEYWORDS:
+            if keywords.search(text):
+                return zone
+
+    return "UNKNOWN"
+
+@dataclass(frozen=True)
+class ClusterConfig:
+    """
+    Clustering parameters (defaults: the module constants) and linkage engine
+
+    Two signals are linked when they are at most min(time_eps_ms,
+    max_window_ms) apart and either one has no position or they are at most
+    dist_eps apart; components with fewer than min_events signals are
+    dropped. Frozen, so configs can key sweep results.
+    """
+    time_eps_ms: int = TIME_EPS_MS
+    dist_eps: float = DIST_EPS
+    max_window_ms: int = MAX_WINDOW_MS
+    min_events: int = MIN_EVENTS
+    backend: str = "python"
+
+    def __post_init__(self):
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown clustering backend {self.backend!r}, expected one of {BACKENDS}")
+        if self.dist_eps <= 0:
+            raise ValueError(f"dist_eps must be positive, got {self.dist_eps}")
+
+    @property
+    def window_ms(self) -> int:
+        return min(self.time_eps_ms, self.max_window_ms)
+
 class EncounterClusterer:
 
-    def cluster(self, signals: List, config=None) -> List[Encounter]:
+    def cluster(self, signals: List, config: Optional[ClusterConfig] = None, workers: int = 1) -> List[Encounter]:
         # Group by game first (CRITICAL)
         by_game = defaultdict(list)
         for s in signals:
             by_game[s.game_id].append(s)
 
         encounters = []
+        for _, game_encounters in self.cluster_games(by_game.items(), config, workers):
+            encounters.extend(game_encounters)
+
+        return encounters
+
+    def cluster_games(
+        self, games: Iterable[Tuple], config: Optional[ClusterConfig] = None, workers: int = 1
+    ) -> Iterator[Tuple[object, List[Encounter]]]:
+        """
+        Cluster a stream of (game_id, signals), yielding (game_id, encounters) in input order
+
+        Encounter IDs run on from game to game. With workers > 1 the games are
+        clustered in a process pool: each worker numbers its game from 0 and
+        the game is shifted by the IDs used by the games before it, so the IDs
+        are the same for any worker count.
+        """
         encounter_id = 0
-
-        for game_id, game_signals in by_game.items():
-            game_signals.sort(key=lambda s: s.timestamp_ms)
-
-            active = deque()
-            parent = list(range(len(game_signals)))
-
-            def find(i):
-                while parent[i] != i:
-                    parent[i] = parent[parent[i]]
-                    i = parent[i]
-                return i
-
-            def union(a, b):
-                ra, rb = find(a), find(b)
-                if ra != rb:
-                    parent[rb] = ra
-
-            for i, cur in enumerate(game_signals):
-                while active and cur.timestamp_ms - game_signals[active[0]].timestamp_ms > MAX_WINDOW_MS:
-                    active.popleft()
-
-                for j in active:
-                    prev = game_signals[j]
-
-                    if abs(cur.timestamp_ms - prev.timestamp_ms) > TIME_EPS_MS:
-                        continue
-
-                    d = distance(cur.x, cur.y, prev.x, prev.y)
-                    if d is not None and d > DIST_EPS:
-                        continue
-
-                    union(i, j)
-
-                active.append(i)
-
-            clusters = defaultdict(list)
-            for i in range(len(game_signals)):
-                clusters[find(i)].append(game_signals[i])
-
-            for events in clusters.values():
-                if len(events) < MIN_EVENTS:
-                    continue
-
-                start = min(e.timestamp_ms for e in events)
-                end = max(e.timestamp_ms for e in events)
-                duration = end - start
-
-                pos = [(e.x, e.y) for e in events if e.x is not None]
-
-                def infer_location_from_events(events):
-                    for e in events:
-                        raw = str(e.payload.get("raw_type", "")).lower()
-                        sub = str(e.sub_type or "").lower()
-                        event_id = str(e.id).lower()
-
-                        if any(k in s for s in [raw, sub, event_id] for k in ["mid"]):
-                            return "MID_LANE"
-                        if any(k in s for s in [raw, sub, event_id] for k in ["bot"]):
-                            return "BOT_LANE"
-                        if any(k in s for s in [raw, sub, event_id] for k in ["top"]):
-                            return "TOP_LANE"
-
-                        if any(k in raw or k in sub or k in event_id for k in ["dragon", "drake", "chemtech", "infernal", "mountain", "ocean", "cloud", "elder"]):
-                            return "RIVER"
-                        if any(k in raw or k in sub or k in event_id for k in ["herald", "baron", "nashor", "void"]):
-                            return "RIVER"
-
-                    return "UNKNOWN"
-
-                # Objective mapping for centroids
-                OBJECTIVE_POSITIONS = {
-                    "RIVER": (7500, 7500),
-                    "MID_LANE": (7500, 7500),
-                    "TOP_LANE": (3000, 12000),
-                    "BOT_LANE": (12000, 3000),
-                }
-
-                if pos:
-                    cx = sum(p[0] for p in pos) / len(pos)
-                    cy = sum(p[1] for p in pos) / len(pos)
-                    inferred_zone = None
+        if workers <= 1:
+            for game_id, signals in games:
+                encounters, encounter_id = self.cluster_game(game_id, signals, encounter_id, config)
+                yield game_id, encounters
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+
+            def finish_oldest():
+                nonlocal encounter_id
+                game_id, future = in_flight.popleft()
+                encounters, used_ids = future.result()
+                for e in encounters:
+                    e.encounter_id += encounter_id
+                encounter_id += used_ids
+                return game_id, encounters
+
+            for game_id, signals in games:
+                in_flight.append((game_id, pool.submit(self.cluster_game, game_id, signals, 0, config)))
+                if len(in_flight) >= workers * GAMES_IN_FLIGHT_PER_WORKER:
+                    yield finish_oldest()
+
+            while in_flight:
+                yield finish_oldest()
+
+    def cluster_game(
+        self, game_id, signals: List, first_encounter_id: int = 0, config: Optional[ClusterConfig] = None
+    ) -> Tuple[List[Encounter], int]:
+        """
+        Cluster the signals of a single game
+
+        Encounter IDs are numbered from first_encounter_id. Returns the game's
+        encounters and the next free ID, so games clustered one at a time get
+        the same IDs as a single cluster() call over all of them.
+        """
+        encounters = self._build_encounters(game_id, signals, first_encounter_id, config or ClusterConfig())
+        return self._merge_low_quality(encounters), first_encounter_id + len(encounters)
+
+    def sweep_game(
+        self, game_id, signals: List, configs: Iterable[ClusterConfig]
+    ) -> Dict[ClusterConfig, Tuple[List[Encounter], int]]:
+        """
+        Cluster the signals of a single game once per config
+
+        The game is sorted once and its candidate links are found once, at
+        the widest window and distance in configs (cluster_vectorized.PairIndex,
+        needs numpy); each config then only filters them. Each config maps to
+        what cluster_game() returns for it, encounter IDs numbered from 0.
+        """
+        configs = list(configs)
+        game_signals = sorted(signals, key=lambda s: s.timestamp_ms)
+        index = cluster_vectorized.PairIndex(
+            *self._columns(game_signals),
+            max(c.window_ms for c in configs),
+            max(c.dist_eps for c in configs),
+        )
+
+        # Configs that only differ in min_events (or in a max window above the time eps) link alike
+        roots_by_linkage = {}
+        results = {}
+        for config in configs:
+            linkage = (config.window_ms, config.dist_eps)
+            if linkage not in roots_by_linkage:
+                roots_by_linkage[linkage] = index.components(*linkage).tolist()
+            roots = roots_by_linkage[linkage]
+            encounters = self._encounters_from_components(game_id, game_signals, roots, 0, config)
+            results[config] = self._merge_low_quality(encounters), len(encounters)
+        return results
+
+    def _build_encounters(self, game_id, signals: List, encounter_id: int, config: ClusterConfig) -> List[Encounter]:
+        game_signals = sorted(signals, key=lambda s: s.timestamp_ms)
+
+        if config.backend == "numpy":
+            roots = self._components_numpy(game_signals, config)
+        else:
+            roots = self._components(game_signals, config)
+
+        return self._encounters_from_components(game_id, game_signals, roots, encounter_id, config)
+
+    def _encounters_from_components(
+        self, game_id, game_signals: List, roots: List[int], encounter_id: int, config: ClusterConfig
+    ) -> List[Encounter]:
+        """An Encounter for every component (root of each time-sorted signal) with enough events"""
+        encounters = []
+        clusters = defaultdict(list)
+        for root, signal in zip(roots, game_signals):
+            clusters[root].append(signal)
+
+        for events in clusters.values():
+            if len(events) < config.min_events:
+                continue
+            encounters.append(self._finalize(game_id, events, encounter_id))
+            encounter_id += 1
+
+        return encounters
+
+    def _finalize(self, game_id, events: List, encounter_id: int) -> Encounter:
+        """The Encounter of one cluster (events sorted by time), aggregated in a single pass"""
+        teams = set()
+        players = set()
+        p_by_team = defaultdict(set)
+        counts = defaultdict(int)
+        xs, ys = [], []
+
+        for e in events:
+            team = e.team_id
+            if team:
+                teams.add(team)
+
+            counts[e.event_type] += 1
+
+            if e.x is not None:
+                xs.append(e.x)
+                ys.append(e.y)
+
+            # Players by team
+            actor, target = e.actor_player_id, e.target_player_id
+            if is_real_player(actor):
+                players.add(actor)
+                if team:
+                    p_by_team[team].add(actor)
+            if is_real_player(target):
+                players.add(target)
+                if e.opponent_team_id:
+                    p_by_team[e.opponent_team_id].add(target)
+
+        if xs:
+            cx = sum(xs) / len(xs)
+            cy = sum(ys) / len(ys)
+            inferred_zone = None
+        else:
+            inferred_zone = infer_location_from_events(events)
+            cx, cy = None, None
+
+        # Only teams present in 'teams'; players left without a team go to UNKNOWN_TEAM
+        p_by_team = {t: pset for t, pset in p_by_team.items() if t in teams}
+        assigned = set().union(*p_by_team.values())
+        for p in players:
+            if p not in assigned:
+                p_by_team.setdefault("UNKNOWN_TEAM", set()).add(p)
+
+        # Events are sorted by time
+        start = events[0].timestamp_ms
+        end = events[-1].timestamp_ms
+        duration = end - start
+
+        # Quality / Validity Gates
+        quality = "MED"
+        is_structure_only = counts.keys() == {"STRUCTURE"}
+
+        if duration == 0 and is_structure_only:
+            quality = "LOW"
+        elif len(teams) <= 1 and counts.get("OBJECTIVE", 0) == 0:
+            quality = "LOW"
+        elif len(players) <= 1:
+            quality = "LOW"
+        elif counts.get("KILL", 0) > 0 or counts.get("OBJECTIVE", 0) > 0:
+            quality = "HIGH"
+
+        return Encounter(
+            encounter_id=encounter_id,
+            game_id=game_id,
+            series_id=events[0].series_id,
+            start_ms=start,
+            end_ms=end,
+            centroid_x=cx,
+            centroid_y=cy,
+            teams=teams,
+            players=players,
+            players_by_team=p_by_team,
+            event_counts=dict(counts),
+            event_ids=[e.id for e in events],
+            inferred_zone=inferred_zone,
+            quality=quality
+        )
+
+    def _components(self, game_signals: List, config: ClusterConfig) -> List[int]:
+        """
+        Union-find root of each signal of a game (sorted by time)
+
+        Signals are linked as described in ClusterConfig. Positioned signals
+        still inside the time window are hashed into dist_eps x dist_eps
+        cells, so each signal is only compared with those in its own and the
+        8 neighbouring cells.
+        """
+        parent = list(range(len(game_signals)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(a, b):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[rb] = ra
+
+        window_ms = config.window_ms
+        dist_eps = config.dist_eps
+        window = deque()        # indices inside the time window, oldest first
+        unpositioned = deque()  # the window's signals without a position
+        cells = {}              # (cell x, cell y) -> the window's signals in that cell, oldest first
+
+        for i, cur in enumerate(game_signals):
+            while window and cur.timestamp_ms - game_signals[window[0]].timestamp_ms > window_ms:
+                prev = game_signals[window.popleft()]
+                if prev.x is None or prev.y is None:
+                    unpositioned.popleft()
                 else:
-                    inferred_zone = infer_location_from_events(events)
-                    cx, cy = None, None
-
-                def is_real_player(pid):
-                    if pid is None:
-                        return False
-                    return pid.isdigit()
-
-                teams = {e.team_id for e in events if e.team_id}
-                players = {
-                    p for e in events
-                    for p in (e.actor_player_id, e.target_player_id)
-                    if is_real_player(p)
-                }
-
-                # Players by team
-                p_by_team = defaultdict(set)
-                for e in events:
-                    if is_real_player(e.actor_player_id) and e.team_id:
-                        p_by_team[e.team_id].add(e.actor_player_id)
-                    if is_real_player(e.target_player_id) and e.opponent_team_id:
-                        p_by_team[e.opponent_team_id].add(e.target_player_id)
-
-                # Filter p_by_team to only include teams present in 'teams' set
-                p_by_team = {t: pset for t, pset in p_by_team.items() if t in teams}
-
-                # Ensure all players in 'players' set are in 'p_by_team'
-                for p in players:
-                    found = False
-                    for t_players in p_by_team.values():
-                        if p in t_players:
-                            found = True
-                            break
-                    if not found:
-                        if "UNKNOWN_TEAM" not in p_by_team:
-                            p_by_team["UNKNOWN_TEAM"] = set()
-                        p_by_team["UNKNOWN_TEAM"].add(p)
-
-                counts = defaultdict(int)
-                for e in events:
-                    counts[e.event_type] += 1
-
-                # Quality / Validity Gates
-                quality = "MED"
-                is_structure_only = set(counts.keys()) == {"STRUCTURE"}
-                
-                if duration == 0 and is_structure_only:
-                    quality = "LOW"
-                elif len(teams) <= 1 and counts.get("OBJECTIVE", 0) == 0:
-                    quality = "LOW"
-                elif len(players) <= 1:
-                    quality = "LOW"
-                elif counts.get("KILL", 0) > 0 or counts.get("OBJECTIVE", 0) > 0:
-                    quality = "HIGH"
-
-                encounters.append(
-                    Encounter(
-                        encounter_id=encounter_id,
-                        game_id=game_id,
-                        series_id=events[0].series_id,
-                        start_ms=start,
-                        end_ms=end,
-                        centroid_x=cx,
-                        centroid_y=cy,
-                        teams=teams,
-                        players=players,
-                        players_by_team=dict(p_by_team),
-                        event_counts=dict(counts),
-                        event_ids=[e.id for e in events],
-                        inferred_zone=inferred_zone,
-                        quality=quality
-                    )
-                )
-                encounter_id += 1
-
+                    cell = (prev.x // dist_eps, prev.y // dist_eps)
+                    cells[cell].popleft()
+                    if not cells[cell]:
+                        del cells[cell]
+
+            positioned = cur.x is not None and cur.y is not None
+            if positioned:
+                cx, cy = cur.x // dist_eps, cur.y // dist_eps
+
+            if unpositioned:
+                # An unpositioned signal links to everything within the time window,
+                # so the whole window is already connected to it
+                union(unpositioned[-1], i)
+            elif not positioned:
+                for j in window:
+                    union(j, i)
+            else:
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        for j in cells.get((cx + dx, cy + dy), ()):
+                            prev = game_signals[j]
+                            if distance(cur.x, cur.y, prev.x, prev.y) <= dist_eps:
+                                union(j, i)
+
+            window.append(i)
+            if positioned:
+                cells.setdefault((cx, cy), deque()).append(i)
+            else:
+                unpositioned.append(i)
+
+        return [find(i) for i in range(len(game_signals))]
+
+    def _components_numpy(self, game_signals: List, config: ClusterConfig) -> List[int]:
+        """Same components as _components, linked over NumPy arrays by cluster_vectorized"""
+        labels = cluster_vectorized.link_components(*self._columns(game_signals), config.window_ms, config.dist_eps)
+        return labels.tolist()
+
+    @staticmethod
+    def _columns(game_signals: List) -> Tuple[List, List, List]:
+        """Timestamps, x and y of the signals (NaN where the position is unknown)"""
+        nan = float("nan")
+        return (
+            [s.timestamp_ms for s in game_signals],
+            [nan if s.x is None or s.y is None else s.x for s in game_signals],
+            [nan if s.x is None or s.y is None else s.y for s in game_signals],
+        )
+
+    def _merge_low_quality(self, encounters: List[Encounter]) -> List[Encounter]:
         # Post-processing: Merge LOW quality structure-only into nearest neighbors
         merged_encounters = []
-        by_game_final = defaultdict(list)
-        for e in encounters:
-            by_game_final[e.game_id].append(e)
+        game_encs = sorted(encounters, key=lambda x: x.start_ms)
 
-        for game_id, game_encs in by_game_final.items():
-            game_encs.sort(key=lambda x: x.start_ms)
+        i = 0
+        while i < len(game_encs):
+            cur = game_encs[i]
+            is_low_structure = (cur.quality == "LOW" and set(cur.event_counts.keys()) == {"STRUCTURE"})
             
-            i = 0
-            while i < len(game_encs):
-                cur = game_encs[i]
-                is_low_structure = (cur.quality == "LOW" and set(cur.event_counts.keys()) == {"STRUCTURE"})
-                
-                if is_low_structure:
-                    # Find nearest HIGH quality neighbor within 15s that shares a team
-                    neighbor = None
-                    # Search backward
-                    for j in range(i-1, -1, -1):
-                        prev = game_encs[j]
-                        if abs(cur.start_ms - prev.end_ms) < 15_000 and prev.quality == "HIGH":
-                            if cur.teams.intersection(prev.teams):
-                                neighbor = prev
+            if is_low_structure:
+                # Find nearest HIGH quality neighbor within 15s that shares a team
+                neighbor = None
+                # Search backward
+                for j in range(i-1, -1, -1):
+                    prev = game_encs[j]
+                    if abs(cur.start_ms - prev.end_ms) < 15_000 and prev.quality == "HIGH":
+                        if cur.teams.intersection(prev.teams):
+                            neighbor = prev
+                            break
+                # Search forward if not found
+                if not neighbor:
+                    for j in range(i+1, len(game_encs)):
+                        nxt = game_encs[j]
+                        if abs(nxt.start_ms - cur.end_ms) < 15_000 and nxt.quality == "HIGH":
+                            if cur.teams.intersection(nxt.teams):
+                                neighbor = nxt
                                 break
-                    # Search forward if not found
-                    if not neighbor:
-                        for j in range(i+1, len(game_encs)):
-                            nxt = game_encs[j]
-                            if abs(nxt.start_ms - cur.end_ms) < 15_000 and nxt.quality == "HIGH":
-                                if cur.teams.intersection(nxt.teams):
-                                    neighbor = nxt
-                                    break
-                    
-                    if neighbor:
-                        # Merge cur into neighbor
-                        neighbor.event_ids.extend(cur.event_ids)
-                        for etype, count in cur.event_counts.items():
-                            neighbor.event_counts[etype] = neighbor.event_counts.get(etype, 0) + count
-                        neighbor.players.update(cur.players)
-                        neighbor.teams.update(cur.teams)
-                        for tid, pset in cur.players_by_team.items():
-                            if tid not in neighbor.players_by_team:
-                                neighbor.players_by_team[tid] = set()
-                            neighbor.players_by_team[tid].update(pset)
-                        neighbor.start_ms = min(neighbor.start_ms, cur.start_ms)
-                        neighbor.end_ms = max(neighbor.end_ms, cur.end_ms)
-                        i += 1
-                        continue
-                    else:
-                        # Drop LOW atomic structure encounters that couldn't be merged
-                        i += 1
-                        continue
                 
-                if cur.quality == "LOW":
-                    # Drop other LOW quality encounters
+                if neighbor:
+                    # Merge cur into neighbor
+                    neighbor.event_ids.extend(cur.event_ids)
+                    for etype, count in cur.event_counts.items():
+                        neighbor.event_counts[etype] = neighbor.event_counts.get(etype, 0) + count
+                    neighbor.players.update(cur.players)
+                    neighbor.teams.update(cur.teams)
+                    for tid, pset in cur.players_by_team.items():
+                        if tid not in neighbor.players_by_team:
+                            neighbor.players_by_team[tid] = set()
+                        neighbor.players_by_team[tid].update(pset)
+                    neighbor.start_ms = min(neighbor.start_ms, cur.start_ms)
+                    neighbor.end_ms = max(neighbor.end_ms, cur.end_ms)
                     i += 1
                     continue
-
-                merged_encounters.append(cur)
+                else:
+                    # Drop LOW atomic structure encounters that couldn't be merged
+                    i += 1
+                    continue
+            
+            if cur.quality == "LOW":
+                # Drop other LOW quality encounters
                 i += 1
+                continue
+
+            merged_encounters.append(cur)
+            i += 1
 
         return merged_encounters
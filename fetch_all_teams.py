@@ -1,24 +1,12 @@
 import os
 import json
+from collections import defaultdict
+from datetime import datetime
 from grid_data_fetcher import PorolyticsDataCollector, GridAPIClient
+from download_catalog import DownloadCatalog
+from fetch_planner import plan_fetch, write_team_manifests
 from dotenv import load_dotenv
 
-def move_existing_files(team_name, team_folder):
-    import shutil
-    if not os.path.exists('data'):
-        return
-    data_files = os.listdir('data')
-    if not data_files:
-        return
-    print(f"    Moving {len(data_files)} existing files to {team_folder}...")
-    for file in data_files:
-        src = os.path.join('data', file)
-        dst = os.path.join(team_folder, file)
-        try:
-            shutil.move(src, dst)
-        except Exception as e:
-            print(f"      Error moving {file}: {e}")
-
 def fetch_all_data():
     load_dotenv()
     api_key = os.getenv('GRID_API_KEY')
@@ -40,46 +28,63 @@ def fetch_all_data():
     output_base_dir = 'matches_data'
     os.makedirs(output_base_dir, exist_ok=True)
     
-    # Ensure 'data' directory exists
-    os.makedirs('data', exist_ok=True)
+    # Series shared between teams are downloaded once and linked in the catalog
+    catalog = DownloadCatalog()
 
     print(f"Starting raw data extraction for {len(POPULAR_TEAMS)} teams...")
 
+    # Collect ALL available data for each team (limit to 10 for reliability in this environment)
+    num_matches = 10
+
     for team_id, team_name in POPULAR_TEAMS.items():
-        print(f"\n>>> Processing {team_name} (ID: {team_id})")
-        
-        # Create team-specific folder
         team_folder = os.path.join(output_base_dir, team_name)
         os.makedirs(team_folder, exist_ok=True)
-        
-        # FIRST: Move anything already in data/ to the right folder
-        # (This helps if we timed out previously)
-        move_existing_files(team_name, team_folder)
+        catalog.import_folder(team_folder, team_id, team_name)
 
-        try:
-            # Collect ALL available data for the team (limit to 10 for reliability in this environment)
-            num_matches = 10
-            print(f"    Fetching ALL available matches (up to {num_matches})...")
-            
-            data = collector.collect_team_data(
-                team_id=team_id,
-                num_matches=num_matches,
-                title_id=3,
-                download_events=True
-            )
-
-            # Save the summarized data file
-            summary_file = os.path.join(team_folder, f"team_{team_id}_{team_name}_summary.json")
-            collector.save_collected_data(data, summary_file)
-
-            # Move files downloaded in this batch
-            move_existing_files(team_name, team_folder)
-            
-            print(f"    ✅ Raw data for {team_name} complete")
+    def list_series(team_id):
+        print(f"\n>>> Listing {POPULAR_TEAMS[team_id]} (ID: {team_id}), up to {num_matches} matches")
+        return collector.client.get_team_series(team_id=team_id, title_id=3, limit=num_matches)[:num_matches]
+
+    # Teams that played each other share series: each one is downloaded and parsed once
+    plan = plan_fetch(POPULAR_TEAMS, list_series, catalog)
+    print(f"\nPlan: {plan.summary()}")
 
+    by_owner = defaultdict(list)
+    for series_id, series in plan.series.items():
+        by_owner[plan.owners[series_id]].append(series)
+
+    collected = {}
+    for team_id, series_list in by_owner.items():
+        team_name = POPULAR_TEAMS[team_id]
+        print(f"\n>>> Processing {len(series_list)} series stored under {team_name}")
+        try:
+            for series_data in collector.collect_series(
+                series_list,
+                download_events=True,
+                output_dir=os.path.join(output_base_dir, team_name),
+                catalog=catalog
+            ):
+                collected[series_data['series_id']] = series_data
         except Exception as e:
             print(f"    ❌ Error for {team_name}: {e}")
 
+    for team_id, team_name in POPULAR_TEAMS.items():
+        team_folder = os.path.join(output_base_dir, team_name)
+        data = {
+            'team_id': team_id,
+            'collection_date': datetime.now().isoformat(),
+            'series': [collected[series_id] for series_id in plan.team_series[team_id] if series_id in collected]
+        }
+
+        # Save the summarized data file
+        summary_file = os.path.join(team_folder, f"team_{team_id}_{team_name}_summary.json")
+        collector.save_collected_data(data, summary_file)
+
+        print(f"    ✅ Raw data for {team_name} complete")
+
+    write_team_manifests(plan, catalog, output_base_dir)
+
+    catalog.close()
     print("\n✅ All teams processed!")
 
 if __name__ == "__main__":
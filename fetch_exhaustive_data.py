@@ -1,33 +1,20 @@
 import os
-import json
-import time
-import shutil
-from grid_data_fetcher import PorolyticsDataCollector, GridAPIClient
+from grid_data_fetcher import GridAPIClient, DEFAULT_MAX_WORKERS
+from download_catalog import DownloadCatalog
+from fetch_planner import plan_fetch, execute_plan, write_team_manifests
 from dotenv import load_dotenv
-from datetime import datetime
 
-def move_files_to_team_folder(team_folder):
-    if not os.path.exists('data'):
-        return
-    data_files = os.listdir('data')
-    if not data_files:
-        return
-    for file in data_files:
-        src = os.path.join('data', file)
-        dst = os.path.join(team_folder, file)
-        try:
-            if os.path.exists(dst):
-                os.remove(dst) # Overwrite if exists to ensure latest
-            shutil.move(src, dst)
-        except Exception as e:
-            print(f"      Error moving {file}: {e}")
-
-def get_all_series(client, team_id, title_id=3):
+def get_all_series(client, team_id, title_id=3, since=None):
+    """Page through a team's series, newest first; `since` limits it to series scheduled at or after that time"""
     all_series = []
     has_next_page = True
     after_cursor = None
+    series_filter = client.series_filter(team_id, title_id, start_date=since)
     
-    print(f"Fetching all series for team {team_id}...")
+    if since:
+        print(f"Fetching series for team {team_id} since {since}...")
+    else:
+        print(f"Fetching all series for team {team_id}...")
     
     while has_next_page:
         cursor_str = f', after: "{after_cursor}"' if after_cursor else ""
@@ -36,11 +23,7 @@ def get_all_series(client, team_id, title_id=3):
           allSeries(
             first: 50
             {cursor_str}
-            filter: {{ 
-                titleIds: {{ in: [{title_id}] }},
-                teamIds: {{ in: ["{team_id}"] }},
-                types: ESPORTS
-            }}
+            filter: {{ {series_filter} }}
             orderBy: StartTimeScheduled
             orderDirection: DESC
           ) {{
@@ -75,72 +58,67 @@ def get_all_series(client, team_id, title_id=3):
         
         if not has_next_page:
             break
-            
-        time.sleep(0.5) # Small delay for rate limiting
         
     return all_series
 
-def fetch_exhaustive_for_team(team_id, team_name, api_key):
+def fetch_exhaustive_for_teams(teams, api_key, max_workers=DEFAULT_MAX_WORKERS, catalog=None, incremental=True):
+    """Download every series of several teams, each unique series only once (teams: team_id -> name)"""
+    if catalog is None:
+        # A catalog opened here is closed here; callers passing one keep ownership of it
+        with DownloadCatalog() as catalog:
+            return fetch_exhaustive_for_teams(teams, api_key, max_workers, catalog, incremental)
+
     print(f"\n{'#'*60}")
-    print(f"EXHAUSTIVE FETCH: {team_name} ({team_id})")
+    print(f"EXHAUSTIVE FETCH: {', '.join(f'{name} ({team_id})' for team_id, name in teams.items())}")
     print(f"{'#'*60}\n")
     
     client = GridAPIClient(api_key)
-    collector = PorolyticsDataCollector(api_key)
-    
+
     output_base_dir = 'matches_data'
-    team_folder = os.path.join(output_base_dir, team_name)
-    os.makedirs(team_folder, exist_ok=True)
-    os.makedirs('data', exist_ok=True)
     
-    series_list = get_all_series(client, team_id)
-    print(f"Total series found: {len(series_list)}")
+    # Files from runs before the catalog existed are registered once
+    for team_id, team_name in teams.items():
+        imported = catalog.import_folder(os.path.join(output_base_dir, team_name), team_id, team_name)
+        if imported:
+            print(f"Imported {imported} existing {team_name} series into the catalog")
     
-    # Track what we already have to avoid redundant downloads if possible
-    # However, collector.collect_team_data doesn't easily support skipping
-    # We'll just let it run.
+    def list_series(team_id):
+        # Incremental mode only asks for series at/after the newest one seen last time
+        since = catalog.get_sync_cursor(team_id) if incremental else None
+        series_list = get_all_series(client, team_id, since=since)
+        print(f"Total series found for {teams[team_id]}: {len(series_list)}")
+        return series_list
     
-    # We can't use collector.collect_team_data directly because it fetches the list again
-    # and has its own limit. Let's process series by series.
+    # Union every team's series: a match between two listed teams is downloaded once,
+    # into the first team's folder, and only referenced from the other team's manifest
+    plan = plan_fetch(teams, list_series, catalog)
+    print(f"Plan: {plan.summary()}")
     
-    collected_data = {
-        'team_id': team_id,
-        'collection_date': datetime.now().isoformat(),
-        'series': []
-    }
+    # Fetching only the essential files to speed up the process
+    failed = execute_plan(client, plan, catalog, output_base_dir, max_workers=max_workers)
+    if failed:
+        print(f"⚠️  {len(failed)} series failed: {', '.join(failed)}")
     
-    # Sort series by date to process newest first if desired, or keep as is
-    # series_list.sort(key=lambda x: x['startTimeScheduled'], reverse=True)
+    # Upcoming series are listed again; failed ones are retried from the catalog
+    for team_id in teams:
+        catalog.advance_sync_cursor(team_id, [plan.series[series_id] for series_id in plan.team_series[team_id]])
     
-    # Check what we already have
-    existing_events = {f.replace('events_', '').replace('.jsonl.zip', '') for f in os.listdir(team_folder) if f.startswith('events_')}
+    for path in write_team_manifests(plan, catalog, output_base_dir):
+        print(f"Wrote {path}")
     
-    for idx, series in enumerate(series_list, 1):
-        series_id = series['id']
-        
-        if series_id in existing_events:
-             # print(f"[{idx}/{len(series_list)}] Series {series_id} already exists.")
-             continue
-
-        print(f"[{idx}/{len(series_list)}] Downloading {series_id} ({series.get('startTimeScheduled', 'N/A')})...", end='', flush=True)
-        
-        try:
-            # Download files directly to team folder to avoid move overhead
-            # Fetching only the essential files to speed up the process
-            client.download_series_events(series_id, output_path=os.path.join(team_folder, f"events_{series_id}.jsonl.zip"))
-            client.download_series_end_state(series_id, output_path=os.path.join(team_folder, f"end_state_{series_id}_grid.json"))
-            
-            print(" ✅")
-            
-            # Very short delay to respect API but maintain speed
-            time.sleep(0.2)
-            
-        except Exception as e:
-            print(f" ❌ ({e})")
+    print(f"Exhaustive fetch complete!")
 
-    print(f"Exhaustive fetch for {team_name} complete!")
+def fetch_exhaustive_for_team(team_id, team_name, api_key, max_workers=DEFAULT_MAX_WORKERS, catalog=None, incremental=True):
+    fetch_exhaustive_for_teams({team_id: team_name}, api_key, max_workers, catalog, incremental)
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Download every series for a set of teams into matches_data/')
+    parser.add_argument('--full', action='store_true', help='Re-list each team\'s entire history instead of syncing since the last run')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS, help=f'Series downloaded in parallel (default: {DEFAULT_MAX_WORKERS})')
+    args = parser.parse_args()
+    
     load_dotenv()
     api_key = os.getenv('GRID_API_KEY')
     if not api_key:
@@ -152,8 +130,11 @@ def main():
         '47351': 'Cloud9_Kia'
     }
     
-    for team_id, team_name in teams.items():
-        fetch_exhaustive_for_team(team_id, team_name, api_key)
+    with DownloadCatalog() as catalog:
+        fetch_exhaustive_for_teams(
+            teams, api_key,
+            max_workers=args.workers, catalog=catalog, incremental=not args.full
+        )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,144 @@
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from grid_data_fetcher import GridAPIClient, DEFAULT_MAX_WORKERS, PARTIAL_SUFFIX
+from download_catalog import DownloadCatalog
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+@dataclass
+class FetchPlan:
+    """
+    Union of the series lists of several teams
+
+    Each unique series is downloaded once, into the folder of the first team
+    that listed it (its owner). The other teams only get manifest entries.
+    """
+    teams: Dict[str, str]  # team_id -> team_name
+    series: Dict[str, Dict] = field(default_factory=dict)  # unique series_id -> metadata
+    team_series: Dict[str, List[str]] = field(default_factory=dict)  # team_id -> series_ids
+    owners: Dict[str, str] = field(default_factory=dict)  # series_id -> team_id storing the files
+    pending: List[str] = field(default_factory=list)  # series_ids still to download
+
+    @property
+    def shared(self) -> int:
+        """Team/series links that did not need a download of their own"""
+        return sum(len(ids) for ids in self.team_series.values()) - len(self.series)
+
+    def summary(self) -> str:
+        return (f"{len(self.teams)} teams, {len(self.series)} unique series "
+                f"({self.shared} shared between teams), {len(self.pending)} to download")
+
+
+def plan_fetch(
+    teams: Dict[str, str],
+    list_series: Callable[[str], List[Dict]],
+    catalog: DownloadCatalog
+) -> FetchPlan:
+    """
+    List every team's series with `list_series(team_id)` and union them
+
+    Series and team links are recorded in the catalog. Pending series are the
+    listed ones not fetched yet, plus anything that failed on an earlier run
+    (until it failed MAX_FETCH_ATTEMPTS times, see DownloadCatalog).
+    """
+    plan = FetchPlan(teams=dict(teams))
+
+    for team_id, team_name in teams.items():
+        series_list = list_series(team_id)
+        catalog.record_many_series(series_list, team_id, team_name)
+        plan.team_series[team_id] = [series['id'] for series in series_list]
+        for series in series_list:
+            plan.series.setdefault(series['id'], series)
+            plan.owners.setdefault(series['id'], team_id)
+
+    fetched = catalog.fetched_series_ids()
+    pending = {series_id for series_id in plan.series if series_id not in fetched}
+    for team_id in teams:
+        for series_id in catalog.unfetched_series_ids(team_id):
+            if series_id not in pending:
+                pending.add(series_id)
+                plan.owners.setdefault(series_id, team_id)
+    plan.pending = [series_id for series_id in plan.owners if series_id in pending]
+
+    return plan
+
+
+def execute_plan(
+    client: GridAPIClient,
+    plan: FetchPlan,
+    catalog: DownloadCatalog,
+    base_dir: str = 'matches_data',
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    include_riot: bool = False
+) -> List[str]:
+    """
+    Download every pending series once, into its owner's team folder
+
+    Returns the IDs of series that failed (recorded as failed in the catalog).
+    """
+    by_owner = {}
+    for series_id in plan.pending:
+        by_owner.setdefault(plan.owners[series_id], []).append(series_id)
+
+    failed = []
+    for team_id, series_ids in by_owner.items():
+        team_folder = os.path.join(base_dir, plan.teams[team_id])
+        os.makedirs(team_folder, exist_ok=True)
+        print(f"Downloading {len(series_ids)} series into {team_folder} with {max_workers} workers...")
+
+        results = client.download_many_series(
+            series_ids, team_folder, max_workers=max_workers, include_riot=include_riot
+        )
+        for series_id, result in results.items():
+            if result['error']:
+                catalog.mark_failed(series_id, result['error'])
+                failed.append(series_id)
+            else:
+                catalog.mark_fetched(series_id, result['files'])
+
+    return failed
+
+
+def write_team_manifests(
+    plan: FetchPlan,
+    catalog: DownloadCatalog,
+    base_dir: str = 'matches_data'
+) -> List[str]:
+    """
+    Write <team folder>/manifest.json for every team in the plan
+
+    Each entry lists a series the team played and where its files are
+    (relative to the team folder), including series stored in another
+    team's folder. Returns the manifest paths.
+    """
+    paths = []
+    for team_id, team_name in plan.teams.items():
+        team_folder = os.path.join(base_dir, team_name)
+        os.makedirs(team_folder, exist_ok=True)
+
+        entries = catalog.team_manifest(team_id)
+        for entry in entries:
+            entry['files'] = {
+                kind: os.path.relpath(path, team_folder) for kind, path in entry['files'].items()
+            }
+
+        manifest = {
+            'team_id': team_id,
+            'team_name': team_name,
+            'updated_at': datetime.now().isoformat(),
+            'series': entries
+        }
+
+        path = os.path.join(team_folder, MANIFEST_FILENAME)
+        part_path = path + PARTIAL_SUFFIX
+        with open(part_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(part_path, path)
+        paths.append(path)
+
+    return paths
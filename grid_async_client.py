@@ -0,0 +1,613 @@
+"""
+asyncio counterparts of GridAPIClient and PorolyticsDataCollector
+
+Same method surface as the sync classes (every network method is a coroutine),
+so hundreds of downloads and GraphQL calls can be in flight on one event loop.
+Requests go through the same TokenBucket rate limiter, which may be shared
+with a sync client. Requires aiohttp (pip install aiohttp).
+"""
+
+import asyncio
+import functools
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, only needed for the async client
+    aiohttp = None
+
+from grid_data_fetcher import (
+    GridAPIClient,
+    PorolyticsDataCollector,
+    EventProcessor,
+    SERIES_STATE_QUERY,
+    RETRY_STATUS_CODES,
+    DEFAULT_REQUESTS_PER_SECOND,
+    DEFAULT_MAX_REQUESTS_PER_SECOND,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_STATE_BATCH_SIZE,
+    DEFAULT_MAX_STATE_RESPONSE_BYTES,
+    DOWNLOAD_CHUNK_SIZE,
+    PARTIAL_SUFFIX,
+    is_valid_zip,
+    parse_retry_after,
+)
+from rate_limiter import TokenBucket, AdaptiveTokenBucket
+
+# One event loop can keep far more requests in flight than a thread pool
+DEFAULT_ASYNC_POOL_SIZE = 100
+DEFAULT_MAX_IN_FLIGHT = 100
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking call (catalog write, zip check) in the default executor; asyncio.to_thread needs 3.9"""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
+
+
+class AsyncGridAPIClient:
+    """asyncio client for interacting with GRID APIs (mirrors GridAPIClient)"""
+
+    series_state_url = GridAPIClient.series_state_url
+    series_filter = staticmethod(GridAPIClient.series_filter)
+    team_series_query = staticmethod(GridAPIClient.team_series_query)
+    series_states_query = staticmethod(GridAPIClient.series_states_query)
+    batch_too_large = staticmethod(GridAPIClient.batch_too_large)
+    _backoff_delay = staticmethod(GridAPIClient._backoff_delay)
+
+    def __init__(
+        self,
+        api_key: str,
+        rate_limiter: Optional[TokenBucket] = None,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        pool_size: int = DEFAULT_ASYNC_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        max_requests_per_second: float = DEFAULT_MAX_REQUESTS_PER_SECOND
+    ):
+        if aiohttp is None:
+            raise ImportError("AsyncGridAPIClient requires aiohttp (pip install aiohttp)")
+
+        self.api_key = api_key
+        self.graphql_base_url = "https://api-op.grid.gg"
+        self.file_download_base_url = "https://api.grid.gg"
+        self.headers = {"x-api-key": api_key}
+        # Pass a sync client's rate_limiter here to keep both under one budget
+        self.rate_limiter = rate_limiter or AdaptiveTokenBucket(
+            requests_per_second, max_rate=max_requests_per_second
+        )
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self._session = None
+
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        """Pooled keep-alive session, created lazily on the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout)
+        return self._session
+
+    async def close(self):
+        """Close pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _request(self, method: str, url: str, **kwargs) -> 'aiohttp.ClientResponse':
+        """
+        Send a rate-limited request over the pooled session
+
+        Same retry policy as GridAPIClient._request. The caller must read or
+        release the returned response.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire_async()
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                print(f"  {type(e).__name__} for {url}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status not in RETRY_STATUS_CODES:
+                self.rate_limiter.on_success()
+                return response
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status == 429:
+                self.rate_limiter.on_throttle(retry_after)
+            if attempt == self.max_retries:
+                return response
+
+            response.release()
+            delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+            print(f"  HTTP {response.status} for {url}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+    async def _graphql_post(self, url: str, query: str, variables: Optional[Dict] = None) -> Dict:
+        """POST a GraphQL query and return the result, raising on HTTP or GraphQL errors"""
+        async with await self._request('POST', url, json={"query": query, "variables": variables or {}}) as response:
+            if response.status != 200:
+                print(f"\nHTTP Error {response.status}")
+                print(f"Response: {await response.text()}")
+                response.raise_for_status()
+            result = await response.json(content_type=None)
+
+        if 'errors' in result:
+            print(f"\nGraphQL Errors:")
+            for error in result['errors']:
+                print(f"  - {error.get('message', 'Unknown error')}")
+            raise Exception(f"GraphQL errors: {result['errors']}")
+
+        return result
+
+    async def _graphql_request(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Make a GraphQL request to Central Data API"""
+        return await self._graphql_post(f"{self.graphql_base_url}/central-data/graphql", query, variables)
+
+    async def get_team_series(
+        self,
+        team_id: str,
+        title_id: int = 3,
+        limit: int = 50,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[Dict]:
+        """Get series IDs for a specific team (see GridAPIClient.get_team_series)"""
+        query = self.team_series_query(team_id, title_id, limit, start_date, end_date)
+        result = await self._graphql_request(query)
+
+        series_list = [edge['node'] for edge in result['data']['allSeries']['edges']]
+
+        print(f"Found {len(series_list)} series for team {team_id}")
+        return series_list
+
+    async def get_series_state(self, series_id: str) -> Dict:
+        """Get complete series state (end-game snapshot) from Series State API"""
+        result = await self._graphql_post(self.series_state_url, SERIES_STATE_QUERY, {"seriesId": series_id})
+        return result['data']['seriesState']
+
+    async def get_series_states(
+        self,
+        series_ids: Iterable[str],
+        batch_size: int = DEFAULT_STATE_BATCH_SIZE,
+        max_response_bytes: int = DEFAULT_MAX_STATE_RESPONSE_BYTES
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Get series states for many series, several per request
+
+        The first batch is sent alone to find a size the server accepts (a
+        rejected batch is split in half and retried, and a response above
+        max_response_bytes halves the size); the remaining batches are then
+        sent concurrently at that size.
+
+        Returns dict of series_id -> state (None if that series failed)
+        """
+        series_ids = list(series_ids)
+        states = {}
+        if not series_ids:
+            return states
+
+        first = series_ids[:batch_size]
+        response_bytes, accepted = await self._series_state_batch(first, states)
+        batch_size = min(batch_size, accepted)
+        if response_bytes > max_response_bytes and batch_size > 1:
+            batch_size = max(1, batch_size // 2)
+            print(f"  Series state response was {response_bytes // 1024} KB, batch size now {batch_size}")
+
+        rest = series_ids[len(first):]
+        await asyncio.gather(*(
+            self._series_state_batch(rest[i:i + batch_size], states)
+            for i in range(0, len(rest), batch_size)
+        ))
+        return states
+
+    async def _series_state_batch(self, series_ids: List[str], states: Dict[str, Optional[Dict]]) -> Tuple[int, int]:
+        """
+        Fetch one aliased batch into `states`, splitting it if the server rejects the size
+
+        Returns (largest response size, largest batch size the server accepted)
+        """
+        query, variables = self.series_states_query(series_ids)
+        async with await self._request('POST', self.series_state_url, json={"query": query, "variables": variables}) as response:
+            status = response.status
+            body = await response.read()
+        result = json.loads(body) if status == 200 else {}
+        errors = result.get('errors', [])
+
+        if self.batch_too_large(status, errors) and len(series_ids) > 1:
+            half = len(series_ids) // 2
+            print(f"  Series state batch of {len(series_ids)} rejected, splitting")
+            first, second = await asyncio.gather(
+                self._series_state_batch(series_ids[:half], states),
+                self._series_state_batch(series_ids[half:], states)
+            )
+            return max(first[0], second[0]), min(first[1], second[1])
+
+        if status != 200:
+            print(f"\nHTTP Error {status} for series states {series_ids}")
+            for series_id in series_ids:
+                states[series_id] = None
+            return len(body), len(series_ids)
+
+        # Errors scoped to one alias only void that series
+        for error in errors:
+            print(f"  - {error.get('message', 'Unknown error')} (path: {error.get('path')})")
+
+        data = result.get('data') or {}
+        for i, series_id in enumerate(series_ids):
+            states[series_id] = data.get(f"s{i}")
+
+        return len(body), len(series_ids)
+
+    async def _download_to_file(self, url: str, output_path: str, validate_zip: bool = False):
+        """Stream a file download to disk atomically (see GridAPIClient._download_to_file)"""
+        part_path = output_path + PARTIAL_SUFFIX
+
+        for attempt in range(self.max_retries + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+            async with await self._request('GET', url, headers=headers) as response:
+                # 416: nothing left to fetch, the partial file is already complete
+                if response.status != 416:
+                    response.raise_for_status()
+
+                    # 206 continues the partial file; a plain 200 restarts it
+                    mode = 'ab' if response.status == 206 else 'wb'
+                    try:
+                        with open(part_path, mode) as f:
+                            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
+                    except (aiohttp.ClientPayloadError,
+                            aiohttp.ClientConnectionError,
+                            asyncio.TimeoutError) as e:
+                        if attempt == self.max_retries:
+                            raise
+                        print(f"  Download interrupted ({type(e).__name__}), resuming {output_path}")
+                        continue
+
+            # CRC-checking a large zip is CPU work, keep it off the event loop
+            if not validate_zip or await run_blocking(is_valid_zip, part_path):
+                break
+            os.remove(part_path)
+            if attempt == self.max_retries:
+                raise IOError(f"Corrupt zip downloaded from {url}")
+            print(f"  Corrupt zip downloaded from {url}, downloading it again")
+
+        os.replace(part_path, output_path)
+
+    async def download_series_events(self, series_id: str, output_path: Optional[str] = None) -> str:
+        """Download series events file (JSONL format, zipped)"""
+        url = f"{self.file_download_base_url}/file-download/events/grid/series/{series_id}"
+
+        if output_path is None:
+            output_path = f"events_{series_id}_grid.jsonl.zip"
+
+        await self._download_to_file(url, output_path, validate_zip=True)
+
+        print(f"Downloaded events file: {output_path}")
+        return output_path
+
+    async def download_series_end_state(self, series_id: str, output_path: Optional[str] = None) -> str:
+        """Download series end state file (JSON format)"""
+        url = f"{self.file_download_base_url}/file-download/end-state/grid/series/{series_id}"
+
+        async with await self._request('GET', url) as response:
+            response.raise_for_status()
+            end_state = await response.json(content_type=None)
+
+        if output_path is None:
+            output_path = f"end_state_{series_id}_grid.json"
+
+        part_path = output_path + PARTIAL_SUFFIX
+        with open(part_path, 'w') as f:
+            json.dump(end_state, f, indent=2)
+        os.replace(part_path, output_path)
+
+        print(f"Downloaded end state file: {output_path}")
+        return output_path
+
+    async def download_riot_events(self, series_id: str, output_path: Optional[str] = None) -> Optional[str]:
+        """Download Riot's official LiveStats events file (JSONL format, zipped)"""
+        url = f"{self.file_download_base_url}/file-download/events/riot/series/{series_id}"
+
+        if output_path is None:
+            output_path = f"events_{series_id}_riot.jsonl.zip"
+
+        try:
+            await self._download_to_file(url, output_path, validate_zip=True)
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                print(f"  Riot events not available for series {series_id}")
+                return None
+            raise
+
+        print(f"Downloaded Riot events file: {output_path}")
+        return output_path
+
+    async def download_riot_end_state(self, series_id: str, output_path: Optional[str] = None) -> Optional[str]:
+        """Download Riot's official Game Agnostic Match History file (JSON format, zipped)"""
+        url = f"{self.file_download_base_url}/file-download/end-state/riot/series/{series_id}"
+
+        if output_path is None:
+            output_path = f"end_state_{series_id}_riot.json.zip"
+
+        try:
+            await self._download_to_file(url, output_path, validate_zip=True)
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                print(f"  Riot end state not available for series {series_id}")
+                return None
+            raise
+
+        print(f"Downloaded Riot end state file: {output_path}")
+        return output_path
+
+    async def check_file_availability(self, series_id: str) -> Dict:
+        """Check which files are available for a series"""
+        url = f"{self.file_download_base_url}/file-download/list/{series_id}"
+
+        async with await self._request('GET', url) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def download_series_files(
+        self,
+        series_id: str,
+        output_dir: str,
+        include_riot: bool = True
+    ) -> Dict[str, Optional[str]]:
+        """
+        Download the GRID events and end state (and optionally the Riot files) for one series
+
+        The files are fetched concurrently. Returns dict of file kind -> path
+        (None for an end state that could not be downloaded and for Riot files
+        that are not available). Only a failed events download raises.
+        """
+        async def optional_end_state():
+            # The end state is optional: the events are still processed without it
+            try:
+                return await self.download_series_end_state(
+                    series_id, output_path=os.path.join(output_dir, f"end_state_{series_id}_grid.json")
+                )
+            except Exception as e:
+                print(f"  Warning: Could not download GRID end state: {e}")
+                return None
+
+        downloads = {
+            'events': self.download_series_events(
+                series_id, output_path=os.path.join(output_dir, f"events_{series_id}.jsonl.zip")
+            ),
+            'end_state': optional_end_state()
+        }
+
+        if include_riot:
+            downloads['riot_events'] = self.download_riot_events(
+                series_id, output_path=os.path.join(output_dir, f"events_{series_id}_riot.jsonl.zip")
+            )
+            downloads['riot_end_state'] = self.download_riot_end_state(
+                series_id, output_path=os.path.join(output_dir, f"end_state_{series_id}_riot.json.zip")
+            )
+
+        paths = await asyncio.gather(*downloads.values())
+        return dict(zip(downloads, paths))
+
+    async def download_many_series(
+        self,
+        series_ids: Iterable[str],
+        output_dir: str,
+        max_workers: int = DEFAULT_MAX_IN_FLIGHT,
+        include_riot: bool = True
+    ) -> Dict[str, Dict]:
+        """
+        Download files for many series concurrently
+
+        At most max_workers series are in flight at once; every request still
+        goes through the shared rate limiter. A failing series is recorded and
+        never aborts the rest of the batch.
+
+        Returns dict of series_id -> {'files': {...} or None, 'error': str or None}
+        """
+        series_ids = list(series_ids)
+        results = {}
+        slots = asyncio.Semaphore(max_workers)
+
+        async def download(series_id: str) -> Tuple[str, Optional[Dict], Optional[str]]:
+            async with slots:
+                try:
+                    return series_id, await self.download_series_files(series_id, output_dir, include_riot), None
+                except Exception as e:
+                    return series_id, None, str(e)
+
+        tasks = [download(series_id) for series_id in series_ids]
+        for done, task in enumerate(asyncio.as_completed(tasks), 1):
+            series_id, files, error = await task
+            results[series_id] = {'files': files, 'error': error}
+            if error:
+                print(f"[{done}/{len(series_ids)}] {series_id} ❌ ({error})")
+            else:
+                print(f"[{done}/{len(series_ids)}] {series_id} ✅")
+
+        return results
+
+
+class AsyncPorolyticsDataCollector(PorolyticsDataCollector):
+    """
+    PorolyticsDataCollector driven by AsyncGridAPIClient
+
+    Network work for every series runs concurrently on the event loop; event
+    parsing and extraction (CPU-bound) run in a worker thread, in series order.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        pool_size: int = DEFAULT_ASYNC_POOL_SIZE,
+        rate_limiter: Optional[TokenBucket] = None
+    ):
+        self.client = AsyncGridAPIClient(
+            api_key, rate_limiter=rate_limiter, requests_per_second=requests_per_second, pool_size=pool_size
+        )
+        self.processor = EventProcessor()
+        self.engine = self.processor.default_engine()
+
+    async def _fetch_series(
+        self,
+        series: Dict,
+        download_events: bool,
+        output_dir: str = 'data',
+        catalog=None,
+        state: Optional[Dict] = None
+    ) -> Dict:
+        """Fetch availability, state and files for one series (see PorolyticsDataCollector._fetch_series)"""
+        series_id = series['id']
+        series_data = {
+            'series_id': series_id,
+            'metadata': series,
+            'state': state,
+            'events': None,
+            'processed': {}
+        }
+
+        async def availability():
+            try:
+                series_data['availability'] = await self.client.check_file_availability(series_id)
+            except Exception as e:
+                print(f"  Warning: Could not check availability for {series_id}: {e}")
+
+        async def series_state():
+            if state is not None:
+                return
+            try:
+                series_data['state'] = await self.client.get_series_state(series_id)
+            except Exception as e:
+                print(f"  Error fetching state for {series_id}: {e}")
+
+        async def files():
+            if not download_events:
+                return
+            # Catalog calls hit SQLite and hash files, so they run off the event loop
+            try:
+                found = await run_blocking(catalog.files_for, series_id) if catalog else {}
+                if 'events' not in found:
+                    found = await self.client.download_series_files(series_id, output_dir)
+                    if catalog:
+                        await run_blocking(catalog.mark_fetched, series_id, found)
+                series_data['files'] = found
+            except Exception as e:
+                if catalog:
+                    await run_blocking(catalog.mark_failed, series_id, str(e))
+                series_data['download_error'] = str(e)
+
+        await asyncio.gather(availability(), series_state(), files())
+        return series_data
+
+    async def collect_team_data(
+        self,
+        team_id: str,
+        num_matches: int = 20,
+        title_id: int = 3,
+        download_events: bool = True,
+        max_workers: int = DEFAULT_MAX_IN_FLIGHT,
+        output_dir: str = 'data',
+        catalog=None
+    ) -> Dict:
+        """
+        Collect all data needed for a team analysis (see PorolyticsDataCollector.collect_team_data)
+
+        max_workers caps the number of series in flight at once.
+        """
+        print(f"\n{'='*60}")
+        print(f"Collecting data for team {team_id}")
+        print(f"{'='*60}\n")
+
+        print("Step 1: Fetching series list...")
+        series_list = await self.client.get_team_series(
+            team_id=team_id,
+            title_id=title_id,
+            limit=min(num_matches, 50)
+        )
+
+        collected_data = {
+            'team_id': team_id,
+            'collection_date': datetime.now().isoformat(),
+            'series': []
+        }
+
+        series_list = series_list[:num_matches]
+        if catalog:
+            await run_blocking(catalog.record_many_series, series_list, team_id)
+
+        collected_data['series'] = await self.collect_series(
+            series_list, download_events, max_workers, output_dir, catalog
+        )
+
+        print(f"\n{'='*60}")
+        print(f"Data collection complete!")
+        print(f"Collected {len(collected_data['series'])} series")
+        print(f"{'='*60}\n")
+
+        return collected_data
+
+    async def collect_series(
+        self,
+        series_list: List[Dict],
+        download_events: bool = True,
+        max_workers: int = DEFAULT_MAX_IN_FLIGHT,
+        output_dir: str = 'data',
+        catalog=None
+    ) -> List[Dict]:
+        """Fetch states and files for a list of series and process them (see PorolyticsDataCollector.collect_series)"""
+        print("Step 2: Fetching series states in batches...")
+        states = await self.client.get_series_states([series['id'] for series in series_list])
+
+        print(f"Step 3: Fetching series files with up to {max_workers} series in flight...")
+        slots = asyncio.Semaphore(max_workers)
+
+        async def fetch(series: Dict) -> Dict:
+            async with slots:
+                return await self._fetch_series(series, download_events, output_dir, catalog, states.get(series['id']))
+
+        collected = []
+        tasks = [asyncio.create_task(fetch(series)) for series in series_list]
+        for idx, task in enumerate(tasks, 1):
+            series_data = await task
+            await run_blocking(self._finish_series, idx, len(tasks), series_data, download_events)
+            collected.append(series_data)
+
+        return collected
+
+    def run(self, coro):
+        """
+        Run one of this collector's coroutines to completion from sync code
+
+        The session is closed afterwards, since it is bound to the event loop
+        asyncio.run creates; the next call opens a new one.
+        """
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.client.close()
+
+        return asyncio.run(runner())
@@ -6,34 +6,445 @@ Cloud9 x JetBrains Hackathon Project
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import zipfile
 import os
 import time
+import random
 import statistics
-from typing import List, Dict, Optional, Tuple
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, List, Dict, Optional, Tuple, Iterable, Iterator
 from datetime import datetime
 from collections import Counter, defaultdict
 from dotenv import load_dotenv
+from rate_limiter import TokenBucket, AdaptiveTokenBucket
+from time_utils import iso_to_ms
+import json_backend
 
 # Load environment variables
 load_dotenv()
 
+# Bulk download defaults
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+DEFAULT_MAX_REQUESTS_PER_SECOND = 20.0  # ceiling the adaptive limiter may probe up to
+
+# HTTP connection defaults
+DEFAULT_POOL_SIZE = DEFAULT_MAX_WORKERS  # keep-alive connections per host
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+
+# Retry defaults (exponential backoff with full jitter)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+# Series State batching: aliased seriesState fields per request, and the response
+# size above which later batches are made smaller
+DEFAULT_STATE_BATCH_SIZE = 10
+DEFAULT_MAX_STATE_RESPONSE_BYTES = 8 * 1024 * 1024
+
+# Downloads are written to <path>.part and renamed into place once complete
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PARTIAL_SUFFIX = '.part'
+
+
+# Every League of Legends field the Series State API exposes (shared by single and batched queries)
+SERIES_STATE_FIELDS = """
+{
+  id
+  version
+  valid
+  started
+  finished
+  format
+  updatedAt
+  startedAt
+  duration
+  draftActions {
+    id
+    type
+    sequenceNumber
+    drafter {
+      id
+      type
+    }
+    draftable {
+      id
+      type
+      name
+      linkedDraftable {
+        id
+        type
+        name
+      }
+    }
+  }
+  teams {
+    id
+    name
+    won
+    score
+    kills
+    deaths
+    killAssistsGiven
+    killAssistsReceived
+    killAssistsReceivedFromPlayer {
+      playerId
+      killAssistsReceived
+    }
+    teamkills
+    teamkillAssistsGiven
+    teamkillAssistsReceived
+    selfkills
+    firstKill
+    structuresDestroyed
+    structuresCaptured
+    objectives {
+      type
+      completionCount
+    }
+    players {
+      id
+      name
+      participationStatus
+      kills
+      deaths
+      killAssistsGiven
+      killAssistsReceived
+      killAssistsReceivedFromPlayer {
+        playerId
+        killAssistsReceived
+      }
+      teamkills
+      teamkillAssistsGiven
+      teamkillAssistsReceived
+      selfkills
+      firstKill
+      structuresDestroyed
+      structuresCaptured
+      objectives {
+        type
+        completionCount
+      }
+    }
+  }
+  games {
+    id
+    sequenceNumber
+    started
+    finished
+    paused
+    startedAt
+    duration
+    type
+    map {
+      id
+      name
+    }
+    clock {
+      id
+      type
+      ticking
+      ticksBackwards
+      currentSeconds
+    }
+    draftActions {
+      id
+      type
+      sequenceNumber
+      drafter {
+        id
+        type
+      }
+      draftable {
+        id
+        type
+        name
+        linkedDraftable {
+          id
+          type
+          name
+        }
+      }
+    }
+    teams {
+      id
+      name
+      side
+      won
+      score
+      money
+      loadoutValue
+      netWorth
+      kills
+      deaths
+      killAssistsGiven
+      killAssistsReceived
+      killAssistsReceivedFromPlayer {
+        playerId
+        killAssistsReceived
+      }
+      teamkills
+      teamkillAssistsGiven
+      teamkillAssistsReceived
+      selfkills
+      firstKill
+      structuresDestroyed
+      structuresCaptured
+      objectives {
+        type
+        completionCount
+      }
+      players {
+        id
+        name
+        character {
+          id
+          name
+        }
+        participationStatus
+        money
+        loadoutValue
+        netWorth
+        kills
+        deaths
+        killAssistsGiven
+        killAssistsReceived
+        killAssistsReceivedFromPlayer {
+          playerId
+          killAssistsReceived
+        }
+        teamkills
+        teamkillAssistsGiven
+        teamkillAssistsReceived
+        selfkills
+        firstKill
+        structuresDestroyed
+        structuresCaptured
+        position {
+          x
+          y
+        }
+        inventory {
+          items {
+            id
+            name
+            quantity
+          }
+        }
+        objectives {
+          type
+          completionCount
+        }
+      }
+    }
+    segments {
+      id
+      type
+      sequenceNumber
+      started
+      finished
+      startedAt
+      duration
+      draftActions {
+        id
+        type
+        sequenceNumber
+        drafter {
+          id
+          type
+        }
+        draftable {
+          id
+          type
+          name
+        }
+      }
+      teams {
+        id
+        name
+        side
+        won
+        kills
+        deaths
+        killAssistsGiven
+        killAssistsReceived
+        killAssistsReceivedFromPlayer {
+          playerId
+          killAssistsReceived
+        }
+        teamkills
+        teamkillAssistsGiven
+        teamkillAssistsReceived
+        selfkills
+        firstKill
+        objectives {
+          type
+          completionCount
+        }
+        players {
+          id
+          name
+          participationStatus
+          kills
+          deaths
+          killAssistsGiven
+          killAssistsReceived
+          killAssistsReceivedFromPlayer {
+            playerId
+            killAssistsReceived
+          }
+          teamkills
+          teamkillAssistsGiven
+          teamkillAssistsReceived
+          selfkills
+          firstKill
+          objectives {
+            type
+            completionCount
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+SERIES_STATE_QUERY = f"""
+query SeriesState($seriesId: ID!) {{
+  seriesState(id: $seriesId) {SERIES_STATE_FIELDS}
+}}
+"""
+
+def is_valid_zip(path: str) -> bool:
+    """Check that a zip file is complete and every member passes its CRC check"""
+    try:
+        with zipfile.ZipFile(path, 'r') as zip_ref:
+            return zip_ref.testzip() is None
+    except (zipfile.BadZipFile, OSError, EOFError):
+        return False
+
+
+def parse_retry_after(value: Optional[str], max_delay: float = DEFAULT_BACKOFF_MAX) -> Optional[float]:
+    """
+    Parse a Retry-After header (delay in seconds or HTTP date) into seconds
+
+    Capped at `max_delay` like the jittered backoff, so one bad header
+    cannot stall a worker (or pause the shared rate limiter) indefinitely.
+    """
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, delay), max_delay)
+
 
 class GridAPIClient:
     """Client for interacting with GRID APIs"""
     
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        rate_limiter: Optional[TokenBucket] = None,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        max_requests_per_second: float = DEFAULT_MAX_REQUESTS_PER_SECOND
+    ):
         self.api_key = api_key
         self.graphql_base_url = "https://api-op.grid.gg"  # Open Access endpoint for GraphQL
         self.file_download_base_url = "https://api.grid.gg"  # Different endpoint for file downloads
         self.headers = {"x-api-key": api_key}
+        # One bucket for every request this client makes (shared across worker threads).
+        # It starts at requests_per_second and adapts to throttling from there.
+        self.rate_limiter = rate_limiter or AdaptiveTokenBucket(
+            requests_per_second, max_rate=max_requests_per_second
+        )
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        
+        # Pooled keep-alive session shared by every method. pool_block caps the
+        # open connections per host at pool_size instead of opening throwaway ones.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    @property
+    def series_state_url(self) -> str:
+        return f"{self.graphql_base_url}/live-data-feed/series-state/graphql"
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(DEFAULT_BACKOFF_MAX, DEFAULT_BACKOFF_BASE * 2 ** attempt))
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a rate-limited request over the pooled session
+        
+        429/5xx responses and connection errors are retried with backoff,
+        honouring Retry-After (capped at DEFAULT_BACKOFF_MAX). Throttling and
+        successes are fed back to the rate limiter so the global request rate
+        tracks the server's limit.
+        After max_retries the last response is returned (or error raised).
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                print(f"  {type(e).__name__} for {url}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                continue
+            
+            if response.status_code not in RETRY_STATUS_CODES:
+                self.rate_limiter.on_success()
+                return response
+            
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status_code == 429:
+                self.rate_limiter.on_throttle(retry_after)
+            if attempt == self.max_retries:
+                return response
+            
+            response.close()
+            delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+            print(f"  HTTP {response.status_code} for {url}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
         
     def _graphql_request(self, query: str, variables: Optional[Dict] = None) -> Dict:
         """Make a GraphQL request to Central Data API"""
-        response = requests.post(
+        response = self._request(
+            'POST',
             f"{self.graphql_base_url}/central-data/graphql",
-            headers=self.headers,
             json={"query": query, "variables": variables or {}}
         )
         
@@ -54,38 +465,41 @@ class GridAPIClient:
         
         return result
     
-    def get_team_series(
-        self, 
-        team_id: str, 
-        title_id: int = 3,  # 3 = LoL, 6 = Valorant
-        limit: int = 50,
+    @staticmethod
+    def series_filter(
+        team_id: str,
+        title_id: int = 3,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None
-    ) -> List[Dict]:
-        """
-        Get series IDs for a specific team
-        
-        Args:
-            team_id: GRID team ID
-            title_id: 3 for LoL, 6 for Valorant
-            limit: Number of series to fetch (max 50 per request)
-            start_date: ISO format date string (e.g., "2024-01-01T00:00:00Z")
-            end_date: ISO format date string
-        """
-        
-        # Build filter
+    ) -> str:
+        """Build the allSeries filter for a team, optionally bounded by startTimeScheduled"""
         filter_parts = [
             f'titleIds: {{ in: [{title_id}] }}',
             f'teamIds: {{ in: ["{team_id}"] }}',
             'types: ESPORTS'
         ]
         
-        if start_date and end_date:
-            filter_parts.append(
-                f'startTimeScheduled: {{ gte: "{start_date}", lte: "{end_date}" }}'
-            )
+        # Either bound may be given on its own (e.g. gte only for incremental syncs)
+        bounds = []
+        if start_date:
+            bounds.append(f'gte: "{start_date}"')
+        if end_date:
+            bounds.append(f'lte: "{end_date}"')
+        if bounds:
+            filter_parts.append(f'startTimeScheduled: {{ {", ".join(bounds)} }}')
         
-        filter_str = ", ".join(filter_parts)
+        return ", ".join(filter_parts)
+    
+    @staticmethod
+    def team_series_query(
+        team_id: str,
+        title_id: int = 3,
+        limit: int = 50,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> str:
+        """Build the allSeries query used by get_team_series"""
+        filter_str = GridAPIClient.series_filter(team_id, title_id, start_date, end_date)
         
         query = f"""
         {{
@@ -129,6 +543,27 @@ class GridAPIClient:
         }}
         """
         
+        return query
+    
+    def get_team_series(
+        self, 
+        team_id: str, 
+        title_id: int = 3,  # 3 = LoL, 6 = Valorant
+        limit: int = 50,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Get series IDs for a specific team
+        
+        Args:
+            team_id: GRID team ID
+            title_id: 3 for LoL, 6 for Valorant
+            limit: Number of series to fetch (max 50 per request)
+            start_date: ISO format date string (e.g., "2024-01-01T00:00:00Z")
+            end_date: ISO format date string
+        """
+        query = self.team_series_query(team_id, title_id, limit, start_date, end_date)
         result = self._graphql_request(query)
         
         if 'errors' in result:
@@ -147,271 +582,10 @@ class GridAPIClient:
         Fetches ALL available fields for League of Legends based on actual Grid API schema
         """
         # Series State API uses a different GraphQL endpoint
-        response = requests.post(
-            f"{self.graphql_base_url}/live-data-feed/series-state/graphql",
-            headers=self.headers,
-            json={"query": """
-        query SeriesState($seriesId: ID!) {
-          seriesState(id: $seriesId) {
-            id
-            version
-            valid
-            started
-            finished
-            format
-            updatedAt
-            startedAt
-            duration
-            draftActions {
-              id
-              type
-              sequenceNumber
-              drafter {
-                id
-                type
-              }
-              draftable {
-                id
-                type
-                name
-                linkedDraftable {
-                  id
-                  type
-                  name
-                }
-              }
-            }
-            teams {
-              id
-              name
-              won
-              score
-              kills
-              deaths
-              killAssistsGiven
-              killAssistsReceived
-              killAssistsReceivedFromPlayer {
-                playerId
-                killAssistsReceived
-              }
-              teamkills
-              teamkillAssistsGiven
-              teamkillAssistsReceived
-              selfkills
-              firstKill
-              structuresDestroyed
-              structuresCaptured
-              objectives {
-                type
-                completionCount
-              }
-              players {
-                id
-                name
-                participationStatus
-                kills
-                deaths
-                killAssistsGiven
-                killAssistsReceived
-                killAssistsReceivedFromPlayer {
-                  playerId
-                  killAssistsReceived
-                }
-                teamkills
-                teamkillAssistsGiven
-                teamkillAssistsReceived
-                selfkills
-                firstKill
-                structuresDestroyed
-                structuresCaptured
-                objectives {
-                  type
-                  completionCount
-                }
-              }
-            }
-            games {
-              id
-              sequenceNumber
-              started
-              finished
-              paused
-              startedAt
-              duration
-              type
-              map {
-                id
-                name
-              }
-              clock {
-                id
-                type
-                ticking
-                ticksBackwards
-                currentSeconds
-              }
-              draftActions {
-                id
-                type
-                sequenceNumber
-                drafter {
-                  id
-                  type
-                }
-                draftable {
-                  id
-                  type
-                  name
-                  linkedDraftable {
-                    id
-                    type
-                    name
-                  }
-                }
-              }
-              teams {
-                id
-                name
-                side
-                won
-                score
-                money
-                loadoutValue
-                netWorth
-                kills
-                deaths
-                killAssistsGiven
-                killAssistsReceived
-                killAssistsReceivedFromPlayer {
-                  playerId
-                  killAssistsReceived
-                }
-                teamkills
-                teamkillAssistsGiven
-                teamkillAssistsReceived
-                selfkills
-                firstKill
-                structuresDestroyed
-                structuresCaptured
-                objectives {
-                  type
-                  completionCount
-                }
-                players {
-                  id
-                  name
-                  character {
-                    id
-                    name
-                  }
-                  participationStatus
-                  money
-                  loadoutValue
-                  netWorth
-                  kills
-                  deaths
-                  killAssistsGiven
-                  killAssistsReceived
-                  killAssistsReceivedFromPlayer {
-                    playerId
-                    killAssistsReceived
-                  }
-                  teamkills
-                  teamkillAssistsGiven
-                  teamkillAssistsReceived
-                  selfkills
-                  firstKill
-                  structuresDestroyed
-                  structuresCaptured
-                  position {
-                    x
-                    y
-                  }
-                  inventory {
-                    items {
-                      id
-                      name
-                      quantity
-                    }
-                  }
-                  objectives {
-                    type
-                    completionCount
-                  }
-                }
-              }
-              segments {
-                id
-                type
-                sequenceNumber
-                started
-                finished
-                startedAt
-                duration
-                draftActions {
-                  id
-                  type
-                  sequenceNumber
-                  drafter {
-                    id
-                    type
-                  }
-                  draftable {
-                    id
-                    type
-                    name
-                  }
-                }
-                teams {
-                  id
-                  name
-                  side
-                  won
-                  kills
-                  deaths
-                  killAssistsGiven
-                  killAssistsReceived
-                  killAssistsReceivedFromPlayer {
-                    playerId
-                    killAssistsReceived
-                  }
-                  teamkills
-                  teamkillAssistsGiven
-                  teamkillAssistsReceived
-                  selfkills
-                  firstKill
-                  objectives {
-                    type
-                    completionCount
-                  }
-                  players {
-                    id
-                    name
-                    participationStatus
-                    kills
-                    deaths
-                    killAssistsGiven
-                    killAssistsReceived
-                    killAssistsReceivedFromPlayer {
-                      playerId
-                      killAssistsReceived
-                    }
-                    teamkills
-                    teamkillAssistsGiven
-                    teamkillAssistsReceived
-                    selfkills
-                    firstKill
-                    objectives {
-                      type
-                      completionCount
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
-        """, "variables": {"seriesId": series_id}}
+        response = self._request(
+            'POST',
+            self.series_state_url,
+            json={"query": SERIES_STATE_QUERY, "variables": {"seriesId": series_id}}
         )
         
         # Check for HTTP errors
@@ -431,45 +605,151 @@ class GridAPIClient:
         
         return result['data']['seriesState']
     
-    def download_series_events(self, series_id: str, output_path: Optional[str] = None) -> str:
+    def get_series_states(
+        self,
+        series_ids: Iterable[str],
+        batch_size: int = DEFAULT_STATE_BATCH_SIZE,
+        max_response_bytes: int = DEFAULT_MAX_STATE_RESPONSE_BYTES
+    ) -> Dict[str, Optional[Dict]]:
         """
-        Download series events file (JSONL format, zipped)
+        Get series states for many series, several per request
         
-        Returns path to downloaded file
+        Each request aliases one seriesState field per series (s0, s1, ...).
+        A batch the server rejects as too large is split in half and retried.
+        Later batches use the largest size that was accepted, and are halved
+        again whenever a response exceeds max_response_bytes.
+        
+        Returns dict of series_id -> state (None if that series failed)
         """
-        url = f"{self.file_download_base_url}/file-download/events/grid/series/{series_id}"
+        series_ids = list(series_ids)
+        states = {}
+        
+        start = 0
+        while start < len(series_ids):
+            batch = series_ids[start:start + batch_size]
+            response_bytes, accepted = self._series_state_batch(batch, states)
+            start += len(batch)
+            batch_size = min(batch_size, accepted)
+            
+            if response_bytes > max_response_bytes and batch_size > 1:
+                batch_size = max(1, batch_size // 2)
+                print(f"  Series state response was {response_bytes // 1024} KB, batch size now {batch_size}")
         
-        response = requests.get(url, headers=self.headers, stream=True)
-        response.raise_for_status()
+        return states
+    
+    @staticmethod
+    def series_states_query(series_ids: List[str]) -> Tuple[str, Dict[str, str]]:
+        """Build an aliased query (s0, s1, ...) fetching the state of every series in one request"""
+        params = ", ".join(f"$id{i}: ID!" for i in range(len(series_ids)))
+        fields = "\n".join(
+            f"s{i}: seriesState(id: $id{i}) {SERIES_STATE_FIELDS}" for i in range(len(series_ids))
+        )
+        query = f"query SeriesStates({params}) {{\n{fields}\n}}"
+        variables = {f"id{i}": series_id for i, series_id in enumerate(series_ids)}
+        return query, variables
+    
+    @staticmethod
+    def batch_too_large(status_code: int, errors: List[Dict]) -> bool:
+        """Whether a batched query was rejected because of its size rather than its content"""
+        return status_code in (413, 502, 503, 504) or any(
+            word in error.get('message', '').lower()
+            for error in errors
+            for word in ('complexity', 'too large', 'too many', 'exceeds')
+        )
+    
+    def _series_state_batch(self, series_ids: List[str], states: Dict[str, Optional[Dict]]) -> Tuple[int, int]:
+        """
+        Fetch one aliased batch into `states`, splitting it if the server rejects the size
         
-        if output_path is None:
-            output_path = f"events_{series_id}_grid.jsonl.zip"
+        Returns (largest response size, largest batch size the server accepted)
+        """
+        query, variables = self.series_states_query(series_ids)
+        response = self._request('POST', self.series_state_url, json={"query": query, "variables": variables})
+        result = response.json() if response.status_code == 200 else {}
+        errors = result.get('errors', [])
+        
+        if self.batch_too_large(response.status_code, errors) and len(series_ids) > 1:
+            half = len(series_ids) // 2
+            print(f"  Series state batch of {len(series_ids)} rejected, splitting")
+            first = self._series_state_batch(series_ids[:half], states)
+            second = self._series_state_batch(series_ids[half:], states)
+            return max(first[0], second[0]), min(first[1], second[1])
         
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        if response.status_code != 200:
+            print(f"\nHTTP Error {response.status_code} for series states {series_ids}")
+            for series_id in series_ids:
+                states[series_id] = None
+            return len(response.content), len(series_ids)
         
-        print(f"Downloaded events file: {output_path}")
-        return output_path
+        # Errors scoped to one alias only void that series
+        for error in errors:
+            print(f"  - {error.get('message', 'Unknown error')} (path: {error.get('path')})")
+        
+        data = result.get('data') or {}
+        for i, series_id in enumerate(series_ids):
+            states[series_id] = data.get(f"s{i}")
+        
+        return len(response.content), len(series_ids)
     
-    def download_series_end_state(self, series_id: str, output_path: Optional[str] = None) -> str:
+    def _download_to_file(self, url: str, output_path: str, validate_zip: bool = False):
         """
-        Download series end state file (JSON format)
+        Stream a file download to disk atomically
         
-        Returns path to downloaded file
+        Data goes to <output_path>.part and is renamed into place only once
+        complete (and, for zips, once every member passes its CRC check), so an
+        interrupted run never leaves a truncated file under the final name. An
+        existing .part file is resumed with an HTTP Range request.
         """
-        url = f"{self.file_download_base_url}/file-download/end-state/grid/series/{series_id}"
+        part_path = output_path + PARTIAL_SUFFIX
         
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
+        # _request already retries failed requests; this loop only resumes a body
+        # cut off mid-stream, or downloads again a zip that fails its CRC check
+        for attempt in range(self.max_retries + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+            
+            with self._request('GET', url, stream=True, headers=headers) as response:
+                # 416: nothing left to fetch, the partial file is already complete
+                if response.status_code != 416:
+                    response.raise_for_status()
+                    
+                    # 206 continues the partial file; a plain 200 restarts it
+                    mode = 'ab' if response.status_code == 206 else 'wb'
+                    try:
+                        with open(part_path, mode) as f:
+                            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
+                    except (requests.exceptions.ChunkedEncodingError,
+                            requests.exceptions.ConnectionError,
+                            requests.exceptions.Timeout) as e:
+                        if attempt == self.max_retries:
+                            raise
+                        print(f"  Download interrupted ({type(e).__name__}), resuming {output_path}")
+                        continue
+            
+            if not validate_zip or is_valid_zip(part_path):
+                break
+            os.remove(part_path)
+            if attempt == self.max_retries:
+                raise IOError(f"Corrupt zip downloaded from {url}")
+            print(f"  Corrupt zip downloaded from {url}, downloading it again")
+        
+        os.replace(part_path, output_path)
+    
+    def download_series_events(self, series_id: str, output_path: Optional[str] = None) -> str:
+        """
+        Download series events file (JSONL format, zipped)
+        
+        Returns path to downloaded file
+        """
+        url = f"{self.file_download_base_url}/file-download/events/grid/series/{series_id}"
         
         if output_path is None:
-            output_path = f"end_state_{series_id}_grid.json"
+            output_path = f"events_{series_id}_grid.jsonl.zip"
         
-        with open(output_path, 'w') as f:
-            json.dump(response.json(), f, indent=2)
+        self._download_to_file(url, output_path, validate_zip=True)
         
-        print(f"Downloaded end state file: {output_path}")
+        print(f"Downloaded events file: {output_path}")
         return output_path
     
     def download_series_end_state(self, series_id: str, output_path: Optional[str] = None) -> str:
@@ -480,14 +760,16 @@ class GridAPIClient:
         """
         url = f"{self.file_download_base_url}/file-download/end-state/grid/series/{series_id}"
         
-        response = requests.get(url, headers=self.headers)
+        response = self._request('GET', url)
         response.raise_for_status()
         
         if output_path is None:
             output_path = f"end_state_{series_id}_grid.json"
         
-        with open(output_path, 'w') as f:
+        part_path = output_path + PARTIAL_SUFFIX
+        with open(part_path, 'w') as f:
             json.dump(response.json(), f, indent=2)
+        os.replace(part_path, output_path)
         
         print(f"Downloaded end state file: {output_path}")
         return output_path
@@ -502,15 +784,10 @@ class GridAPIClient:
         url = f"{self.file_download_base_url}/file-download/events/riot/series/{series_id}"
         
         try:
-            response = requests.get(url, headers=self.headers, stream=True)
-            response.raise_for_status()
-            
             if output_path is None:
                 output_path = f"events_{series_id}_riot.jsonl.zip"
             
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            self._download_to_file(url, output_path, validate_zip=True)
             
             print(f"Downloaded Riot events file: {output_path}")
             return output_path
@@ -530,15 +807,10 @@ class GridAPIClient:
         url = f"{self.file_download_base_url}/file-download/end-state/riot/series/{series_id}"
         
         try:
-            response = requests.get(url, headers=self.headers, stream=True)
-            response.raise_for_status()
-            
             if output_path is None:
                 output_path = f"end_state_{series_id}_riot.json.zip"
             
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            self._download_to_file(url, output_path, validate_zip=True)
             
             print(f"Downloaded Riot end state file: {output_path}")
             return output_path
@@ -554,23 +826,260 @@ class GridAPIClient:
         """
         url = f"{self.file_download_base_url}/file-download/list/{series_id}"
         
-        response = requests.get(url, headers=self.headers)
+        response = self._request('GET', url)
         response.raise_for_status()
-        
+
         return response.json()
 
+    def download_series_files(
+        self,
+        series_id: str,
+        output_dir: str,
+        include_riot: bool = True
+    ) -> Dict[str, Optional[str]]:
+        """
+        Download the GRID events and end state (and optionally the Riot files) for one series
+
+        Returns dict of file kind -> path (None for an end state that could not
+        be downloaded and for Riot files that are not available). Only a
+        failed events download raises.
+        """
+        files = {
+            'events': self.download_series_events(
+                series_id, output_path=os.path.join(output_dir, f"events_{series_id}.jsonl.zip")
+            )
+        }
+
+        # The end state is optional: the events are still processed without it
+        try:
+            files['end_state'] = self.download_series_end_state(
+                series_id, output_path=os.path.join(output_dir, f"end_state_{series_id}_grid.json")
+            )
+        except Exception as e:
+            print(f"  Warning: Could not download GRID end state: {e}")
+            files['end_state'] = None
+
+        if include_riot:
+            files['riot_events'] = self.download_riot_events(
+                series_id, output_path=os.path.join(output_dir, f"events_{series_id}_riot.jsonl.zip")
+            )
+            files['riot_end_state'] = self.download_riot_end_state(
+                series_id, output_path=os.path.join(output_dir, f"end_state_{series_id}_riot.json.zip")
+            )
+
+        return files
+
+    def download_many_series(
+        self,
+        series_ids: Iterable[str],
+        output_dir: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        include_riot: bool = True
+    ) -> Dict[str, Dict]:
+        """
+        Download files for many series in parallel
+
+        Requests from all workers go through the shared rate limiter. A failing
+        series is recorded and never aborts the rest of the batch.
+
+        Returns dict of series_id -> {'files': {...} or None, 'error': str or None}
+        """
+        series_ids = list(series_ids)
+        results = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(self.download_series_files, series_id, output_dir, include_riot): series_id
+                for series_id in series_ids
+            }
+
+            for done, future in enumerate(as_completed(futures), 1):
+                series_id = futures[future]
+                try:
+                    results[series_id] = {'files': future.result(), 'error': None}
+                    print(f"[{done}/{len(series_ids)}] {series_id} ✅")
+                except Exception as e:
+                    results[series_id] = {'files': None, 'error': str(e)}
+                    print(f"[{done}/{len(series_ids)}] {series_id} ❌ ({e})")
+
+        return results
+
+
+class ExtractionEngine:
+    """
+    Single-pass event extraction
+    
+    Extractors register a handler and the event types it wants (None for
+    every event). run() routes each event once, via a type -> handlers
+    dispatch table, to every interested handler, which appends its records
+    to the output of its section.
+    """
+    
+    def __init__(self):
+        self._sections = {}  # name -> output factory
+        self._typed = defaultdict(list)  # event type -> [(name, handler)]
+        self._untyped = []  # [(name, handler)] run for every event
+    
+    def register(
+        self,
+        name: str,
+        handler: Callable[[Dict, Any], None],
+        event_types: Optional[Iterable[str]] = None,
+        factory: Callable[[], Any] = list
+    ):
+        """
+        Add an extractor producing the `name` section
+        
+        handler(event, output) is called for each matching event; output
+        starts as factory() (a list unless given otherwise).
+        """
+        if name in self._sections:
+            raise ValueError(f"Extractor already registered: {name}")
+        self._sections[name] = factory
+        if event_types is None:
+            self._untyped.append((name, handler))
+        else:
+            for event_type in event_types:
+                self._typed[event_type].append((name, handler))
+    
+    @property
+    def sections(self) -> List[str]:
+        return list(self._sections)
+    
+    def run(self, events: Iterable[Dict]) -> Tuple[Dict[str, Any], int]:
+        """
+        Route every event to its handlers in one pass
+        
+        Returns (section name -> output, number of events seen)
+        """
+        outputs = {name: factory() for name, factory in self._sections.items()}
+        untyped = [(handler, outputs[name]) for name, handler in self._untyped]
+        
+        # Handlers for each event type bound to their outputs, built on first sight of the type
+        routes = {}
+        count = 0
+        for event in events:
+            count += 1
+            event_type = event['type']
+            route = routes.get(event_type)
+            if route is None:
+                route = routes[event_type] = [
+                    (handler, outputs[name]) for name, handler in self._typed.get(event_type, ())
+                ] + untyped
+            for handler, output in route:
+                handler(event, output)
+        
+        return outputs, count
+
 
 class EventProcessor:
     """Process GRID event files for analysis"""
     
+    KILL_TYPES = frozenset(['player-killed-player'])
+    
+    OBJECTIVE_TYPES = frozenset([
+        'player-completed-slayBaronNashor',
+        'player-completed-slayCloudDrake',
+        'player-completed-slayInfernalDrake',
+        'player-completed-slayMountainDrake',
+        'player-completed-slayOceanDrake',
+        'player-completed-slayHextechDrake',
+        'player-completed-slayChemtechDrake',
+        'player-completed-slayElderDragon',
+        'player-completed-slayRiftHerald',
+        'player-completed-destroyTower',
+        'player-completed-destroyInhibitor',
+        'player-completed-destroyAncient',
+        'team-destroyed-tower',
+        'team-destroyed-inhibitor',
+        'team-completed-destroyTurretPlateTop',
+        'team-completed-destroyTurretPlateMid',
+        'team-completed-destroyTurretPlateBot'
+    ])
+    
+    ABILITY_TYPES = frozenset(['player-used-ability'])
+    
+    ITEM_EVENT_TYPES = frozenset([
+        'player-purchased-item',
+        'player-picked-up-item',
+        'player-dropped-item'
+    ])
+    
+    WARD_EVENT_TYPES = frozenset([
+        'player-purchased-item', 'player-acquired-item', 'player-lost-item', 'player-pickedUp-item'
+    ])
+    
+    WARD_ITEMS = (
+        'stealth ward', 'control ward', 'farsight alteration',
+        'oracle lens', 'warding totem', 'sweeping lens',
+        'vision ward', 'sight ward'
+    )
+    
+    GOLD_EVENT_TYPES = frozenset(['player-purchased-item', 'player-sold-item'])
+    
+    # Common summoner spell keywords
+    SUMMONER_KEYWORDS = (
+        'flash', 'ignite', 'teleport', 'smite', 'heal',
+        'barrier', 'exhaust', 'cleanse', 'ghost', 'clarity'
+    )
+    
+    LEVEL_TYPES = frozenset(['player-completed-increaseLevel'])
+    
+    DRAFT_EVENT_TYPES = frozenset([
+        'player-picked-character',
+        'player-banned-character',
+        'team-picked-character',
+        'team-banned-character',
+        'team-picked-map',
+        'team-banned-map'
+    ])
+    
+    STRUCTURE_EVENT_TYPES = frozenset([
+        'player-destroyed-tower',
+        'player-destroyed-inhibitor',
+        'player-destroyed-nexus',
+        'team-destroyed-tower',
+        'team-destroyed-inhibitor',
+        'team-destroyed-nexus',
+        'player-completed-destroyTower',
+        'player-completed-destroyInhibitor',
+        'player-completed-destroyAncient',
+        'team-completed-destroyTurretPlateTop',
+        'team-completed-destroyTurretPlateMid',
+        'team-completed-destroyTurretPlateBot'
+    ])
+    
+    VISION_EVENT_TYPES = frozenset([
+        'player-placed-ward',
+        'player-destroyed-ward',
+        'player-used-trinket',
+        'player-purchased-item',  # For control wards
+        'player-acquired-item',
+        'player-lost-item'
+    ])
+    
+    VISION_KEYWORDS = ('ward', 'trinket', 'lens', 'totem', 'farsight', 'oracle', 'sweeping')
+    
+    # Game boundaries within a series' event feed (game_time_ms is relative to the last start,
+    # game_index counts the starts)
+    GAME_START_TYPES = frozenset(['series-started-game'])
+    GAME_END_TYPES = frozenset(['series-ended-game'])
+    
     @staticmethod
-    def parse_events_file(file_path: str) -> List[Dict]:
+    def iter_events(file_path: str) -> Iterator[Dict]:
         """
-        Parse a GRID events JSONL zip file
-        
-        Returns list of all events
+        Stream the events of a GRID events JSONL zip file, one at a time
+        
+        Only the current transaction is held in memory. Each event is tagged
+        with its transaction's id, time and sequence number, and with
+        game_time_ms: integer ms since its game started, and game_index: the
+        game's number within the series from 1 (both None outside a game,
+        e.g. during draft). game_time_ms restarts with every game, so only
+        compare it between events of the same game_index.
         """
-        events = []
+        game_start_ms = None
+        game_index = None
+        games_started = 0
         
         with zipfile.ZipFile(file_path, 'r') as zip_ref:
             # Get the JSONL file inside the zip
@@ -578,144 +1087,398 @@ class EventProcessor:
             
             with zip_ref.open(jsonl_filename) as jsonl_file:
                 for line in jsonl_file:
-                    transaction = json.loads(line.decode('utf-8'))
+                    transaction = json_backend.loads(line)
+                    occurred_at = transaction['occurredAt']
+                    occurred_ms = iso_to_ms(occurred_at)
                     
                     # Each transaction contains multiple events
                     for event in transaction.get('events', []):
+                        event_type = event.get('type')
+                        if event_type in EventProcessor.GAME_START_TYPES:
+                            game_start_ms = occurred_ms
+                            games_started += 1
+                            game_index = games_started
+                        
                         event['transaction_id'] = transaction['id']
-                        event['occurred_at'] = transaction['occurredAt']
+                        event['occurred_at'] = occurred_at
                         event['sequence_number'] = transaction['sequenceNumber']
-                        events.append(event)
+                        event['game_time_ms'] = occurred_ms - game_start_ms if game_start_ms is not None else None
+                        event['game_index'] = game_index
+                        
+                        if event_type in EventProcessor.GAME_END_TYPES:
+                            game_start_ms = None
+                            game_index = None
+                        yield event
+    
+    @staticmethod
+    def parse_events_file(file_path: str) -> List[Dict]:
+        """
+        Parse a GRID events JSONL zip file
+        
+        Returns list of all events (prefer iter_events for large files)
+        """
+        events = list(EventProcessor.iter_events(file_path))
         
         print(f"Parsed {len(events)} events from {file_path}")
         return events
     
     @staticmethod
-    def filter_events_by_type(events: List[Dict], event_types: List[str]) -> List[Dict]:
+    def filter_events_by_type(events: Iterable[Dict], event_types: Iterable[str]) -> List[Dict]:
         """Filter events by type"""
+        event_types = frozenset(event_types)
         return [e for e in events if e['type'] in event_types]
     
     @staticmethod
-    def extract_kills(events: List[Dict]) -> List[Dict]:
-        """Extract kill events with ALL relevant data including assists"""
-        kill_events = EventProcessor.filter_events_by_type(
-            events, 
-            ['player-killed-player']
-        )
-        
-        kills = []
-        for event in kill_events:
-            # Extract all participants (killer, victim, assisters)
-            actor_state = event.get('actor', {}).get('state', {})
-            target_state = event.get('target', {}).get('state', {})
-            
-            kill_data = {
-                'timestamp': event['occurred_at'],
-                'sequence_number': event.get('sequence_number'),
-                'killer_id': event['actor']['id'],
-                'victim_id': event['target']['id'],
-                'killer_position': actor_state.get('position'),
-                'victim_position': target_state.get('position'),
-                'killer_team': actor_state.get('teamId'),
-                'victim_team': target_state.get('teamId'),
-                'killer_health': actor_state.get('health'),
-                'killer_level': actor_state.get('level'),
-                'victim_level': target_state.get('level'),
-                'game_state': event.get('seriesState', {}),
-                # Assists will be in separate events, but we track the kill
-                'kill_type': event.get('type')
-            }
-            kills.append(kill_data)
-        
-        return kills
+    def default_engine() -> ExtractionEngine:
+        """An ExtractionEngine producing every standard `processed` section"""
+        engine = ExtractionEngine()
+        engine.register('kills', EventProcessor.handle_kill, EventProcessor.KILL_TYPES)
+        engine.register('objectives', EventProcessor.handle_objective, EventProcessor.OBJECTIVE_TYPES)
+        engine.register('abilities', EventProcessor.handle_ability, EventProcessor.ABILITY_TYPES)
+        engine.register('items', EventProcessor.handle_item, EventProcessor.ITEM_EVENT_TYPES)
+        engine.register('wards', EventProcessor.handle_ward, EventProcessor.WARD_EVENT_TYPES)
+        engine.register('gold', EventProcessor.handle_gold, EventProcessor.GOLD_EVENT_TYPES)
+        engine.register('summoner_spells', EventProcessor.handle_summoner_spell, EventProcessor.ABILITY_TYPES)
+        engine.register('levels', EventProcessor.handle_level, EventProcessor.LEVEL_TYPES)
+        engine.register('draft', EventProcessor.handle_draft, EventProcessor.DRAFT_EVENT_TYPES)
+        engine.register('assist_details', EventProcessor.handle_assist, EventProcessor.KILL_TYPES)
+        engine.register('structures', EventProcessor.handle_structure, EventProcessor.STRUCTURE_EVENT_TYPES)
+        engine.register('vision', EventProcessor.handle_vision, EventProcessor.VISION_EVENT_TYPES)
+        engine.register('gold_timeline', EventProcessor.handle_gold_snapshot)
+        engine.register('exp_timeline', EventProcessor.handle_exp_snapshot)
+        engine.register('all_positions', EventProcessor.handle_positions, factory=dict)
+        return engine
     
     @staticmethod
-    def extract_objectives(events: List[Dict]) -> List[Dict]:
-        """Extract objective completion events"""
-        objective_types = [
-            'player-completed-slayBaronNashor',
-            'player-completed-slayCloudDrake',
-            'player-completed-slayInfernalDrake',
-            'player-completed-slayMountainDrake',
-            'player-completed-slayOceanDrake',
-            'player-completed-slayHextechDrake',
-            'player-completed-slayChemtechDrake',
-            'player-completed-slayElderDragon',
-            'player-completed-slayRiftHerald',
-            'player-completed-destroyTower',
-            'player-completed-destroyInhibitor',
-            'player-completed-destroyAncient',
-            'team-destroyed-tower',
-            'team-destroyed-inhibitor',
-            'team-completed-destroyTurretPlateTop',
-            'team-completed-destroyTurretPlateMid',
-            'team-completed-destroyTurretPlateBot'
-        ]
-        
-        objective_events = EventProcessor.filter_events_by_type(events, objective_types)
+    def _extract(events: Iterable[Dict], handler: Callable[[Dict, Any], None], event_types=None, output=None):
+        """Run a single handler over events (what ExtractionEngine does for all of them at once)"""
+        output = [] if output is None else output
+        for event in events:
+            if event_types is None or event['type'] in event_types:
+                handler(event, output)
+        return output
+    
+    # ----------------------
+    # Per-event handlers: handler(event, output) appends the event's records to output
+    
+    @staticmethod
+    def handle_kill(event: Dict, kills: List[Dict]):
+        # Extract all participants (killer, victim, assisters)
+        actor_state = event.get('actor', {}).get('state', {})
+        target_state = event.get('target', {}).get('state', {})
+        
+        kills.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'sequence_number': event.get('sequence_number'),
+            'killer_id': event['actor']['id'],
+            'victim_id': event['target']['id'],
+            'killer_position': actor_state.get('position'),
+            'victim_position': target_state.get('position'),
+            'killer_team': actor_state.get('teamId'),
+            'victim_team': target_state.get('teamId'),
+            'killer_health': actor_state.get('health'),
+            'killer_level': actor_state.get('level'),
+            'victim_level': target_state.get('level'),
+            'game_state': event.get('seriesState', {}),
+            # Assists will be in separate events, but we track the kill
+            'kill_type': event.get('type')
+        })
+    
+    @staticmethod
+    def handle_objective(event: Dict, objectives: List[Dict]):
+        objectives.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'type': event['type'].replace('player-completed-', '').replace('team-completed-', '').replace('team-destroyed-', ''),
+            'player_id': event.get('actor', {}).get('id'),
+            'team_id': event.get('actor', {}).get('state', {}).get('teamId'),
+            'position': event.get('actor', {}).get('state', {}).get('position'),
+            'game_state': event.get('seriesState', {})
+        })
+    
+    @staticmethod
+    def handle_ability(event: Dict, abilities: List[Dict]):
+        abilities.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'player_id': event['actor']['id'],
+            'ability_name': event['target'].get('name', 'Unknown'),
+            'position': event['actor'].get('state', {}).get('position'),
+            'game_state': event.get('seriesState', {})
+        })
+    
+    @staticmethod
+    def handle_item(event: Dict, items: List[Dict]):
+        items.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'event_type': event['type'],
+            'player_id': event['actor']['id'],
+            'item_name': event['target'].get('name', 'Unknown'),
+            'position': event['actor'].get('state', {}).get('position'),
+            'game_state': event.get('seriesState', {})
+        })
+    
+    @staticmethod
+    def handle_ward(event: Dict, ward_events: List[Dict]):
+        item_name = event.get('target', {}).get('name', '').lower()
         
-        objectives = []
-        for event in objective_events:
-            obj_data = {
+        # Check if it's a ward-related item
+        if any(ward in item_name for ward in EventProcessor.WARD_ITEMS):
+            ward_events.append({
                 'timestamp': event['occurred_at'],
-                'type': event['type'].replace('player-completed-', '').replace('team-completed-', '').replace('team-destroyed-', ''),
+                'game_time_ms': event.get('game_time_ms'),
+                'game_index': event.get('game_index'),
+                'event_type': event['type'],
                 'player_id': event.get('actor', {}).get('id'),
                 'team_id': event.get('actor', {}).get('state', {}).get('teamId'),
                 'position': event.get('actor', {}).get('state', {}).get('position'),
+                'item_name': event.get('target', {}).get('name'),
                 'game_state': event.get('seriesState', {})
-            }
-            objectives.append(obj_data)
-        
-        return objectives
+            })
     
     @staticmethod
-    def extract_ability_usage(events: List[Dict]) -> List[Dict]:
-        """Extract ability/spell usage events"""
-        ability_events = EventProcessor.filter_events_by_type(
-            events,
-            ['player-used-ability']
-        )
+    def handle_gold(event: Dict, gold_events: List[Dict]):
+        actor_state = event.get('actor', {}).get('state', {})
+        gold_events.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'event_type': event['type'],
+            'player_id': event.get('actor', {}).get('id'),
+            'team_id': actor_state.get('teamId'),
+            'item_name': event.get('target', {}).get('name'),
+            'item_cost': event.get('target', {}).get('cost'),
+            'current_gold': actor_state.get('gold'),
+            'position': actor_state.get('position'),
+            'game_state': event.get('seriesState', {})
+        })
+    
+    @staticmethod
+    def handle_summoner_spell(event: Dict, spell_events: List[Dict]):
+        ability_name = event.get('target', {}).get('name', '').lower()
         
-        abilities = []
-        for event in ability_events:
-            ability_data = {
+        # Check if it's a summoner spell
+        if any(keyword in ability_name for keyword in EventProcessor.SUMMONER_KEYWORDS):
+            spell_events.append({
                 'timestamp': event['occurred_at'],
-                'player_id': event['actor']['id'],
-                'ability_name': event['target'].get('name', 'Unknown'),
-                'position': event['actor'].get('state', {}).get('position'),
+                'game_time_ms': event.get('game_time_ms'),
+                'game_index': event.get('game_index'),
+                'player_id': event.get('actor', {}).get('id'),
+                'team_id': event.get('actor', {}).get('state', {}).get('teamId'),
+                'spell_name': event.get('target', {}).get('name'),
+                'position': event.get('actor', {}).get('state', {}).get('position'),
                 'game_state': event.get('seriesState', {})
-            }
-            abilities.append(ability_data)
-        
-        return abilities
+            })
     
     @staticmethod
-    def extract_item_events(events: List[Dict]) -> List[Dict]:
-        """Extract item purchase/pickup/drop events (for vision tracking)"""
-        item_event_types = [
-            'player-purchased-item',
-            'player-picked-up-item',
-            'player-dropped-item'
-        ]
+    def handle_level(event: Dict, levels: List[Dict]):
+        levels.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'player_id': event.get('actor', {}).get('id'),
+            'team_id': event.get('actor', {}).get('state', {}).get('teamId'),
+            'new_level': event.get('actor', {}).get('state', {}).get('level'),
+            'position': event.get('actor', {}).get('state', {}).get('position'),
+            'game_state': event.get('seriesState', {})
+        })
+    
+    @staticmethod
+    def handle_draft(event: Dict, drafts: List[Dict]):
+        drafts.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'sequence_number': event.get('sequence_number'),
+            'event_type': event['type'],
+            'actor_id': event.get('actor', {}).get('id'),
+            'actor_type': event.get('actor', {}).get('type'),
+            'team_id': event.get('actor', {}).get('state', {}).get('teamId') if event.get('actor', {}).get('state') else None,
+            'target_id': event.get('target', {}).get('id'),
+            'target_name': event.get('target', {}).get('name'),
+            'target_type': event.get('target', {}).get('type'),
+            'game_state': event.get('seriesState', {})
+        })
+    
+    @staticmethod
+    def handle_assist(event: Dict, assists: List[Dict]):
+        # Look for assist information in the event
+        actor_state = event.get('actor', {}).get('state', {})
+        target_state = event.get('target', {}).get('state', {})
+        
+        assists.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'sequence_number': event.get('sequence_number'),
+            'killer_id': event['actor']['id'],
+            'victim_id': event['target']['id'],
+            'killer_team': actor_state.get('teamId'),
+            'victim_team': target_state.get('teamId'),
+            'position': actor_state.get('position'),
+            'game_state': event.get('seriesState', {}),
+            # Check if there's assist data in the series state delta
+            'series_state_delta': event.get('seriesStateDelta', {})
+        })
+    
+    @staticmethod
+    def handle_structure(event: Dict, structures: List[Dict]):
+        actor_state = event.get('actor', {}).get('state', {})
+        
+        structures.append({
+            'timestamp': event['occurred_at'],
+            'game_time_ms': event.get('game_time_ms'),
+            'game_index': event.get('game_index'),
+            'sequence_number': event.get('sequence_number'),
+            'event_type': event['type'],
+            'actor_id': event.get('actor', {}).get('id'),
+            'actor_type': event.get('actor', {}).get('type'),
+            'team_id': actor_state.get('teamId'),
+            'structure_type': event.get('target', {}).get('type'),
+            'structure_name': event.get('target', {}).get('name'),
+            'position': actor_state.get('position'),
+            'game_state': event.get('seriesState', {})
+        })
+    
+    @staticmethod
+    def handle_vision(event: Dict, vision_events: List[Dict]):
+        actor_state = event.get('actor', {}).get('state', {})
+        target = event.get('target', {})
         
-        item_events = EventProcessor.filter_events_by_type(events, item_event_types)
+        # Check if it's a ward-related item or action
+        target_name = target.get('name', '').lower() if target else ''
+        is_ward_related = any(ward in target_name for ward in EventProcessor.VISION_KEYWORDS)
         
-        items = []
-        for event in item_events:
-            item_data = {
+        if is_ward_related or event['type'] in ('player-placed-ward', 'player-destroyed-ward'):
+            vision_events.append({
                 'timestamp': event['occurred_at'],
+                'game_time_ms': event.get('game_time_ms'),
+                'game_index': event.get('game_index'),
+                'sequence_number': event.get('sequence_number'),
                 'event_type': event['type'],
-                'player_id': event['actor']['id'],
-                'item_name': event['target'].get('name', 'Unknown'),
-                'position': event['actor'].get('state', {}).get('position'),
+                'player_id': event.get('actor', {}).get('id'),
+                'team_id': actor_state.get('teamId'),
+                'item_name': target.get('name'),
+                'item_type': target.get('type'),
+                'position': actor_state.get('position'),
                 'game_state': event.get('seriesState', {})
-            }
-            items.append(item_data)
-        
-        return items
+            })
+    
+    @staticmethod
+    def handle_gold_snapshot(event: Dict, gold_timeline: List[Dict]):
+        actor = event.get('actor', {})
+        if actor and actor.get('id'):
+            actor_state = actor.get('state', {})
+            gold = actor_state.get('gold')
+            
+            if gold is not None:
+                gold_timeline.append({
+                    'timestamp': event['occurred_at'],
+                    'game_time_ms': event.get('game_time_ms'),
+                    'game_index': event.get('game_index'),
+                    'sequence_number': event.get('sequence_number'),
+                    'player_id': actor['id'],
+                    'team_id': actor_state.get('teamId'),
+                    'gold': gold,
+                    'net_worth': actor_state.get('netWorth'),
+                    'inventory_value': actor_state.get('inventoryValue'),
+                    'event_type': event['type'],
+                    'position': actor_state.get('position')
+                })
+    
+    @staticmethod
+    def handle_exp_snapshot(event: Dict, exp_timeline: List[Dict]):
+        actor = event.get('actor', {})
+        if actor and actor.get('id'):
+            actor_state = actor.get('state', {})
+            experience = actor_state.get('experience')
+            level = actor_state.get('level')
+            
+            if experience is not None or level is not None:
+                exp_timeline.append({
+                    'timestamp': event['occurred_at'],
+                    'game_time_ms': event.get('game_time_ms'),
+                    'game_index': event.get('game_index'),
+                    'sequence_number': event.get('sequence_number'),
+                    'player_id': actor['id'],
+                    'team_id': actor_state.get('teamId'),
+                    'experience': experience,
+                    'level': level,
+                    'event_type': event['type'],
+                    'position': actor_state.get('position')
+                })
+    
+    @staticmethod
+    def handle_positions(event: Dict, player_positions: Dict[str, List[Dict]]):
+        # Get actor position
+        actor = event.get('actor', {})
+        if actor and actor.get('id'):
+            actor_state = actor.get('state', {})
+            position = actor_state.get('position')
+            
+            if position:
+                player_positions.setdefault(actor['id'], []).append({
+                    'timestamp': event.get('occurred_at'),
+                    'game_time_ms': event.get('game_time_ms'),
+                    'game_index': event.get('game_index'),
+                    'sequence': event.get('sequence_number'),
+                    'position': position,
+                    'event_type': event['type'],
+                    'team_id': actor_state.get('teamId'),
+                    'health': actor_state.get('health'),
+                    'level': actor_state.get('level')
+                })
+        
+        # Get target position (for kills, etc.)
+        target = event.get('target', {})
+        if target and target.get('id') and isinstance(target.get('state'), dict):
+            target_state = target.get('state', {})
+            position = target_state.get('position')
+            
+            if position:
+                player_positions.setdefault(target['id'], []).append({
+                    'timestamp': event.get('occurred_at'),
+                    'game_time_ms': event.get('game_time_ms'),
+                    'game_index': event.get('game_index'),
+                    'sequence': event.get('sequence_number'),
+                    'position': position,
+                    'event_type': f"{event['type']}_target",
+                    'team_id': target_state.get('teamId'),
+                    'health': target_state.get('health'),
+                    'level': target_state.get('level')
+                })
+    
+    # ----------------------
+    # Single-section extractors (each is one pass over `events`)
+    
+    @staticmethod
+    def extract_kills(events: Iterable[Dict]) -> List[Dict]:
+        """Extract kill events with ALL relevant data including assists"""
+        return EventProcessor._extract(events, EventProcessor.handle_kill, EventProcessor.KILL_TYPES)
+    
+    @staticmethod
+    def extract_objectives(events: Iterable[Dict]) -> List[Dict]:
+        """Extract objective completion events"""
+        return EventProcessor._extract(events, EventProcessor.handle_objective, EventProcessor.OBJECTIVE_TYPES)
+    
+    @staticmethod
+    def extract_ability_usage(events: Iterable[Dict]) -> List[Dict]:
+        """Extract ability/spell usage events"""
+        return EventProcessor._extract(events, EventProcessor.handle_ability, EventProcessor.ABILITY_TYPES)
+    
+    @staticmethod
+    def extract_item_events(events: Iterable[Dict]) -> List[Dict]:
+        """Extract item purchase/pickup/drop events (for vision tracking)"""
+        return EventProcessor._extract(events, EventProcessor.handle_item, EventProcessor.ITEM_EVENT_TYPES)
     
     @staticmethod
-    def extract_position_timeline(events: List[Dict], player_id: str) -> List[Dict]:
+    def extract_position_timeline(events: Iterable[Dict], player_id: str) -> List[Dict]:
         """Extract position timeline for a specific player"""
         positions = []
         
@@ -726,6 +1489,8 @@ class EventProcessor:
                 if pos:
                     positions.append({
                         'timestamp': event['occurred_at'],
+                        'game_time_ms': event.get('game_time_ms'),
+                        'game_index': event.get('game_index'),
                         'position': pos,
                         'event_type': event['type']
                     })
@@ -733,357 +1498,179 @@ class EventProcessor:
         return positions
     
     @staticmethod
-    def extract_all_positions(events: List[Dict]) -> Dict:
+    def extract_all_positions(events: Iterable[Dict]) -> Dict:
         """Extract ALL position data for ALL players with timestamps"""
-        player_positions = defaultdict(list)
-        
-        for event in events:
-            # Get actor position
-            actor = event.get('actor', {})
-            if actor and actor.get('id'):
-                actor_state = actor.get('state', {})
-                position = actor_state.get('position')
-                
-                if position:
-                    player_positions[actor['id']].append({
-                        'timestamp': event.get('occurred_at'),
-                        'sequence': event.get('sequence_number'),
-                        'position': position,
-                        'event_type': event['type'],
-                        'team_id': actor_state.get('teamId'),
-                        'health': actor_state.get('health'),
-                        'level': actor_state.get('level')
-                    })
-            
-            # Get target position (for kills, etc.)
-            target = event.get('target', {})
-            if target and target.get('id') and isinstance(target.get('state'), dict):
-                target_state = target.get('state', {})
-                position = target_state.get('position')
-                
-                if position:
-                    player_positions[target['id']].append({
-                        'timestamp': event.get('occurred_at'),
-                        'sequence': event.get('sequence_number'),
-                        'position': position,
-                        'event_type': f"{event['type']}_target",
-                        'team_id': target_state.get('teamId'),
-                        'health': target_state.get('health'),
-                        'level': target_state.get('level')
-                    })
-        
-        return dict(player_positions)
+        return EventProcessor._extract(events, EventProcessor.handle_positions, output={})
     
     @staticmethod
-    def extract_ward_events(events: List[Dict]) -> List[Dict]:
+    def extract_ward_events(events: Iterable[Dict]) -> List[Dict]:
         """Extract ward-related item events for vision analysis"""
-        ward_items = [
-            'stealth ward', 'control ward', 'farsight alteration', 
-            'oracle lens', 'warding totem', 'sweeping lens',
-            'vision ward', 'sight ward'
-        ]
-        
-        ward_events = []
-        for event in events:
-            if event['type'] in ['player-purchased-item', 'player-acquired-item', 'player-lost-item', 'player-pickedUp-item']:
-                item_name = event.get('target', {}).get('name', '').lower()
-                
-                # Check if it's a ward-related item
-                if any(ward in item_name for ward in ward_items):
-                    ward_data = {
-                        'timestamp': event['occurred_at'],
-                        'event_type': event['type'],
-                        'player_id': event.get('actor', {}).get('id'),
-                        'team_id': event.get('actor', {}).get('state', {}).get('teamId'),
-                        'position': event.get('actor', {}).get('state', {}).get('position'),
-                        'item_name': event.get('target', {}).get('name'),
-                        'game_state': event.get('seriesState', {})
-                    }
-                    ward_events.append(ward_data)
-        
-        return ward_events
+        return EventProcessor._extract(events, EventProcessor.handle_ward, EventProcessor.WARD_EVENT_TYPES)
     
     @staticmethod
-    def extract_gold_events(events: List[Dict]) -> List[Dict]:
+    def extract_gold_events(events: Iterable[Dict]) -> List[Dict]:
         """Extract gold-related events for economic analysis (from item purchases/sales)"""
-        gold_events = []
-        
-        for event in events:
-            if event['type'] in ['player-purchased-item', 'player-sold-item']:
-                actor_state = event.get('actor', {}).get('state', {})
-                data = {
-                    'timestamp': event['occurred_at'],
-                    'event_type': event['type'],
-                    'player_id': event.get('actor', {}).get('id'),
-                    'team_id': actor_state.get('teamId'),
-                    'item_name': event.get('target', {}).get('name'),
-                    'item_cost': event.get('target', {}).get('cost'),
-                    'current_gold': actor_state.get('gold'),
-                    'position': actor_state.get('position'),
-                    'game_state': event.get('seriesState', {})
-                }
-                gold_events.append(data)
-        
-        return gold_events
+        return EventProcessor._extract(events, EventProcessor.handle_gold, EventProcessor.GOLD_EVENT_TYPES)
     
     @staticmethod
-    def extract_summoner_spell_events(events: List[Dict]) -> List[Dict]:
+    def extract_summoner_spell_events(events: Iterable[Dict]) -> List[Dict]:
         """Extract summoner spell usage from ability events"""
-        spell_events = []
-        
-        # Common summoner spell keywords
-        summoner_keywords = [
-            'flash', 'ignite', 'teleport', 'smite', 'heal', 
-            'barrier', 'exhaust', 'cleanse', 'ghost', 'clarity'
-        ]
-        
-        for event in events:
-            if event['type'] == 'player-used-ability':
-                ability_name = event.get('target', {}).get('name', '').lower()
-                
-                # Check if it's a summoner spell
-                if any(keyword in ability_name for keyword in summoner_keywords):
-                    spell_data = {
-                        'timestamp': event['occurred_at'],
-                        'player_id': event.get('actor', {}).get('id'),
-                        'team_id': event.get('actor', {}).get('state', {}).get('teamId'),
-                        'spell_name': event.get('target', {}).get('name'),
-                        'position': event.get('actor', {}).get('state', {}).get('position'),
-                        'game_state': event.get('seriesState', {})
-                    }
-                    spell_events.append(spell_data)
-        
-        return spell_events
+        return EventProcessor._extract(events, EventProcessor.handle_summoner_spell, EventProcessor.ABILITY_TYPES)
     
     @staticmethod
-    def extract_level_events(events: List[Dict]) -> List[Dict]:
+    def extract_level_events(events: Iterable[Dict]) -> List[Dict]:
         """Extract level-up events for progression analysis"""
-        level_events = EventProcessor.filter_events_by_type(events, ['player-completed-increaseLevel'])
-        
-        levels = []
-        for event in level_events:
-            level_data = {
-                'timestamp': event['occurred_at'],
-                'player_id': event.get('actor', {}).get('id'),
-                'team_id': event.get('actor', {}).get('state', {}).get('teamId'),
-                'new_level': event.get('actor', {}).get('state', {}).get('level'),
-                'position': event.get('actor', {}).get('state', {}).get('position'),
-                'game_state': event.get('seriesState', {})
-            }
-            levels.append(level_data)
-        
-        return levels
+        return EventProcessor._extract(events, EventProcessor.handle_level, EventProcessor.LEVEL_TYPES)
     
     @staticmethod
-    def extract_draft_events(events: List[Dict]) -> List[Dict]:
+    def extract_draft_events(events: Iterable[Dict]) -> List[Dict]:
         """Extract draft phase events (picks and bans)"""
-        draft_event_types = [
-            'player-picked-character',
-            'player-banned-character',
-            'team-picked-character',
-            'team-banned-character',
-            'team-picked-map',
-            'team-banned-map'
-        ]
-        
-        draft_events = EventProcessor.filter_events_by_type(events, draft_event_types)
-        
-        drafts = []
-        for event in draft_events:
-            draft_data = {
-                'timestamp': event['occurred_at'],
-                'sequence_number': event.get('sequence_number'),
-                'event_type': event['type'],
-                'actor_id': event.get('actor', {}).get('id'),
-                'actor_type': event.get('actor', {}).get('type'),
-                'team_id': event.get('actor', {}).get('state', {}).get('teamId') if event.get('actor', {}).get('state') else None,
-                'target_id': event.get('target', {}).get('id'),
-                'target_name': event.get('target', {}).get('name'),
-                'target_type': event.get('target', {}).get('type'),
-                'game_state': event.get('seriesState', {})
-            }
-            drafts.append(draft_data)
-        
-        return drafts
+        return EventProcessor._extract(events, EventProcessor.handle_draft, EventProcessor.DRAFT_EVENT_TYPES)
     
     @staticmethod
-    def extract_assist_details(events: List[Dict]) -> List[Dict]:
+    def extract_assist_details(events: Iterable[Dict]) -> List[Dict]:
         """Extract detailed assist information from kill events"""
-        kill_events = EventProcessor.filter_events_by_type(events, ['player-killed-player'])
-        
-        assists = []
-        for event in kill_events:
-            # Look for assist information in the event
-            actor_state = event.get('actor', {}).get('state', {})
-            target_state = event.get('target', {}).get('state', {})
-            
-            # Check if there's assist data in the series state delta
-            series_state_delta = event.get('seriesStateDelta', {})
-            
-            assist_data = {
-                'timestamp': event['occurred_at'],
-                'sequence_number': event.get('sequence_number'),
-                'killer_id': event['actor']['id'],
-                'victim_id': event['target']['id'],
-                'killer_team': actor_state.get('teamId'),
-                'victim_team': target_state.get('teamId'),
-                'position': actor_state.get('position'),
-                'game_state': event.get('seriesState', {}),
-                'series_state_delta': series_state_delta
-            }
-            assists.append(assist_data)
-        
-        return assists
+        return EventProcessor._extract(events, EventProcessor.handle_assist, EventProcessor.KILL_TYPES)
     
     @staticmethod
-    def extract_structure_events(events: List[Dict]) -> List[Dict]:
+    def extract_structure_events(events: Iterable[Dict]) -> List[Dict]:
         """Extract structure destruction events (turrets, inhibitors, nexus)"""
-        structure_event_types = [
-            'player-destroyed-tower',
-            'player-destroyed-inhibitor',
-            'player-destroyed-nexus',
-            'team-destroyed-tower',
-            'team-destroyed-inhibitor',
-            'team-destroyed-nexus',
-            'player-completed-destroyTower',
-            'player-completed-destroyInhibitor',
-            'player-completed-destroyAncient',
-            'team-completed-destroyTurretPlateTop',
-            'team-completed-destroyTurretPlateMid',
-            'team-completed-destroyTurretPlateBot'
-        ]
-        
-        structure_events = EventProcessor.filter_events_by_type(events, structure_event_types)
-        
-        structures = []
-        for event in structure_events:
-            actor_state = event.get('actor', {}).get('state', {})
-            
-            structure_data = {
-                'timestamp': event['occurred_at'],
-                'sequence_number': event.get('sequence_number'),
-                'event_type': event['type'],
-                'actor_id': event.get('actor', {}).get('id'),
-                'actor_type': event.get('actor', {}).get('type'),
-                'team_id': actor_state.get('teamId'),
-                'structure_type': event.get('target', {}).get('type'),
-                'structure_name': event.get('target', {}).get('name'),
-                'position': actor_state.get('position'),
-                'game_state': event.get('seriesState', {})
-            }
-            structures.append(structure_data)
-        
-        return structures
+        return EventProcessor._extract(events, EventProcessor.handle_structure, EventProcessor.STRUCTURE_EVENT_TYPES)
     
     @staticmethod
-    def extract_vision_events(events: List[Dict]) -> List[Dict]:
+    def extract_vision_events(events: Iterable[Dict]) -> List[Dict]:
         """Extract vision-related events (ward placements, destructions, sweeps)"""
-        vision_event_types = [
-            'player-placed-ward',
-            'player-destroyed-ward',
-            'player-used-trinket',
-            'player-purchased-item',  # For control wards
-            'player-acquired-item',
-            'player-lost-item'
-        ]
-        
-        vision_events = []
-        
-        for event in events:
-            if event['type'] in vision_event_types:
-                actor_state = event.get('actor', {}).get('state', {})
-                target = event.get('target', {})
-                
-                # Check if it's a ward-related item or action
-                target_name = target.get('name', '').lower() if target else ''
-                is_ward_related = any(ward in target_name for ward in [
-                    'ward', 'trinket', 'lens', 'totem', 'farsight', 'oracle', 'sweeping'
-                ])
-                
-                if is_ward_related or event['type'] in ['player-placed-ward', 'player-destroyed-ward']:
-                    vision_data = {
-                        'timestamp': event['occurred_at'],
-                        'sequence_number': event.get('sequence_number'),
-                        'event_type': event['type'],
-                        'player_id': event.get('actor', {}).get('id'),
-                        'team_id': actor_state.get('teamId'),
-                        'item_name': target.get('name'),
-                        'item_type': target.get('type'),
-                        'position': actor_state.get('position'),
-                        'game_state': event.get('seriesState', {})
-                    }
-                    vision_events.append(vision_data)
-        
-        return vision_events
+        return EventProcessor._extract(events, EventProcessor.handle_vision, EventProcessor.VISION_EVENT_TYPES)
     
     @staticmethod
-    def extract_gold_timeline(events: List[Dict]) -> List[Dict]:
+    def extract_gold_timeline(events: Iterable[Dict]) -> List[Dict]:
         """Extract gold progression over time for all players"""
-        gold_timeline = []
-        
-        for event in events:
-            actor = event.get('actor', {})
-            if actor and actor.get('id'):
-                actor_state = actor.get('state', {})
-                gold = actor_state.get('gold')
-                
-                if gold is not None:
-                    gold_data = {
-                        'timestamp': event['occurred_at'],
-                        'sequence_number': event.get('sequence_number'),
-                        'player_id': actor['id'],
-                        'team_id': actor_state.get('teamId'),
-                        'gold': gold,
-                        'net_worth': actor_state.get('netWorth'),
-                        'inventory_value': actor_state.get('inventoryValue'),
-                        'event_type': event['type'],
-                        'position': actor_state.get('position')
-                    }
-                    gold_timeline.append(gold_data)
-        
-        return gold_timeline
+        return EventProcessor._extract(events, EventProcessor.handle_gold_snapshot)
     
     @staticmethod
-    def extract_experience_timeline(events: List[Dict]) -> List[Dict]:
+    def extract_experience_timeline(events: Iterable[Dict]) -> List[Dict]:
         """Extract experience and level progression over time"""
-        exp_timeline = []
-        
-        for event in events:
-            actor = event.get('actor', {})
-            if actor and actor.get('id'):
-                actor_state = actor.get('state', {})
-                experience = actor_state.get('experience')
-                level = actor_state.get('level')
-                
-                if experience is not None or level is not None:
-                    exp_data = {
-                        'timestamp': event['occurred_at'],
-                        'sequence_number': event.get('sequence_number'),
-                        'player_id': actor['id'],
-                        'team_id': actor_state.get('teamId'),
-                        'experience': experience,
-                        'level': level,
-                        'event_type': event['type'],
-                        'position': actor_state.get('position')
-                    }
-                    exp_timeline.append(exp_data)
-        
-        return exp_timeline
+        return EventProcessor._extract(events, EventProcessor.handle_exp_snapshot)
 
 
 class PorolyticsDataCollector:
     """High-level data collector for Porolytics analysis"""
     
-    def __init__(self, api_key: str):
-        self.client = GridAPIClient(api_key)
+    def __init__(
+        self,
+        api_key: str,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        pool_size: int = DEFAULT_POOL_SIZE
+    ):
+        self.client = GridAPIClient(api_key, requests_per_second=requests_per_second, pool_size=pool_size)
         self.processor = EventProcessor()
+        # Extra sections can be added with self.engine.register(...)
+        self.engine = self.processor.default_engine()
+    
+    def _fetch_series(
+        self,
+        series: Dict,
+        download_events: bool,
+        output_dir: str = 'data',
+        catalog=None,
+        state: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Fetch availability, state and files for one series (safe to run on a worker thread)
+        
+        A state prefetched by a batched query is used as-is; otherwise it is fetched on its own.
+        """
+        series_id = series['id']
+        series_data = {
+            'series_id': series_id,
+            'metadata': series,
+            'state': state,
+            'events': None,
+            'processed': {}
+        }
+        
+        # Check file availability
+        try:
+            series_data['availability'] = self.client.check_file_availability(series_id)
+        except Exception as e:
+            print(f"  Warning: Could not check availability for {series_id}: {e}")
+        
+        # Get series state
+        if state is None:
+            try:
+                series_data['state'] = self.client.get_series_state(series_id)
+            except Exception as e:
+                print(f"  Error fetching state for {series_id}: {e}")
+        
+        # Download GRID + Riot files (reusing the catalogued copy if another run already fetched it)
+        if download_events:
+            try:
+                files = catalog.files_for(series_id) if catalog else {}
+                if 'events' not in files:
+                    files = self.client.download_series_files(series_id, output_dir)
+                    if catalog:
+                        catalog.mark_fetched(series_id, files)
+                series_data['files'] = files
+            except Exception as e:
+                if catalog:
+                    catalog.mark_failed(series_id, str(e))
+                series_data['download_error'] = str(e)
+        
+        return series_data
+    
+    def _process_series_events(self, series_data: Dict, events_file: str):
+        """
+        Run every registered extractor over a downloaded events file
+        
+        Events are streamed from the file and routed once through the
+        extraction engine, so the full event list is never held in memory.
+        Only the extracted records are kept.
+        """
+        print(f"  Extracting {', '.join(self.engine.sections)}...")
+        processed, event_count = self.engine.run(self.processor.iter_events(events_file))
+        series_data['processed'].update(processed)
+        
+        series_data['events'] = events_file
+        series_data['event_count'] = event_count
+        print(f"  Parsed {event_count} events from {events_file}")
+        
+        print(f"  Processed: {len(series_data['processed']['kills'])} kills, "
+              f"{len(series_data['processed']['objectives'])} objectives, "
+              f"{len(series_data['processed']['draft'])} draft actions, "
+              f"{len(series_data['processed']['structures'])} structure events, "
+              f"{len(series_data['processed']['vision'])} vision events, "
+              f"{len(series_data['processed']['gold_timeline'])} gold snapshots, "
+              f"{len(series_data['processed']['exp_timeline'])} exp snapshots, "
+              f"{len(series_data['processed']['all_positions'])} players tracked")
+    
+    def _finish_series(self, idx: int, total: int, series_data: Dict, download_events: bool):
+        """Report a fetched series and process its downloaded events"""
+        series = series_data['metadata']
+        print(f"\nProcessing series {idx}/{total}: {series_data['series_id']}")
+        print(f"  Tournament: {series['tournament']['name']}")
+        print(f"  Date: {series['startTimeScheduled']}")
+        
+        if 'availability' in series_data:
+            print(f"  File availability: {series_data['availability']}")
+        
+        # Process downloaded events
+        if download_events:
+            try:
+                if 'download_error' in series_data:
+                    raise Exception(series_data['download_error'])
+                self._process_series_events(series_data, series_data['files']['events'])
+            except Exception as e:
+                print(f"  Error processing events: {e}")
     
     def collect_team_data(
         self,
         team_id: str,
         num_matches: int = 20,
         title_id: int = 3,
-        download_events: bool = True
+        download_events: bool = True,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        output_dir: str = 'data',
+        catalog=None
     ) -> Dict:
         """
         Collect all data needed for a team analysis
@@ -1093,6 +1680,9 @@ class PorolyticsDataCollector:
             num_matches: Number of recent matches to analyze
             title_id: 3 for LoL, 6 for Valorant
             download_events: Whether to download full event files
+            max_workers: Number of series fetched in parallel
+            output_dir: Directory downloaded files are written to
+            catalog: Optional DownloadCatalog; series it already has are not downloaded again
         
         Returns:
             Dictionary with all collected data
@@ -1115,134 +1705,13 @@ class PorolyticsDataCollector:
             'series': []
         }
         
-        # Step 2: Process each series
-        for idx, series in enumerate(series_list[:num_matches], 1):
-            series_id = series['id']
-            print(f"\nProcessing series {idx}/{num_matches}: {series_id}")
-            print(f"  Tournament: {series['tournament']['name']}")
-            print(f"  Date: {series['startTimeScheduled']}")
-            
-            series_data = {
-                'series_id': series_id,
-                'metadata': series,
-                'state': None,
-                'events': None,
-                'processed': {}
-            }
-            
-            # Check file availability
-            try:
-                availability = self.client.check_file_availability(series_id)
-                print(f"  File availability: {availability}")
-            except Exception as e:
-                print(f"  Warning: Could not check availability: {e}")
-            
-            # Get series state
-            try:
-                print("  Fetching series state...")
-                series_data['state'] = self.client.get_series_state(series_id)
-            except Exception as e:
-                print(f"  Error fetching state: {e}")
-            
-            # Download and process events
-            if download_events:
-                try:
-                    # Download GRID events
-                    print("  Downloading GRID events file...")
-                    events_file = self.client.download_series_events(
-                        series_id,
-                        output_path=f"data/events_{series_id}.jsonl.zip"
-                    )
-                    
-                    # Download GRID end state
-                    print("  Downloading GRID end state...")
-                    try:
-                        self.client.download_series_end_state(
-                            series_id,
-                            output_path=f"data/end_state_{series_id}_grid.json"
-                        )
-                    except Exception as e:
-                        print(f"  Warning: Could not download GRID end state: {e}")
-                    
-                    # Download Riot official files (if available)
-                    print("  Downloading Riot official events (if available)...")
-                    riot_events = self.client.download_riot_events(
-                        series_id,
-                        output_path=f"data/events_{series_id}_riot.jsonl.zip"
-                    )
-                    
-                    print("  Downloading Riot official end state (if available)...")
-                    riot_end_state = self.client.download_riot_end_state(
-                        series_id,
-                        output_path=f"data/end_state_{series_id}_riot.json.zip"
-                    )
-                    
-                    print("  Parsing events...")
-                    events = self.processor.parse_events_file(events_file)
-                    series_data['events'] = events
-                    
-                    # Extract specific data types for Porolytics analysis
-                    print("  Extracting kills...")
-                    series_data['processed']['kills'] = self.processor.extract_kills(events)
-                    
-                    print("  Extracting objectives...")
-                    series_data['processed']['objectives'] = self.processor.extract_objectives(events)
-                    
-                    print("  Extracting abilities...")
-                    series_data['processed']['abilities'] = self.processor.extract_ability_usage(events)
-                    
-                    print("  Extracting items...")
-                    series_data['processed']['items'] = self.processor.extract_item_events(events)
-                    
-                    print("  Extracting ward items (vision system)...")
-                    series_data['processed']['wards'] = self.processor.extract_ward_events(events)
-                    
-                    print("  Extracting gold/economy events...")
-                    series_data['processed']['gold'] = self.processor.extract_gold_events(events)
-                    
-                    print("  Extracting summoner spells...")
-                    series_data['processed']['summoner_spells'] = self.processor.extract_summoner_spell_events(events)
-                    
-                    print("  Extracting level progression...")
-                    series_data['processed']['levels'] = self.processor.extract_level_events(events)
-                    
-                    print("  Extracting draft phase (picks/bans)...")
-                    series_data['processed']['draft'] = self.processor.extract_draft_events(events)
-                    
-                    print("  Extracting detailed assist data...")
-                    series_data['processed']['assist_details'] = self.processor.extract_assist_details(events)
-                    
-                    print("  Extracting structure destruction events...")
-                    series_data['processed']['structures'] = self.processor.extract_structure_events(events)
-                    
-                    print("  Extracting vision control events...")
-                    series_data['processed']['vision'] = self.processor.extract_vision_events(events)
-                    
-                    print("  Extracting gold timeline...")
-                    series_data['processed']['gold_timeline'] = self.processor.extract_gold_timeline(events)
-                    
-                    print("  Extracting experience timeline...")
-                    series_data['processed']['exp_timeline'] = self.processor.extract_experience_timeline(events)
-                    
-                    print("  Extracting ALL player positions with timestamps...")
-                    series_data['processed']['all_positions'] = self.processor.extract_all_positions(events)
-                    
-                    print(f"  Processed: {len(series_data['processed']['kills'])} kills, "
-                          f"{len(series_data['processed']['objectives'])} objectives, "
-                          f"{len(series_data['processed']['draft'])} draft actions, "
-                          f"{len(series_data['processed']['structures'])} structure events, "
-                          f"{len(series_data['processed']['vision'])} vision events, "
-                          f"{len(series_data['processed']['gold_timeline'])} gold snapshots, "
-                          f"{len(series_data['processed']['exp_timeline'])} exp snapshots, "
-                          f"{len(series_data['processed']['all_positions'])} players tracked")
-                    
-                except Exception as e:
-                    print(f"  Error processing events: {e}")
-            
-            collected_data['series'].append(series_data)
-            
-            # Rate limiting
-            time.sleep(1)
+        series_list = series_list[:num_matches]
+        if catalog:
+            catalog.record_many_series(series_list, team_id)
+        
+        collected_data['series'] = self.collect_series(
+            series_list, download_events, max_workers, output_dir, catalog
+        )
         
         print(f"\n{'='*60}")
         print(f"Data collection complete!")
@@ -1251,13 +1720,51 @@ class PorolyticsDataCollector:
         
         return collected_data
     
+    def collect_series(
+        self,
+        series_list: List[Dict],
+        download_events: bool = True,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        output_dir: str = 'data',
+        catalog=None
+    ) -> List[Dict]:
+        """
+        Fetch states and files for a list of series (as returned by allSeries) and process them
+        
+        Series the catalog already has files for are not downloaded again.
+        Returns the per-series data in the order of series_list.
+        """
+        # Step 2: Series states, several per GraphQL request
+        print("Step 2: Fetching series states in batches...")
+        states = self.client.get_series_states([series['id'] for series in series_list])
+        
+        # Step 3: Fetch files in parallel, process series in order as they arrive
+        print(f"Step 3: Fetching series files with {max_workers} workers...")
+        collected = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(
+                    self._fetch_series, series, download_events, output_dir, catalog, states.get(series['id'])
+                )
+                for series in series_list
+            ]
+            
+            for idx, future in enumerate(futures, 1):
+                series_data = future.result()
+                self._finish_series(idx, len(futures), series_data, download_events)
+                collected.append(series_data)
+        
+        return collected
+    
     def save_collected_data(self, data: Dict, output_path: str):
         """Save collected data to JSON file"""
-        # Remove raw events to reduce file size (they're already saved separately)
-        data_copy = json.loads(json.dumps(data))
-        for series in data_copy['series']:
-            if 'events' in series:
-                series['events'] = f"See events_{series['series_id']}.jsonl.zip"
+        # Point at the events file instead of embedding raw events. Only the
+        # top-level dicts are copied; everything else is shared with `data`.
+        data_copy = dict(data)
+        data_copy['series'] = [
+            dict(series, events=f"See events_{series['series_id']}.jsonl.zip") if 'events' in series else series
+            for series in data['series']
+        ]
         
         with open(output_path, 'w') as f:
             json.dump(data_copy, f, indent=2)
@@ -1466,7 +1973,7 @@ def quick_test_interactive(api_key: str):
             print(f"{'='*70}")
             print(f"Series: {series['series_id']}")
             if series.get('processed'):
-                print(f"  Total events: {len(series.get('events', []))}")
+                print(f"  Total events: {series.get('event_count', 0)}")
                 print(f"  Kills: {len(series['processed'].get('kills', []))}")
                 print(f"  Objectives: {len(series['processed'].get('objectives', []))}")
                 print(f"  Draft actions: {len(series['processed'].get('draft', []))}")
@@ -1521,6 +2028,9 @@ Examples:
   # Fetch for Valorant instead of LoL
   python grid_data_fetcher.py --team-id 47494 --title-id 6
   
+  # Multiplex many more downloads on one event loop (requires aiohttp)
+  python grid_data_fetcher.py --team-ids 47494,47351 --async --workers 64
+  
   # Use as library in your code:
   from grid_data_fetcher import PorolyticsDataCollector
   collector = PorolyticsDataCollector(api_key)
@@ -1543,6 +2053,9 @@ Examples:
     parser.add_argument('--title-id', type=int, default=3, help='Title ID: 3=LoL, 6=Valorant (default: 3)')
     parser.add_argument('--output-dir', type=str, default='data', help='Output directory (default: data)')
     parser.add_argument('--no-events', action='store_true', help='Skip downloading event files (faster)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS, help=f'Series fetched in parallel (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND, help=f'Max API requests per second (default: {DEFAULT_REQUESTS_PER_SECOND})')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Use the asyncio client; --workers is then the number of series in flight (requires aiohttp)')
     
     args = parser.parse_args()
     
@@ -1572,7 +2085,11 @@ Examples:
     os.makedirs(args.output_dir, exist_ok=True)
     
     # Initialize collector
-    collector = PorolyticsDataCollector(API_KEY)
+    if args.use_async:
+        from grid_async_client import AsyncPorolyticsDataCollector
+        collector = AsyncPorolyticsDataCollector(API_KEY, requests_per_second=args.rate, pool_size=args.workers)
+    else:
+        collector = PorolyticsDataCollector(API_KEY, requests_per_second=args.rate, pool_size=args.workers)
     
     # Determine what to fetch
     teams_to_fetch = []
@@ -1651,12 +2168,18 @@ Examples:
             
             try:
                 # Collect data
-                data = collector.collect_team_data(
+                collect_kwargs = dict(
                     team_id=team_id,
                     num_matches=args.num_matches,
                     title_id=args.title_id,
-                    download_events=not args.no_events
+                    download_events=not args.no_events,
+                    max_workers=args.workers,
+                    output_dir=args.output_dir
                 )
+                if args.use_async:
+                    data = collector.run(collector.collect_team_data(**collect_kwargs))
+                else:
+                    data = collector.collect_team_data(**collect_kwargs)
                 
                 # Save results
                 output_file = f"{args.output_dir}/team_{team_id}_{team_name}_analysis.json"
@@ -0,0 +1,70 @@
+"""
+JSON decoding for the GRID JSONL readers
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+loads_selective() additionally prunes the seriesState / seriesStateDelta
+snapshots down to the ids the signal extractor reads, so the bulk of each
+transaction is freed as soon as the line is decoded.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency, stdlib json is used instead
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Game state snapshots carried by transactions and events
+SERIES_STATE_KEYS = ('seriesState', 'seriesStateDelta')
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode one JSON document with the fastest available backend"""
+    if orjson is None:
+        return json.loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # orjson is stricter than json (e.g. NaN, huge ints); keep stdlib semantics
+        return json.loads(data)
+
+
+def prune_series_state(state: Any) -> Any:
+    """Reduce a seriesState snapshot to its id and the ids of its games"""
+    if not isinstance(state, dict):
+        return state
+    pruned = {'id': state.get('id')}
+    games = state.get('games')
+    if isinstance(games, list):
+        pruned['games'] = [{'id': game.get('id')} for game in games if isinstance(game, dict)]
+    return pruned
+
+
+def loads_selective(data: Union[bytes, str]) -> Any:
+    """
+    Decode a GRID transaction, pruning its game state snapshots
+
+    seriesState / seriesStateDelta on the transaction and on each of its
+    events are replaced by prune_series_state() stubs. Everything else is
+    decoded as usual.
+    """
+    transaction = loads(data)
+    if not isinstance(transaction, dict):
+        return transaction
+
+    for key in SERIES_STATE_KEYS:
+        if key in transaction:
+            transaction[key] = prune_series_state(transaction[key])
+
+    events = transaction.get('events')
+    if isinstance(events, list):
+        for event in events:
+            if isinstance(event, dict):
+                for key in SERIES_STATE_KEYS:
+                    if key in event:
+                        event[key] = prune_series_state(event[key])
+
+    return transaction
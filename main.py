@@ -1,18 +1,34 @@
+import argparse
 import json
+import re
 import zipfile
 import os
 import glob
+import textwrap
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from signal_extractor import SignalExtractor
-from encounter_clusterer import EncounterClusterer
+from encounter_clusterer import BACKENDS, ClusterConfig, EncounterClusterer
+from signal_table import SignalTable
+import json_backend
 
 INPUT_PATTERN = "matches_data/**/*.jsonl.zip"
 OUTPUT = "encounters_step1.json"
+PARTIAL_SUFFIX = ".part"
+# Series queued per extraction worker; bounds how many finished series wait for the consumer
+SERIES_IN_FLIGHT_PER_WORKER = 4
+# GRID / Riot events files of a series, as written by grid_data_fetcher
+SERIES_FILE = re.compile(r"^events_(.+?)(?:_grid|_riot)?\.jsonl\.zip$")
 
 extractor = SignalExtractor()
 clusterer = EncounterClusterer()
 
-def process_file(zip_path):
-    all_signals = []
+def iter_transaction_signals(zip_path, prefilter=True):
+    """
+    Yield (sequence_number, signals) for each transaction of one events zip
+
+    prefilter skips lines that cannot hold a signal without decoding them.
+    """
     try:
         with zipfile.ZipFile(zip_path, 'r') as z:
             for filename in z.namelist():
@@ -20,50 +36,223 @@ def process_file(zip_path):
                     for line in f:
                         if not line.strip():
                             continue
+                        if prefilter and not extractor.may_have_signals(line):
+                            continue
                         try:
-                            data = json.loads(line)
-                            all_signals.extend(extractor.extract(data))
+                            # The extractor only needs the ids out of the seriesState snapshots
+                            data = json_backend.loads_selective(line)
+                            signals = extractor.extract(data)
                         except Exception as e:
                             print(f"Error parsing line in {zip_path}: {e}")
+                            continue
+                        if signals:
+                            yield data.get("sequenceNumber"), signals
     except Exception as e:
         print(f"Error opening zip {zip_path}: {e}")
+
+def process_file(zip_path, prefilter=True):
+    """Extract the signals of one events zip"""
+    all_signals = []
+    for _, signals in iter_transaction_signals(zip_path, prefilter):
+        all_signals.extend(signals)
+    return all_signals
+
+def process_series(zip_paths, prefilter=True, dedup=True):
+    """
+    Extract the signals of one series from all of its events zips
+
+    With dedup, an event is kept only the first time its (series,
+    sequenceNumber, event id) identity is seen, so copies of the series
+    (a second team folder, the Riot feed) add nothing. Events without an id
+    fall back to their position among the transaction's events of the same
+    type. The seen-set only lives for one series.
+    """
+    all_signals = []
+    seen = set()
+    for zip_path in zip_paths:
+        for sequence_number, signals in iter_transaction_signals(zip_path, prefilter):
+            if not dedup:
+                all_signals.extend(signals)
+                continue
+
+            # n-th signal with this id in the transaction, so id-less events of one type stay apart
+            occurrences = defaultdict(int)
+            for s in signals:
+                occurrence = occurrences[s.id]
+                occurrences[s.id] += 1
+                key = (s.series_id, sequence_number, s.id, occurrence)
+                if key not in seen:
+                    seen.add(key)
+                    all_signals.append(s)
     return all_signals
 
-print(f"Searching for files matching {INPUT_PATTERN}...")
-zip_files = glob.glob(INPUT_PATTERN, recursive=True)
-print(f"Found {len(zip_files)} files.")
-
-all_signals = []
-for i, zip_file in enumerate(zip_files):
-    if (i+1) % 10 == 0 or i == 0:
-        print(f"Processing file {i+1}/{len(zip_files)}: {zip_file}")
-    all_signals.extend(process_file(zip_file))
-
-print(f"Total signals extracted: {len(all_signals)}")
-
-if not all_signals:
-    print("No signals found. Check if the input pattern is correct.")
-else:
-    print(f"Clustering {len(all_signals)} signals...")
-    encounters = clusterer.cluster(all_signals)
-    print(f"Encounters detected: {len(encounters)}")
-
-    # Custom encoder for Set objects which are not JSON serializable
-    class SetEncoder(json.JSONEncoder):
-        def default(self, obj):
-            if isinstance(obj, set):
-                return list(obj)
-            return super().default(obj)
-
-    # Sort by time for better merge visualization if needed
-    # Note: with multiple games/series, sort by game_id then start_ms
-    encounters.sort(key=lambda x: (str(x.game_id), x.start_ms))
-
-    with open(OUTPUT, "w") as f:
-        json.dump(
-            [e.__dict__ for e in encounters],
-            f,
-            indent=2,
-            cls=SetEncoder
-        )
-    print(f"Saved encounters to {OUTPUT}")
+def group_series_files(zip_files):
+    """
+    Group events zips by series, in first-seen order
+
+    Every copy of a series (events_<id>.jsonl.zip, events_<id>_grid.jsonl.zip,
+    events_<id>_riot.jsonl.zip, in any team folder) lands in one group.
+    Unrecognised names form a group of their own.
+    """
+    groups = {}
+    for zip_path in zip_files:
+        match = SERIES_FILE.match(os.path.basename(zip_path))
+        key = match.group(1) if match else zip_path
+        groups.setdefault(key, []).append(zip_path)
+    return list(groups.values())
+
+def iter_series_signals(series_files, workers=1, prefilter=True, dedup=True):
+    """
+    Yield (zip_paths, signals) for each series group, in input order
+
+    With workers > 1 the series are extracted in a process pool and each
+    series' signals are streamed back as soon as it (and the ones before it)
+    are done. At most SERIES_IN_FLIGHT_PER_WORKER series per worker are
+    submitted ahead of the consumer, so finished results never pile up.
+    """
+    if workers <= 1:
+        for zip_paths in series_files:
+            yield zip_paths, process_series(zip_paths, prefilter, dedup)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for zip_paths in series_files:
+            in_flight.append((zip_paths, pool.submit(process_series, zip_paths, prefilter, dedup)))
+            if len(in_flight) >= workers * SERIES_IN_FLIGHT_PER_WORKER:
+                zip_paths, future = in_flight.popleft()
+                yield zip_paths, future.result()
+
+        while in_flight:
+            zip_paths, future = in_flight.popleft()
+            yield zip_paths, future.result()
+
+def iter_game_signals(series_signals):
+    """
+    Turn a stream of (zip_paths, signals) into one (game_id, signals) per game
+
+    A game belongs to a single series, so its signals are complete once its
+    series' files have been read. Games are yielded in first-seen order, which
+    is the order EncounterClusterer.cluster would process them in.
+    """
+    for zip_paths, signals in series_signals:
+        by_game = defaultdict(list)
+        for s in signals:
+            by_game[s.game_id].append(s)
+        yield from by_game.items()
+
+# Custom encoder for Set objects which are not JSON serializable
+class SetEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, set):
+            return list(obj)
+        return super().default(obj)
+
+class EncounterWriter:
+    """
+    Write encounters to a JSON array as they are produced
+
+    Output matches json.dump(..., indent=2). The array goes to a .part file
+    that replaces the output on a clean exit, so a failed run never leaves
+    a truncated file behind. discard() drops the output instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.part_path = path + PARTIAL_SUFFIX
+        self.count = 0
+        self.discarded = False
+        self._file = open(self.part_path, "w")
+        self._file.write("[")
+
+    def write(self, encounters):
+        for e in encounters:
+            self._file.write(",\n" if self.count else "\n")
+            self._file.write(textwrap.indent(json.dumps(e.__dict__, indent=2, cls=SetEncoder), "  "))
+            self.count += 1
+
+    def discard(self):
+        self.discarded = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.write("\n]" if self.count else "]")
+        self._file.close()
+        if exc_type is None and not self.discarded:
+            os.replace(self.part_path, self.path)
+        else:
+            os.remove(self.part_path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Step 1: extract signals from event archives and cluster them into encounters')
+    parser.add_argument('--input', default=INPUT_PATTERN, help=f'Glob of event zips (default: {INPUT_PATTERN})')
+    parser.add_argument('--output', default=OUTPUT, help=f'Encounters JSON to write (default: {OUTPUT})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes extracting files in parallel; 1 runs serially (default: CPU count)')
+    parser.add_argument('--no-prefilter', action='store_true', help='Decode every line instead of skipping lines without relevant event types')
+    parser.add_argument('--no-dedup', action='store_true', help='Keep events repeated across copies of a series (other team folders, Riot feed)')
+    parser.add_argument('--save-table', metavar='NPZ', help='Also save the extracted signals as a columnar SignalTable (.npz, needs numpy; keeps every signal in memory)')
+    parser.add_argument('--cluster-backend', choices=BACKENDS, default='python', help='Linkage engine for clustering; numpy needs numpy, same encounters (default: python)')
+    parser.add_argument('--cluster-workers', type=int, default=1, help='Processes clustering games in parallel; encounter IDs do not change (default: 1)')
+    parser.add_argument('--load-table', metavar='NPZ', help='Cluster the signals of a saved SignalTable instead of reading --input')
+    args = parser.parse_args()
+    cluster_config = ClusterConfig(backend=args.cluster_backend)
+
+    if args.load_table:
+        print(f"Loading signal table {args.load_table}...")
+        table = SignalTable.load(args.load_table)
+        games = ((game_id, table.to_signals(rows)) for game_id, rows in table.game_slices())
+    else:
+        print(f"Searching for files matching {args.input}...")
+        # Sorted so signal order, and therefore encounter IDs, do not depend on the worker count
+        zip_files = sorted(glob.glob(args.input, recursive=True))
+        series_files = group_series_files(zip_files)
+        print(f"Found {len(zip_files)} files ({len(series_files)} series).")
+
+        def progress(series_signals):
+            for i, (zip_paths, signals) in enumerate(series_signals):
+                if (i+1) % 10 == 0 or i == 0:
+                    print(f"Processed series {i+1}/{len(series_files)}: {', '.join(zip_paths)}")
+                yield zip_paths, signals
+
+        games = iter_game_signals(progress(iter_series_signals(
+            series_files, args.workers, not args.no_prefilter, not args.no_dedup
+        )))
+
+    # Each game is clustered and written out as soon as its series is read, so only
+    # one series' signals (and a few games per clustering worker) are held at a time
+    signal_count = 0
+    table_signals = [] if args.save_table else None
+
+    def tally(games):
+        nonlocal signal_count
+        for game_id, signals in games:
+            signal_count += len(signals)
+            if table_signals is not None:
+                table_signals.extend(signals)
+            yield game_id, signals
+
+    with EncounterWriter(args.output) as writer:
+        for _, encounters in clusterer.cluster_games(tally(games), cluster_config, args.cluster_workers):
+            # Sort by time for better merge visualization if needed
+            encounters.sort(key=lambda x: x.start_ms)
+            writer.write(encounters)
+
+        print(f"Total signals extracted: {signal_count}")
+
+        if not signal_count:
+            print("No signals found. Check if the input pattern is correct.")
+            writer.discard()
+            return
+
+        print(f"Encounters detected: {writer.count}")
+
+    if table_signals:
+        SignalTable.from_signals(table_signals).save(args.save_table)
+        print(f"Saved signal table to {args.save_table}")
+
+    print(f"Saved encounters to {args.output}")
+
+if __name__ == "__main__":
+    main()
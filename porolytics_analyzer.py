@@ -203,36 +203,44 @@ class PorolyticsAnalyzer:
             else:
                 wards_in_losses.append(game_wards)
             
+            # Ward purchase times per game (game_time_ms restarts with every game of the series)
+            ward_times = defaultdict(list)
+            for event in series['processed'].get('gold', []):
+                item_name = (event.get('item_name') or '').lower()
+                if any(ward in item_name for ward in vision_items) and event.get('game_time_ms') is not None:
+                    ward_times[event.get('game_index')].append(event['game_time_ms'])
+            
             # Check ward timing relative to objectives
             objectives = series['processed'].get('objectives', [])
             for obj in objectives:
                 if 'dragon' in obj['type'].lower() or 'baron' in obj['type'].lower():
-                    obj_time = obj['timestamp']
+                    obj_time = obj.get('game_time_ms')
+                    if obj_time is None:
+                        continue
                     total_objectives += 1
                     
-                    # Check if wards were bought 60-90s before
-                    for event in series['processed'].get('gold', []):
-                        item_name = (event.get('item_name') or '').lower()
-                        if any(ward in item_name for ward in vision_items):
-                            event_time = event.get('timestamp')
-                            if event_time:
-                                time_diff = (obj_time - event_time) / 1000  # Convert to seconds
-                                if 60 <= time_diff <= 90:
-                                    pre_objective_wards += 1
-                                    break
+                    # Check if wards were bought 60-90s before, in the same game
+                    for event_time in ward_times.get(obj.get('game_index'), []):
+                        time_diff = (obj_time - event_time) / 1000  # Convert to seconds
+                        if 60 <= time_diff <= 90:
+                            pre_objective_wards += 1
+                            break
             
             total_games += 1
         
         avg_wards_wins = statistics.mean(wards_in_wins) if wards_in_wins else 0
         avg_wards_losses = statistics.mean(wards_in_losses) if wards_in_losses else 0
+        wards_per_game = total_wards / total_games if total_games > 0 else 0
+        # Analyses written before game_time_ms existed have no timed objectives
+        setup_rate = (pre_objective_wards / total_objectives * 100) if total_objectives > 0 else 0
         
         return {
-            'wards_per_game': total_wards / total_games if total_games > 0 else 0,
+            'wards_per_game': wards_per_game,
             'wards_in_wins': avg_wards_wins,
             'wards_in_losses': avg_wards_losses,
             'vision_drop_in_losses': ((avg_wards_wins - avg_wards_losses) / avg_wards_wins * 100) if avg_wards_wins > 0 else 0,
-            'pre_objective_setup_rate': (pre_objective_wards / total_objectives * 100) if total_objectives > 0 else 0,
-            'summary': f"Avg {total_wards / total_games:.1f} wards/game, {pre_objective_wards / total_objectives * 100:.0f}% pre-objective setup"
+            'pre_objective_setup_rate': setup_rate,
+            'summary': f"Avg {wards_per_game:.1f} wards/game, {setup_rate:.0f}% pre-objective setup"
         }
 
     
@@ -249,22 +257,22 @@ class PorolyticsAnalyzer:
         for series in self.series:
             kills = series['processed'].get('kills', [])
             
-            # Track player positions from kills
+            # Track player positions from kills, per game (game_time_ms restarts with every game)
             player_positions = defaultdict(list)
             
             for kill in kills:
                 killer_id = kill.get('killer_id')
                 killer_pos = kill.get('killer_position')
-                timestamp = kill.get('timestamp')
+                timestamp = kill.get('game_time_ms')
                 
-                if killer_id and killer_pos:
-                    player_positions[killer_id].append({
+                if killer_id and killer_pos and timestamp is not None:
+                    player_positions[(kill.get('game_index'), killer_id)].append({
                         'time': timestamp,
                         'pos': killer_pos
                     })
             
             # Calculate roaming distance
-            for player_id, positions in player_positions.items():
+            for (_, player_id), positions in player_positions.items():
                 if len(positions) < 2:
                     continue
                 
@@ -407,7 +415,7 @@ class PorolyticsAnalyzer:
             # Check for early deaths (before 10 minutes)
             early_deaths = [
                 kill for kill in series['processed'].get('kills', [])
-                if isinstance(kill.get('timestamp'), (int, float)) and kill.get('timestamp', 0) < 600000  # 10 minutes in ms
+                if isinstance(kill.get('game_time_ms'), int) and kill['game_time_ms'] < 600000  # 10 minutes in ms
             ]
             if len(early_deaths) >= 2:
                 loss_patterns['early_deaths'] += 1
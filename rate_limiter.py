@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every request a GRID client makes
+    (sync or async; one bucket can be shared by both).
+
+    `rate` tokens are added per second up to `capacity`. Callers reserve a
+    token before each request; when the bucket is empty the reservation goes
+    into debt and the caller sleeps until its token would have been minted,
+    so concurrent workers are served in arrival order instead of busy-polling.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take `tokens` from the bucket and return how many seconds to wait before using them"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Async counterpart of acquire(): waits on the event loop instead of blocking the thread"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for at least `seconds` (e.g. a server's Retry-After)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def on_success(self):
+        """Feedback hook: a request went through (fixed-rate buckets ignore it)"""
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Feedback hook: the server throttled a request"""
+        if retry_after:
+            self.pause(retry_after)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Token bucket whose rate adapts to server throttling (AIMD).
+
+    Every successful response nudges the rate up by `increase_step` until
+    `max_rate`; a throttled response multiplies it by `decrease_factor` down to
+    `min_rate`. Throttles arriving within `cooldown` seconds of the last
+    decrease count once, since in-flight requests tend to get rejected together.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        increase_step: float = 0.1,
+        decrease_factor: float = 0.7,
+        cooldown: float = 1.0
+    ):
+        super().__init__(rate)
+        self.min_rate = min(min_rate, self.rate)
+        self.max_rate = max(max_rate or self.rate, self.rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self._last_decrease = float('-inf')
+
+    def on_success(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now - self._last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._last_decrease = now
+            # Drain the bucket so nobody bursts straight back into the limit
+            self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            self.pause(retry_after)
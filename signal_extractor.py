@@ -1,55 +1,112 @@
+import re
+import sys
+from functools import lru_cache
 from typing import List, Tuple, Optional
 from signal_event import SignalEvent
 from time_utils import iso_to_ms
 
+# Tokens _classify_event looks for
+KILL_KEYWORDS = ("kill",)
+OBJECTIVE_KEYWORDS = ("dragon", "baron", "herald")
+STRUCTURE_KEYWORDS = ("tower", "inhib", "plate", "nexus")
+WARD_KEYWORD = "ward"
+SPELL_NAMES = {"flash", "teleport", "ignite", "exhaust", "heal", "ghost"}
+
+# Event keys the sub type is read from, in priority order (then target.state.name)
+SUB_TYPE_KEYS = ("subType", "action", "spell", "ability")
+
+# Where an event's position can be, in priority order
+DIRECT_POSITION_KEYS = ("position", "location")
+POSITION_ENTITIES = ("actor", "target")
+STATE_KEYS = ("state", "stateDelta")
+POSITION_LIST_KEYS = ("players", "teams")
+
+# Fallback positions for objectives, matched against target.state.name
+OBJECTIVE_POSITIONS = (
+    ("chemtechdrake", (9850, 4300)),
+    ("infernaldrake", (9850, 4300)),
+    ("clouddrake", (9850, 4300)),
+    ("mountaindrake", (9850, 4300)),
+    ("elderdrake", (9850, 4300)),
+    ("riftherald", (4500, 9800)),
+    ("baronnashor", (4500, 9800)),
+)
+
+def _alternatives(words) -> bytes:
+    return b"|".join(re.escape(w.encode()) for w in sorted(words))
+
+# Raw-line pre-filter patterns, applied to the lower-cased line. Together they
+# match every transaction line holding an event _classify_event keeps (and some
+# that it drops). GRID event types are hyphenated actor-action-target strings,
+# which keeps the type tokens from matching camelCase types nested in
+# seriesState (e.g. objectives' "slayBaronNashor").
+_EVENT_TYPE_TOKEN = re.compile(
+    rb'"type":\s*"[a-z]+-[^"]*?(?:'
+    + _alternatives(KILL_KEYWORDS + OBJECTIVE_KEYWORDS + STRUCTURE_KEYWORDS + (WARD_KEYWORD,))
+    + rb')'
+)
+# A listed summoner spell or a ward under one of the keys the sub type is read
+# from; non-string sub types are stringified, so those always pass
+_SUB_TYPE_TOKEN = re.compile(
+    rb'"(?:name|subtype|action|spell|ability)":\s*(?:"(?:'
+    + _alternatives(SPELL_NAMES)
+    + rb')"|"[^"]*ward|[\[{])'
+)
+
 class SignalExtractor:
 
+    @staticmethod
+    def may_have_signals(raw_line: bytes) -> bool:
+        """
+        Cheap check on an undecoded transaction line; False means extract() would return nothing
+
+        Lines containing escapes always pass, since an escape could spell out
+        a token the byte patterns would not see.
+        """
+        if b"\\" in raw_line:
+            return True
+        line = raw_line.lower()
+        return bool(_EVENT_TYPE_TOKEN.search(line) or _SUB_TYPE_TOKEN.search(line))
+
     def extract(self, json_line: dict) -> List[SignalEvent]:
-        series_id = json_line.get("seriesId")
+        events = json_line.get("events", [])
+        if not events:
+            return []
+
+        # Ids and types repeat across millions of signals: share one string object each
+        series_id = _intern(json_line.get("seriesId"))
         occurred_at = json_line.get("occurredAt")
         base_ts = iso_to_ms(occurred_at)
+        game_id = _intern(self._extract_game_id(json_line))
 
-        events = json_line.get("events", [])
         signals = []
 
         for e in events:
             raw_type = e.get("type", "").lower()
-            event_id = e.get("id", f"{raw_type}_{base_ts}")
+            sub_type = _intern(self._extract_subtype(e))
 
-            game_id = (
-                json_line.get("seriesStateDelta", {}).get("id")
-                or json_line.get("seriesState", {}).get("id")
-            )
+            event_type = self._classify_event(raw_type, sub_type)
+            if not event_type:
+                continue
 
-            # Fallback: some events nest the game state inside another list/object
-            if not game_id:
-                for key in ["seriesStateDelta", "seriesState"]:
-                    gs = json_line.get(key, {})
-                    if "games" in gs and isinstance(gs["games"], list) and len(gs["games"]) > 0:
-                        game_id = gs["games"][0].get("id")
-                        if game_id: break
+            event_id = e["id"] if "id" in e else f"{raw_type}_{base_ts}"
 
             actor = e.get("actor", {})
             target = e.get("target", {})
 
-            actor_player_id = actor.get("id")
-            actor_team_id = (
+            actor_player_id = _intern(actor.get("id"))
+            actor_team_id = _intern(
                 actor.get("state", {}).get("id")
                 or actor.get("stateDelta", {}).get("id")
             )
 
-            target_player_id = target.get("id")
-            target_team_id = (
+            target_player_id = _intern(target.get("id"))
+            target_team_id = _intern(
                 target.get("state", {}).get("id")
                 or target.get("stateDelta", {}).get("id")
             )
 
             x, y = self._extract_position(e)
-            sub_type = self._extract_subtype(e)
-
-            event_type = self._classify_event(raw_type, sub_type)
-            if not event_type:
-                continue
 
             signals.append(
                 SignalEvent(
@@ -64,7 +121,7 @@ class SignalExtractor:
                     target_player_id=target_player_id,
                     event_type=event_type,
                     sub_type=sub_type,
-                    payload={"raw_type": raw_type}
+                    raw_type=sys.intern(raw_type)
                 )
             )
 
@@ -72,37 +129,46 @@ class SignalExtractor:
 
     # ----------------------
 
+    def _extract_game_id(self, json_line: dict) -> Optional[str]:
+        game_id = (
+            json_line.get("seriesStateDelta", {}).get("id")
+            or json_line.get("seriesState", {}).get("id")
+        )
+
+        # Fallback: some transactions nest the game state inside another list/object
+        if not game_id:
+            for key in ["seriesStateDelta", "seriesState"]:
+                gs = json_line.get(key, {})
+                if "games" in gs and isinstance(gs["games"], list) and len(gs["games"]) > 0:
+                    game_id = gs["games"][0].get("id")
+                    if game_id: break
+
+        return game_id
+
     def _extract_position(self, e) -> Tuple[Optional[float], Optional[float]]:
         # 1. Direct position
-        paths = [
-            e.get("position"),
-            e.get("location"),
-            e.get("actor", {}).get("state", {}).get("position"),
-            e.get("actor", {}).get("stateDelta", {}).get("position"),
-            e.get("target", {}).get("state", {}).get("position"),
-            e.get("target", {}).get("stateDelta", {}).get("position"),
-        ]
-
-        for p in paths:
+        for key in DIRECT_POSITION_KEYS:
+            p = e.get(key)
             if isinstance(p, dict) and "x" in p and "y" in p:
                 return p["x"], p["y"]
 
+        entities = [e.get(key, {}) for key in POSITION_ENTITIES]
+        for entity in entities:
+            for state_key in STATE_KEYS:
+                p = entity.get(state_key, {}).get("position")
+                if isinstance(p, dict) and "x" in p and "y" in p:
+                    return p["x"], p["y"]
+
         # 2. Deep search in actor/target state for position
         # (Needed because some events nest position inside player/team lists)
-        for entity in [e.get("actor", {}), e.get("target", {})]:
-            for state_key in ["state", "stateDelta"]:
+        for entity in entities:
+            actor_id = entity.get("id")
+            for state_key in STATE_KEYS:
                 state = entity.get(state_key, {})
                 if not isinstance(state, dict): continue
-                
-                # Check direct position in state
-                if "position" in state:
-                    p = state["position"]
-                    if isinstance(p, dict) and "x" in p and "y" in p:
-                        return p["x"], p["y"]
-                
+
                 # Check players/teams lists for matching IDs
-                actor_id = entity.get("id")
-                for list_key in ["players", "teams"]:
+                for list_key in POSITION_LIST_KEYS:
                     if list_key in state and isinstance(state[list_key], list):
                         for item in state[list_key]:
                             if item.get("id") == actor_id and "position" in item:
@@ -118,24 +184,14 @@ class SignalExtractor:
              .lower()
         )
 
-        OBJECTIVE_POSITIONS = {
-            "chemtechdrake": (9850, 4300),
-            "infernaldrake": (9850, 4300),
-            "clouddrake": (9850, 4300),
-            "mountaindrake": (9850, 4300),
-            "elderdrake": (9850, 4300),
-            "riftherald": (4500, 9800),
-            "baronnashor": (4500, 9800),
-        }
-
-        for key, pos in OBJECTIVE_POSITIONS.items():
+        for key, pos in OBJECTIVE_POSITIONS:
             if key in name:
                 return pos
 
         return None, None
 
     def _extract_subtype(self, e) -> Optional[str]:
-        for key in ["subType", "action", "spell", "ability"]:
+        for key in SUB_TYPE_KEYS:
             if key in e:
                 return str(e[key]).upper()
         if "target" in e:
@@ -143,17 +199,33 @@ class SignalExtractor:
         return None
 
     def _classify_event(self, raw_type: str, sub: Optional[str]) -> Optional[str]:
-        s = (sub or "").lower()
+        type_class = _classify_type(raw_type)
+        if type_class and type_class != "WARD":
+            return type_class
 
-        if "kill" in raw_type:
-            return "KILL"
-        if any(o in raw_type for o in ["dragon", "baron", "herald"]):
-            return "OBJECTIVE"
-        if any(t in raw_type for t in ["tower", "inhib", "plate", "nexus"]):
-            return "STRUCTURE"
-        if s in {"flash", "teleport", "ignite", "exhaust", "heal", "ghost"}:
+        s = (sub or "").lower()
+        if s in SPELL_NAMES:
             return "SPELL"
-        if "ward" in raw_type or "ward" in s:
+        if type_class == "WARD" or WARD_KEYWORD in s:
             return "WARD"
 
         return None
+
+
+def _intern(value):
+    """sys.intern for strings, anything else (None, numeric ids) as is"""
+    return sys.intern(value) if type(value) is str else value
+
+
+@lru_cache(maxsize=None)
+def _classify_type(raw_type: str) -> Optional[str]:
+    """Class implied by the event type alone; event types come from a small fixed vocabulary"""
+    if any(k in raw_type for k in KILL_KEYWORDS):
+        return "KILL"
+    if any(o in raw_type for o in OBJECTIVE_KEYWORDS):
+        return "OBJECTIVE"
+    if any(t in raw_type for t in STRUCTURE_KEYWORDS):
+        return "STRUCTURE"
+    if WARD_KEYWORD in raw_type:
+        return "WARD"
+    return None
@@ -0,0 +1,161 @@
+"""
+Columnar storage for step-1 signals
+
+A SignalTable holds the signals as NumPy arrays (timestamps, positions and
+integer codes for the categorical fields), with rows grouped by game, so
+clustering and analytics can work on whole columns instead of one
+SignalEvent at a time. Tables persist to .npz files and can be reloaded
+without re-reading the event archives.
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from signal_event import SignalEvent
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed for SignalTable
+    np = None
+
+# Fields stored as an int32 code per row plus a list of distinct values (code -1 = None)
+CATEGORICAL_COLUMNS = (
+    "game_id", "series_id", "team_id", "opponent_team_id",
+    "actor_player_id", "target_player_id", "event_type", "sub_type", "raw_type",
+)
+
+NUMERIC_COLUMNS = ("timestamp_ms", "x", "y")
+
+
+def _encode(values: Sequence) -> Tuple["np.ndarray", List[str]]:
+    """Categorical codes for values (in first-seen order) and the values as strings"""
+    index = {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+        else:
+            codes[i] = index.setdefault(value, len(index))
+    return codes, [str(value) for value in index]
+
+
+class SignalTable:
+    """
+    Signals as NumPy columns, rows grouped by game
+
+    timestamp_ms is int64, x and y are float64 with NaN where the position is
+    unknown, and every CATEGORICAL_COLUMNS field is an int32 code into
+    categories[name]. Categorical values and ids are stored as strings.
+
+    The rows of the g-th game are game_offsets[g]:game_offsets[g + 1],
+    sorted by timestamp. Games keep the order they were first seen in, so
+    iterating the table yields signals in the order EncounterClusterer
+    processes them.
+    """
+
+    def __init__(self, columns: Dict[str, "np.ndarray"], categories: Dict[str, List[str]], game_offsets: "np.ndarray"):
+        if np is None:
+            raise ImportError("SignalTable requires numpy (pip install numpy)")
+
+        self.columns = columns
+        self.categories = categories
+        self.game_offsets = game_offsets
+
+    @classmethod
+    def from_signals(cls, signals: Sequence[SignalEvent]) -> "SignalTable":
+        if np is None:
+            raise ImportError("SignalTable requires numpy (pip install numpy)")
+
+        # Games in first-seen order (None is a game of its own, as in the clusterer)
+        game_rank = {}
+        ranks = np.fromiter(
+            (game_rank.setdefault(s.game_id, len(game_rank)) for s in signals),
+            dtype=np.int64, count=len(signals)
+        )
+        timestamps = np.fromiter((s.timestamp_ms for s in signals), dtype=np.int64, count=len(signals))
+
+        # lexsort is stable: ties keep their input order, like list.sort
+        order = np.lexsort((timestamps, ranks))
+        ordered = [signals[i] for i in order]
+
+        columns = {
+            "timestamp_ms": timestamps[order],
+            "x": np.array([np.nan if s.x is None else s.x for s in ordered], dtype=np.float64),
+            "y": np.array([np.nan if s.y is None else s.y for s in ordered], dtype=np.float64),
+            "id": np.array([str(s.id) for s in ordered], dtype=str),
+        }
+        categories = {}
+        for name in CATEGORICAL_COLUMNS:
+            columns[name], categories[name] = _encode([getattr(s, name) for s in ordered])
+
+        game_offsets = np.searchsorted(ranks[order], np.arange(len(game_rank) + 1)).astype(np.int64)
+        return cls(columns, categories, game_offsets)
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp_ms"])
+
+    def __iter__(self) -> Iterator[SignalEvent]:
+        return iter(self.to_signals())
+
+    @property
+    def game_count(self) -> int:
+        return len(self.game_offsets) - 1
+
+    def decode(self, name: str, rows: Optional[slice] = None) -> List[Optional[str]]:
+        """Values of a categorical column (None where the code is -1)"""
+        codes = self.columns[name] if rows is None else self.columns[name][rows]
+        values = self.categories[name]
+        return [values[code] if code >= 0 else None for code in codes.tolist()]
+
+    def game_slices(self) -> Iterator[Tuple[Optional[str], slice]]:
+        """(game_id, row slice) for every game, in table order"""
+        offsets = self.game_offsets.tolist()
+        game_codes = self.columns["game_id"]
+        for start, stop in zip(offsets, offsets[1:]):
+            code = int(game_codes[start])
+            yield (self.categories["game_id"][code] if code >= 0 else None), slice(start, stop)
+
+    def to_signals(self, rows: Optional[slice] = None) -> List[SignalEvent]:
+        """SignalEvent objects for rows (default: all), in table order"""
+        rows = rows if rows is not None else slice(0, len(self))
+        fields = {name: self.decode(name, rows) for name in CATEGORICAL_COLUMNS}
+        xs = self.columns["x"][rows].tolist()
+        ys = self.columns["y"][rows].tolist()
+
+        return [
+            SignalEvent(
+                id=event_id,
+                game_id=fields["game_id"][i],
+                series_id=fields["series_id"][i],
+                timestamp_ms=timestamp,
+                x=None if xs[i] != xs[i] else xs[i],  # NaN -> None
+                y=None if ys[i] != ys[i] else ys[i],
+                team_id=fields["team_id"][i],
+                opponent_team_id=fields["opponent_team_id"][i],
+                actor_player_id=fields["actor_player_id"][i],
+                target_player_id=fields["target_player_id"][i],
+                event_type=fields["event_type"][i],
+                sub_type=fields["sub_type"][i],
+                raw_type=fields["raw_type"][i],
+            )
+            for i, (event_id, timestamp) in enumerate(zip(
+                self.columns["id"][rows].tolist(), self.columns["timestamp_ms"][rows].tolist()
+            ))
+        ]
+
+    def save(self, path: str):
+        """Write the table to a compressed .npz file (no pickled objects)"""
+        arrays = dict(self.columns)
+        arrays["game_offsets"] = self.game_offsets
+        for name, values in self.categories.items():
+            arrays[f"{name}_categories"] = np.array(values, dtype=str)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "SignalTable":
+        if np is None:
+            raise ImportError("SignalTable requires numpy (pip install numpy)")
+
+        with np.load(path, allow_pickle=False) as data:
+            columns = {name: data[name] for name in NUMERIC_COLUMNS + CATEGORICAL_COLUMNS + ("id",)}
+            categories = {name: data[f"{name}_categories"].tolist() for name in CATEGORICAL_COLUMNS}
+            return cls(columns, categories, data["game_offsets"])
@@ -1,8 +1,17 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+
+@lru_cache(maxsize=4096)
+def _second_start_ms(prefix: str) -> int:
+    """Epoch ms of a "YYYY-MM-DDTHH:MM:SS" UTC prefix; consecutive transactions mostly share it"""
+    return int(datetime.fromisoformat(prefix).replace(tzinfo=timezone.utc).timestamp()) * 1000
 
 def iso_to_ms(iso_str: str) -> int:
     try:
-        # GRID timestamps are typically ISO 8601 with Z for UTC
+        # GRID timestamps are typically ISO 8601 with Z for UTC, as YYYY-MM-DDTHH:MM:SS.fffZ:
+        # only the milliseconds need parsing, the cached prefix covers the rest
+        if len(iso_str) == 24 and iso_str[23] == "Z" and iso_str[19] == "." and iso_str[20:23].isdigit():
+            return _second_start_ms(iso_str[:19]) + int(iso_str[20:23])
         return int(datetime.fromisoformat(iso_str.replace("Z", "+00:00")).timestamp() * 1000)
     except Exception:
         return 0